@@ -0,0 +1,61 @@
+"""
+Bundle packing benchmark - BundlePacker on synthetic small-file sets
+
+Usage: python benchmarks/bench_bin_packing.py [--files 1000000] [--workers 4]
+
+Prints, per size distribution, the packing time, the bundle count against the
+lower bound (total bytes / bundle size) and the heaviest bundle, for plain Best
+Fit Decreasing and for the worker-balanced variant.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.bin_packing import BundlePacker  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def distributions(count: int, max_size: int, seed: int):
+    rng = random.Random(seed)
+    yield "lognormal", [min(max_size, max(1, int(rng.lognormvariate(10, 2)))) for _ in range(count)]
+    yield "uniforme", [rng.randint(1, max_size) for _ in range(count)]
+
+
+def run(name: str, sizes, target_size: int, workers: int):
+    lower_bound = sum(sizes) / target_size
+    for label, pack in (
+        ("BFD", lambda: BundlePacker.pack_indices(sizes, target_size)),
+        (f"BFD+LPT x{workers}", lambda: BundlePacker.pack_for_workers_indices(sizes, target_size, workers)),
+    ):
+        started = time.perf_counter()
+        bundles = pack()
+        elapsed = time.perf_counter() - started
+        heaviest = max(sum(sizes[position] for position in bundle) for bundle in bundles)
+        print(
+            f"{name:10} {label:14} {len(sizes):>9} fichiers  {elapsed:6.2f}s  "
+            f"{len(bundles):>7} bundles (borne {lower_bound:.1f})  "
+            f"max {heaviest / target_size:.3f}x bundle_size"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--bundle-mb", type=int, default=50)
+    parser.add_argument("--max-file-mb", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for name, sizes in distributions(args.files, args.max_file_mb * MB, args.seed):
+        run(name, sizes, args.bundle_mb * MB, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Path filter benchmark - PathFilter.accept_name on synthetic relative paths
+
+Usage: python benchmarks/bench_filters.py [--paths 1000000]
+
+Compares the compiled matcher with a per-rule fnmatch loop (the naive way
+of applying the same exclude patterns) and prints paths/s for each.
+"""
+
+import argparse
+import fnmatch
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.filters import PathFilter  # noqa: E402
+
+EXCLUDE = [
+    "*.tmp", "*.log", "*.bak", "Thumbs.db", ".DS_Store",
+    "node_modules/", "/build/", "**/cache/*.bin", "!keep.log",
+]
+INCLUDE = ["*.jpg", "*.mp4", "/Music/", "docs"]
+
+DIRS = ["DCIM/Camera", "Music/Album", "docs/2024", "src/app", "build/out", "x/cache", "Download", "a/b/c/d"]
+NAMES = ["img_{}.jpg", "clip_{}.mp4", "song_{}.mp3", "notes_{}.txt", "trace_{}.log", "old_{}.bak",
+         "data_{}.bin", "keep.log", "Thumbs.db", "tmp_{}.tmp"]
+
+
+def synthetic_paths(count: int, seed: int):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        name = rng.choice(NAMES).format(i)
+        paths.append((f"{rng.choice(DIRS)}/{name}", name))
+    return paths
+
+
+def fnmatch_loop(paths):
+    """Per-rule loop over the exclude basename patterns only (a lower bound for the naive approach)."""
+    patterns = ["*.tmp", "*.log", "*.bak", "Thumbs.db"]
+    kept = 0
+    for _, name in paths:
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            kept += 1
+    return kept
+
+
+def compiled(paths):
+    path_filter = PathFilter(exclude=EXCLUDE, include=INCLUDE)
+    accept = path_filter.accept_name
+    return sum(1 for rel_path, name in paths if accept(rel_path, name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    paths = synthetic_paths(args.paths, args.seed)
+    for label, run in (
+        (f"PathFilter ({len(EXCLUDE)} exclusions + {len(INCLUDE)} inclusions)", compiled),
+        ("boucle fnmatch (4 exclusions)", fnmatch_loop),
+    ):
+        started = time.perf_counter()
+        kept = run(paths)
+        elapsed = time.perf_counter() - started
+        print(f"{label:50} {len(paths) / elapsed / 1e6:5.2f} M chemins/s  ({kept} conservés, {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -40,10 +40,162 @@ DEFAULT_RESUME_TRANSFER = True
 # Improves perceived performance by completing more files sooner
 DEFAULT_SJF_SCHEDULING = True
 
+# Streaming mode - push files while the source is still being scanned and prepared
+# Large files are chunked and small-file bundles are sealed as soon as they are found,
+# so the first byte reaches the device without waiting for the whole tree
+# SJF then orders files within a sliding window of DEFAULT_SJF_WINDOW files
+DEFAULT_STREAMING_MODE = False
+DEFAULT_SJF_WINDOW = 1000
+
 # Optimal bundle size for small file ZIP bundles (in bytes)
 # Used by bin packing algorithm - 50 MB is a good balance
 DEFAULT_BUNDLE_SIZE = 50 * 1024 * 1024
 
+# Number of threads used to scan the source folder (parallel os.scandir)
+DEFAULT_SCAN_WORKERS = 8
+
+# Incremental scan journal - only directories whose mtime changed are re-listed
+# A random sample of cached files is re-checked on every run, and the journal
+# is ignored (full rescan) when it is older than the max age.
+# Off by default: a file edited in place does not change its directory mtime, so
+# outside the sample its size and mtime can stay stale until the max age, and
+# planning, bundle packing (bundle ids) and the ledger would use the old values
+DEFAULT_SCAN_JOURNAL = False
+DEFAULT_SCAN_JOURNAL_MAX_AGE_HOURS = 24
+DEFAULT_SCAN_JOURNAL_VERIFY_SAMPLE = 256
+
+# Adaptive push concurrency per device (AIMD)
+# Starts at parallel_processes, +1 in-flight push per window while throughput holds,
+# halved when throughput drops or a push fails; decisions go to the local cache (metrics/)
+DEFAULT_ADAPTIVE_CONCURRENCY = True
+DEFAULT_MIN_PARALLEL_PROCESSES = 1
+DEFAULT_MAX_PARALLEL_PROCESSES = 8
+DEFAULT_CONCURRENCY_WINDOW = 5  # seconds
+
+# Failed pushes are resubmitted to the same worker pool after a jittered exponential
+# backoff (base * 2^attempt, capped), at most DEFAULT_MAX_RETRIES times per file.
+# A device with DEFAULT_CIRCUIT_BREAKER_THRESHOLD consecutive failures is paused for the
+# cooldown (doubled on every new trip); 0 disables the circuit breaker
+DEFAULT_RETRY_FAILED_CHUNKS = True
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF_BASE = 1.0  # seconds
+DEFAULT_RETRY_BACKOFF_MAX = 30.0  # seconds
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 5
+DEFAULT_CIRCUIT_BREAKER_COOLDOWN = 10  # seconds
+
+# Stall watchdog - a push without progress for DEFAULT_STALL_TIMEOUT seconds is killed and
+# retried. Pushes that cannot report bytes (adb push) get the timeout plus their size at
+# DEFAULT_STALL_MIN_RATE_MBPS. A device is fenced off after DEFAULT_MAX_STALLS stalls; 0 disables
+DEFAULT_STALL_TIMEOUT = 60  # seconds
+DEFAULT_STALL_MIN_RATE_MBPS = 0.5
+DEFAULT_MAX_STALLS = 3
+
+# Speculative backup pushes at the tail of a transfer: once nothing is left to submit,
+# a push running longer than DEFAULT_SPECULATION_FACTOR times what the median push
+# rate predicts (and at least the min seconds) gets a duplicate to a temporary name;
+# the first copy to finish wins. Duplicated bytes are capped per device and run
+DEFAULT_SPECULATIVE_PUSHES = True
+DEFAULT_SPECULATION_FACTOR = 3.0
+DEFAULT_SPECULATION_MIN_SECONDS = 5
+DEFAULT_SPECULATION_MAX_MB = 256
+
+# Compressed pushes: "wifi" (WiFi devices only), "always" or "off" (opt-in).
+# Items of at least DEFAULT_COMPRESSION_MIN_KB whose sampled gzip ratio is at most
+# DEFAULT_COMPRESSION_MAX_RATIO are gzipped on the host (parallel members, cached in
+# the local cache for every device) and decompressed on the device while streaming.
+# The gzip copies are capped at DEFAULT_COMPRESSION_CACHE_MB on disk (least recently
+# used evicted first) and pruned after 7 days without use
+DEFAULT_COMPRESSED_TRANSFER = "off"
+DEFAULT_COMPRESSION_MIN_KB = 1024
+DEFAULT_COMPRESSION_MAX_RATIO = 0.8
+DEFAULT_COMPRESSION_CACHE_MB = 2048
+
+# Multi-path pushes: a phone visible both by USB serial and as ip:port (same
+# ro.serialno) is transferred to once, with its pushes striped across both links
+# in proportion to their measured throughput; a link that keeps failing is dropped
+DEFAULT_MULTIPATH_TRANSFER = True
+
+# Direct placement: files that fit in one chunk are pushed straight to their path in
+# the target folder (temporary name, renamed once pushed), and unified.sh extracts
+# bundles and reassembles chunked files into the target; only chunks are staged in
+# remote_temp_dir and the final move is skipped
+DEFAULT_DIRECT_PLACEMENT = False
+
+# Checksum verification after the push phase: the MD5 of every chunk is computed on
+# the device (md5sum through find | xargs -P, a few adb calls for the whole transfer)
+# and compared with the chunk manifests; only mismatching chunks are pushed again.
+# Opt-in: it reads the whole payload back on the device after every push phase
+DEFAULT_VERIFY_CHECKSUMS = False
+
+# Verification after reassembly: the size of every reassembled file is compared with
+# its chunk manifest (one batched stat); with this option its MD5 is also computed on
+# the device (md5sum through xargs -P) and compared with the original file's MD5.
+# Bad files are reassembled again from their chunks, not the whole transfer
+DEFAULT_VERIFY_REASSEMBLED_DIGEST = False
+
+# Host-wide bandwidth scheduler for multi-device transfers
+# Devices are grouped by USB hub (or bus) from the `usb:` path of `adb devices -l`,
+# each group shares DEFAULT_GROUP_PUSH_SLOTS concurrent pushes.
+# Policies: "fair", "fastest_first" (least bytes left first), "weighted"
+# (device_weights: {"serial": 2.0}), "off" to let every device push at full speed
+DEFAULT_BANDWIDTH_POLICY = "fastest_first"
+DEFAULT_BANDWIDTH_GROUP_BY = "hub"
+DEFAULT_GROUP_PUSH_SLOTS = 8
+DEFAULT_DEVICE_WEIGHTS = {}
+
+# Shared read cache for multi-device transfers
+# Each pushed file is read from disk once and kept in memory until every device
+# has pushed it (written with `adb exec-in`); devices running ahead wait for room,
+# so disk reads stay at 1x whatever the number of devices
+DEFAULT_SHARED_READ_CACHE = True
+DEFAULT_READ_CACHE_MB = 512
+
+# Local transfer ledger per (device, remote temp dir) in the local cache (ledgers/)
+# Confirmed pushes are journaled with their size and digest; resume is computed
+# from it and checked against one remote listing instead of one stat per chunk
+DEFAULT_TRANSFER_LEDGER = True
+
+# Priority classes - files matching a class reach the devices (and are reassembled) first
+# [{"name": "boot", "patterns": ["config/**", "*.db"], "priority": 0, "deadline_s": 120}]
+# Lower priority goes first, then the earliest deadline; unmatched files come last.
+# In streaming mode a waiting file gains one class every DEFAULT_PRIORITY_AGING_ITEMS files
+DEFAULT_PRIORITY_CLASSES = []
+DEFAULT_PRIORITY_AGING_ITEMS = 500
+
+# Transfer planner - chunk size, small-file threshold, bundle size and worker count
+# are chosen from the scanned files, the device and the throughput measured on
+# previous runs (the prediction is always logged, tuning is opt-in)
+DEFAULT_AUTO_TUNE = False
+
+# Include/exclude rules applied while scanning (see core/filters.py)
+# Maps a source folder to its rules, "*" applies to every transfer job:
+# {"*": {"exclude": [".git/", "*.tmp"]}, "D:/Photos": {"include": ["*.jpg"], "min_size": "10K",
+#  "modified_after": "30d"}}
+DEFAULT_FILTER_RULES = {}
+
+# Balance bundles across push workers
+# Bundle count is rounded up to a multiple of parallel_processes
+# so every worker pushes roughly the same number of bytes
+DEFAULT_BALANCE_BUNDLES = True
+
+# Incremental (content-addressed) bundles
+# Small files are grouped deterministically and each bundle is named after
+# its members' fingerprints, so unchanged bundles are neither rebuilt nor re-pushed
+DEFAULT_INCREMENTAL_BUNDLES = False
+
+# Content-hash deduplication of identical source files
+# Each unique payload is sent once, copies are recreated on the device
+# Files smaller than the minimum size are left alone (not worth a copy command)
+DEFAULT_DEDUPLICATE_FILES = True
+DEFAULT_DEDUP_MIN_SIZE = 64 * 1024
+
+# Number of concurrent reassembly jobs on the device (chunk folders and bundles)
+# 0 = use the device CPU core count
+DEFAULT_DEVICE_PARALLEL_JOBS = 0
+
+# Local cache folder (in the user's home) for data kept between runs
+DEFAULT_LOCAL_CACHE_DIR = ".adb_transfer"
+
 # === FAST MODE OPTIONS ===
 # These options skip redundant verifications for maximum speed
 
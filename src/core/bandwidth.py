@@ -0,0 +1,192 @@
+"""
+Bandwidth Scheduler - Shares push slots between devices behind the same USB hub or bus
+Devices are grouped by their `usb:` topology path from `adb devices -l`; each group
+has a fixed number of concurrent pushes, handed out according to a policy
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+POLICY_FAIR = "fair"
+POLICY_FASTEST_FIRST = "fastest_first"
+POLICY_WEIGHTED = "weighted"
+POLICIES = (POLICY_FAIR, POLICY_FASTEST_FIRST, POLICY_WEIGHTED)
+
+WIFI_GROUP = "wifi"
+
+
+def topology_group(device: Dict, group_by: str = "hub") -> str:
+    """
+    Scheduling group of a device from `Adb.get_devices_detailed()` info.
+
+    `usb:1-2.3` is port 3 of the hub on port 2 of bus 1: grouped by hub it
+    belongs to "usb:1-2", by bus to "usb:1". WiFi devices share the access
+    point and form one group; USB devices without a topology path get their
+    own group.
+    """
+    if device.get("type") == "wifi":
+        return WIFI_GROUP
+    usb_path = device.get("usb_path")
+    if not usb_path:
+        return f"device:{device['id']}"
+    bus, _, ports = usb_path.partition('-')
+    if group_by == "bus" or '.' not in ports:
+        return f"usb:{bus}"
+    return f"usb:{bus}-{ports.rsplit('.', 1)[0]}"
+
+
+class _Group:
+    __slots__ = ("name", "slots", "held", "waiting", "condition")
+
+    def __init__(self, name: str, slots: int):
+        self.name = name
+        self.slots = slots
+        self.held: Dict[str, int] = {}
+        self.waiting: Dict[str, int] = {}
+        self.condition = threading.Condition()
+
+
+class BandwidthScheduler:
+    """
+    Host-wide allocation of push slots across devices.
+
+    Policies, applied inside each topology group:
+    - fair: every active device gets an equal share of the slots
+    - weighted: shares proportional to `weights[device_id]` (default 1)
+    - fastest_first: slots go to the waiting device with the fewest bytes
+      left, so devices finish one after another instead of all at the end
+
+    Slots a device does not use are lent to the others (work-conserving),
+    so aggregate throughput is not reduced.
+    """
+
+    def __init__(self, devices: Iterable[Dict], policy: str = POLICY_FAIR, group_slots: int = 8,
+                 group_by: str = "hub", weights: Optional[Dict[str, float]] = None, logger=None):
+        self.policy = policy if policy in POLICIES else POLICY_FAIR
+        self.weights = weights or {}
+        self.logger = logger
+        self._device_group: Dict[str, _Group] = {}
+        self._groups: Dict[str, _Group] = {}
+        self._remaining: Dict[str, float] = {}
+        self._started = time.monotonic()
+        self._finished: Dict[str, float] = {}
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+        for device in devices:
+            name = topology_group(device, group_by)
+            group = self._groups.get(name)
+            if group is None:
+                group = self._groups[name] = _Group(name, max(1, group_slots))
+            self._device_group[device["id"]] = group
+
+    def describe(self) -> str:
+        members: Dict[str, list] = {}
+        for device_id, group in self._device_group.items():
+            members.setdefault(group.name, []).append(device_id)
+        return "; ".join(f"{name}: {', '.join(ids)}" for name, ids in members.items())
+
+    def register(self, device_id: str, total_bytes: Optional[int] = None):
+        """Declare a device as active with `total_bytes` to push (None if unknown, e.g. streaming)."""
+        with self._lock:
+            self._remaining[device_id] = float(total_bytes) if total_bytes is not None else math.inf
+        group = self._device_group.get(device_id)
+        if group is not None:
+            with group.condition:
+                group.held.setdefault(device_id, 0)
+
+    def acquire(self, device_id: str, nbytes: int = 0) -> bool:
+        """
+        Block until the device may start one more push.
+
+        Returns:
+            True once a slot is held, False if the scheduler was cancelled
+        """
+        group = self._device_group.get(device_id)
+        if group is None:
+            return not self._cancelled
+        with group.condition:
+            group.waiting[device_id] = group.waiting.get(device_id, 0) + 1
+            while not self._cancelled and not self._can_grant(group, device_id):
+                group.condition.wait()
+            group.waiting[device_id] -= 1
+            if not group.waiting[device_id]:
+                del group.waiting[device_id]
+            if self._cancelled:
+                return False
+            group.held[device_id] = group.held.get(device_id, 0) + 1
+            return True
+
+    def release(self, device_id: str, nbytes: int = 0):
+        """Give the slot back once a push finished, `nbytes` being what it sent."""
+        group = self._device_group.get(device_id)
+        if group is None:
+            return
+        with self._lock:
+            if device_id in self._remaining:
+                self._remaining[device_id] = max(0.0, self._remaining[device_id] - nbytes)
+        with group.condition:
+            group.held[device_id] = max(0, group.held.get(device_id, 0) - 1)
+            group.condition.notify_all()
+
+    def finish(self, device_id: str):
+        """The device has nothing left to push: its share goes to the others.
+
+        Safe to call more than once, and for a device that never registered
+        (it stopped before pushing); only registered devices get a finish time.
+        """
+        with self._lock:
+            if self._remaining.pop(device_id, None) is not None:
+                self._finished[device_id] = time.monotonic() - self._started
+        group = self._device_group.get(device_id)
+        if group is not None:
+            with group.condition:
+                group.held.pop(device_id, None)
+                group.condition.notify_all()
+
+    def cancel(self):
+        """Wake every waiting push; further acquire() calls return False."""
+        self._cancelled = True
+        for group in self._groups.values():
+            with group.condition:
+                group.condition.notify_all()
+
+    def _can_grant(self, group: _Group, device_id: str) -> bool:
+        in_use = sum(group.held.values())
+        if in_use >= group.slots:
+            return False
+
+        if self.policy == POLICY_FASTEST_FIRST:
+            # Shortest remaining work first among the devices waiting for a slot
+            with self._lock:
+                mine = self._remaining.get(device_id, math.inf)
+                return all(mine <= self._remaining.get(other, math.inf)
+                           for other in group.waiting if other != device_id)
+
+        # Fair / weighted share of the group's slots among its active devices
+        active = [d for d in group.held if d in group.waiting or group.held[d] > 0] or [device_id]
+        if device_id not in active:
+            active.append(device_id)
+        weight = self._weight(device_id)
+        total_weight = sum(self._weight(d) for d in active)
+        quota = max(1, math.floor(group.slots * weight / total_weight))
+        if group.held.get(device_id, 0) < quota:
+            return True
+        # Over quota: only borrow slots no other waiting device is entitled to
+        return all(other == device_id for other in group.waiting)
+
+    def _weight(self, device_id: str) -> float:
+        if self.policy == POLICY_WEIGHTED:
+            return max(0.01, float(self.weights.get(device_id, 1.0)))
+        return 1.0
+
+    def log_summary(self):
+        """Log each device's time-to-ready and the fleet mean."""
+        if not self.logger or not self._finished:
+            return
+        for device_id, seconds in sorted(self._finished.items(), key=lambda x: x[1]):
+            self.logger.info(f"[{device_id}] Transfert terminé après {seconds:.1f}s")
+        mean = sum(self._finished.values()) / len(self._finished)
+        self.logger.info(f"Ordonnanceur ({self.policy}): temps moyen de transfert par appareil {mean:.1f}s")
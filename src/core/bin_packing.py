@@ -0,0 +1,254 @@
+"""
+Bundle Packer - Groups small files into ZIP bundles of a target size
+Best Fit Decreasing over a sorted capacity index, O(n log n) for large trees
+The *_indices variants work on plain size arrays (see FileInventory)
+"""
+
+import hashlib
+import heapq
+import zlib
+from array import array
+from bisect import bisect_left, insort
+from typing import List, Sequence, Tuple
+
+# Remaining capacities are stored as a single sortable integer:
+# (remaining_bytes << _INDEX_BITS) | bundle_index
+# This keeps the index a flat list of ints so bisect/insort run in C.
+_INDEX_BITS = 32
+_INDEX_MASK = (1 << _INDEX_BITS) - 1
+
+
+class BundlePacker:
+    """
+    Provides static methods for packing (file, size) items into bundles.
+    """
+
+    @staticmethod
+    def pack(files_with_sizes: Sequence[Tuple], target_size: int) -> List[List[Tuple]]:
+        """
+        Pack files into bundles using Best Fit Decreasing.
+
+        Args:
+            files_with_sizes: Sequence of (file_path, file_size) tuples
+            target_size: Target size per bundle in bytes
+
+        Returns:
+            List of bundles, where each bundle is a list of (file_path, file_size) tuples
+        """
+        sizes = [item[1] for item in files_with_sizes]
+        return BundlePacker._resolve(files_with_sizes, BundlePacker.pack_indices(sizes, target_size))
+
+    @staticmethod
+    def pack_indices(sizes: Sequence[int], target_size: int) -> List[array]:
+        """
+        Best Fit Decreasing over a sequence (or typed array) of sizes.
+
+        Each file goes into the open bundle with the smallest remaining capacity
+        that can still hold it. Open bundles are kept in a sorted index of
+        remaining capacities, so each placement is a binary search instead of
+        a linear scan over every bundle.
+
+        Args:
+            sizes: File sizes in bytes
+            target_size: Target size per bundle in bytes
+
+        Returns:
+            List of bundles, each an array of positions into `sizes`
+        """
+        order = sorted(range(len(sizes)), key=sizes.__getitem__, reverse=True)
+
+        bundles = []
+        capacity_index = []  # Sorted encoded (remaining, bundle_index) keys
+
+        for position in order:
+            file_size = sizes[position]
+            pos = bisect_left(capacity_index, file_size << _INDEX_BITS)
+
+            if pos < len(capacity_index):
+                key = capacity_index.pop(pos)
+                bundle_index = key & _INDEX_MASK
+                remaining = (key >> _INDEX_BITS) - file_size
+                bundles[bundle_index].append(position)
+            else:
+                # No open bundle can fit this file, open a new one
+                bundle_index = len(bundles)
+                remaining = target_size - file_size
+                bundles.append(array('I', [position]))
+
+            # Oversized or exactly full bundles can never take another byte
+            if remaining > 0:
+                insort(capacity_index, (remaining << _INDEX_BITS) | bundle_index)
+
+        return bundles
+
+    @staticmethod
+    def balance(files_with_sizes: Sequence[Tuple], bundle_count: int) -> List[List[Tuple]]:
+        """
+        Spread files over exactly `bundle_count` bundles of similar total size.
+
+        Args:
+            files_with_sizes: Sequence of (file_path, file_size) tuples
+            bundle_count: Number of bundles to produce
+
+        Returns:
+            List of non-empty bundles (fewer than `bundle_count` if there are fewer files)
+        """
+        sizes = [item[1] for item in files_with_sizes]
+        return BundlePacker._resolve(files_with_sizes, BundlePacker.balance_indices(sizes, bundle_count))
+
+    @staticmethod
+    def balance_indices(sizes: Sequence[int], bundle_count: int) -> List[array]:
+        """
+        Longest Processing Time over a sequence of sizes: largest file first,
+        always into the currently lightest bundle (min-heap on bundle load).
+
+        Returns:
+            List of non-empty bundles, each an array of positions into `sizes`
+        """
+        bundle_count = max(1, min(bundle_count, len(sizes)))
+        order = sorted(range(len(sizes)), key=sizes.__getitem__, reverse=True)
+
+        bundles = [array('I') for _ in range(bundle_count)]
+        loads = [(0, i) for i in range(bundle_count)]
+
+        for position in order:
+            load, bundle_index = heapq.heappop(loads)
+            bundles[bundle_index].append(position)
+            heapq.heappush(loads, (load + sizes[position], bundle_index))
+
+        return [bundle for bundle in bundles if bundle]
+
+    @staticmethod
+    def pack_for_workers(files_with_sizes: Sequence[Tuple], target_size: int, workers: int) -> List[List[Tuple]]:
+        """
+        Pack files into bundles whose count is a multiple of the worker count.
+
+        Args:
+            files_with_sizes: Sequence of (file_path, file_size) tuples
+            target_size: Target size per bundle in bytes
+            workers: Number of parallel push workers
+
+        Returns:
+            List of bundles, where each bundle is a list of (file_path, file_size) tuples
+        """
+        sizes = [item[1] for item in files_with_sizes]
+        return BundlePacker._resolve(
+            files_with_sizes, BundlePacker.pack_for_workers_indices(sizes, target_size, workers)
+        )
+
+    @staticmethod
+    def pack_for_workers_indices(sizes: Sequence[int], target_size: int, workers: int,
+                                 max_extra_groups: int = 2) -> List[array]:
+        """
+        Best Fit Decreasing, then the bundle count is rounded up to the next
+        multiple of `workers` and files are rebalanced so every worker pushes
+        roughly the same number of bytes.
+
+        LPT does not know `target_size`: when its heaviest bundle exceeds it
+        (or the largest file, for oversized files), one more group of
+        `workers` bundles is tried, up to `max_extra_groups` times, before
+        falling back to the Best Fit Decreasing result.
+
+        Returns:
+            List of bundles, each an array of positions into `sizes`
+        """
+        bundles = BundlePacker.pack_indices(sizes, target_size)
+        if workers <= 1 or len(bundles) % workers == 0:
+            return bundles
+
+        limit = max(target_size, max(sizes))
+        bundle_count = -(-len(bundles) // workers) * workers
+        for _ in range(max_extra_groups + 1):
+            if bundle_count > len(sizes):
+                break
+            balanced = BundlePacker.balance_indices(sizes, bundle_count)
+            if max(sum(sizes[position] for position in bundle) for bundle in balanced) <= limit:
+                return balanced
+            bundle_count += workers
+
+        return bundles
+
+    @staticmethod
+    def _resolve(items: Sequence[Tuple], bundles: List[array]) -> List[List[Tuple]]:
+        return [[items[position] for position in bundle] for bundle in bundles]
+
+    @staticmethod
+    def pack_stable(files_with_sizes: Sequence[Tuple], target_size: int, source_dir) -> List[List[Tuple]]:
+        """
+        Group files into bundles deterministically, so that small changes to
+        the tree only change the bundles that contain them.
+
+        Files are ordered by relative path (keeping folders together) and cut
+        into groups at content-defined boundaries: a bundle ends after a file
+        whose path hash falls in a fixed range, or when the next file would
+        exceed `target_size`. Adding or removing a file only moves the
+        boundaries of its own group (and at most its neighbours on overflow).
+
+        Args:
+            files_with_sizes: Sequence of (file_path, file_size) items
+            target_size: Target size per bundle in bytes
+            source_dir: Root folder the relative paths are computed from
+
+        Returns:
+            List of bundles, each a list of the input items (FileEntry items
+            keep their mtime for `bundle_id`)
+        """
+        if not files_with_sizes:
+            return []
+
+        keyed = sorted(
+            ((item[0].relative_to(source_dir).as_posix(), item) for item in files_with_sizes),
+            key=lambda x: x[0]
+        )
+
+        # Expected files per bundle, rounded to a power of two so that the
+        # boundary rule does not drift when a few files are added or removed
+        total_size = sum(item[1] for _, item in keyed)
+        average_size = max(1, total_size // len(keyed))
+        files_per_bundle = max(1, target_size // average_size)
+        boundary_modulus = 1 << max(0, files_per_bundle.bit_length() - 1)
+
+        bundles = []
+        current = []
+        current_size = 0
+        for rel_path, item in keyed:
+            if current and current_size + item[1] > target_size:
+                bundles.append(current)
+                current = []
+                current_size = 0
+
+            current.append(item)
+            current_size += item[1]
+
+            if zlib.crc32(rel_path.encode('utf-8')) % boundary_modulus == 0:
+                bundles.append(current)
+                current = []
+                current_size = 0
+
+        if current:
+            bundles.append(current)
+
+        return bundles
+
+    @staticmethod
+    def bundle_id(bundle_files: Sequence[Tuple], source_dir) -> str:
+        """
+        Content identity of a bundle, derived from its members' fingerprints
+        (relative path, size and modification time).
+
+        The mtimes come from the scan, nothing is stat'ed here.
+
+        Args:
+            bundle_files: FileEntry items, or (file_path, file_size, mtime) tuples
+            source_dir: Root folder the relative paths are computed from
+
+        Returns:
+            Hex digest identifying the bundle content
+        """
+        digest = hashlib.sha1()
+        for item in sorted(bundle_files, key=lambda x: str(x[0])):
+            file_path, file_size = item[0], item[1]
+            mtime = item[2] if len(item) > 2 else item.mtime
+            rel_path = file_path.relative_to(source_dir).as_posix()
+            digest.update(f"{rel_path}\0{file_size}\0{mtime!r}\n".encode('utf-8'))
+        return digest.hexdigest()[:20]
@@ -0,0 +1,120 @@
+"""
+Device Checksums - Sizes and MD5 of remote files computed on the device in batched calls
+One shell invocation hashes the chunks of many chunk folders (or many reassembled files)
+with bounded parallelism (xargs -P); only "digest path" lines travel back and are
+compared with the manifests
+"""
+
+import shlex
+from typing import Dict, List, Optional
+
+# md5 commands tried in order; the manifests carry MD5, so it is the digest to compute
+MD5_TOOLS = ("md5sum", "toybox md5sum", "busybox md5sum", "/data/local/tmp/busybox md5sum")
+
+# MD5 of "abc", checks that a candidate tool really works
+_PROBE_DIGEST = "900150983cd24fb0d6963f7d28e17f72"
+
+
+def probe_md5_tool(adb, device_id: str) -> Optional[str]:
+    """First working md5 command of the device, None when it has none."""
+    for tool in MD5_TOOLS:
+        output = adb.run_command(f'shell "printf abc | {tool} 2>/dev/null; true"', device_id)
+        if output and any(line.split()[:1] == [_PROBE_DIGEST] for line in output):
+            return tool
+    return None
+
+
+def probe_parallel_xargs(adb, device_id: str) -> bool:
+    """Whether the device xargs supports -P (parallel processes)."""
+    output = adb.run_command('shell "echo ok | xargs -P 2 echo 2>/dev/null; true"', device_id)
+    return bool(output) and output[0].strip() == "ok"
+
+
+def remote_sizes(adb, device_id: str, remote_paths: List[str], batch_size: int = 50) -> Dict[str, int]:
+    """{remote path: size} of the given remote files that exist, with one `stat` per batch."""
+    sizes = {}
+    for start in range(0, len(remote_paths), batch_size):
+        batch = " ".join(shlex.quote(p) for p in remote_paths[start:start + batch_size])
+        result = adb.run_command(f'shell "stat -c \'%s %n\' {batch} 2>/dev/null; true"', device_id)
+        for line in result or []:
+            size, _, path = line.strip().partition(' ')
+            if size.isdigit() and path:
+                sizes[path] = int(size)
+    return sizes
+
+
+class DeviceChecksummer:
+    """
+    Computes the MD5 of the chunks of one device with a few shell invocations.
+
+    `digests(chunk_dirs)` hashes every `chunk_*.bin` of `dirs_per_call`
+    folders per adb call: `find` lists them and `xargs` runs the md5 tool
+    on `files_per_process` files at a time, with up to `jobs` processes in
+    parallel when the device xargs supports -P (0 = CPU cores).
+    `file_digests(paths)` does the same for explicit files (reassembled
+    outputs), one file per process since they are large.
+    """
+
+    def __init__(self, adb, device_id: str, tool: str, jobs: int = 0, parallel: bool = True,
+                 dirs_per_call: int = 50, files_per_process: int = 8):
+        self.adb = adb
+        self.device_id = device_id
+        self.tool = tool
+        self.jobs = jobs
+        self.parallel = parallel
+        self.dirs_per_call = dirs_per_call
+        self.files_per_process = files_per_process
+
+    @classmethod
+    def probe(cls, adb, device_id: str, jobs: int = 0) -> Optional["DeviceChecksummer"]:
+        """Checksummer using the device's md5 tool, None when it has none."""
+        tool = probe_md5_tool(adb, device_id)
+        if tool is None:
+            return None
+        return cls(adb, device_id, tool, jobs=jobs, parallel=probe_parallel_xargs(adb, device_id))
+
+    def digests(self, chunk_dirs: List[str]) -> Optional[Dict[str, str]]:
+        """{remote chunk path: md5} of the chunks found in `chunk_dirs`, None if a call failed."""
+        result = {}
+        xargs = self._xargs(self.files_per_process)
+        for start in range(0, len(chunk_dirs), self.dirs_per_call):
+            batch = " ".join(shlex.quote(d) for d in chunk_dirs[start:start + self.dirs_per_call])
+            output = self.adb.run_command(
+                f'shell "find {batch} -maxdepth 1 -type f -name \'chunk_*.bin\' -print0 2>/dev/null '
+                f'| {xargs} {self.tool} 2>/dev/null; true"',
+                self.device_id
+            )
+            if output is None:
+                return None
+            self._parse(output, result)
+        return result
+
+    def file_digests(self, remote_paths: List[str]) -> Optional[Dict[str, str]]:
+        """{remote path: md5} of the given files that exist, None if a call failed."""
+        result = {}
+        xargs = self._xargs(1)
+        for start in range(0, len(remote_paths), self.dirs_per_call):
+            batch = " ".join(shlex.quote(p) for p in remote_paths[start:start + self.dirs_per_call])
+            output = self.adb.run_command(
+                f'shell "printf \'%s\\0\' {batch} | {xargs} {self.tool} 2>/dev/null; true"',
+                self.device_id
+            )
+            if output is None:
+                return None
+            self._parse(output, result)
+        return result
+
+    def _xargs(self, per_process: int) -> str:
+        if self.parallel:
+            jobs = self.jobs if self.jobs > 0 else "$(nproc 2>/dev/null || echo 2)"
+            return f"xargs -0 -P {jobs} -n {per_process}"
+        return f"xargs -0 -n {per_process}"
+
+    @staticmethod
+    def _parse(output: List[str], result: Dict[str, str]):
+        for line in output:
+            # "<md5>  <path>" (binary mode: "<md5> *<path>")
+            digest, _, path = line.strip().partition(' ')
+            path = path.lstrip(' *')
+            if len(digest) == 32 and path:
+                result[path] = digest.lower()
@@ -0,0 +1,190 @@
+"""
+Compressed Transfer - gzip blobs for pushes over slow links (WiFi)
+Compressible items are gzipped on the host in parallel members, cached on disk so
+every device of a run reuses them, and decompressed on the device while streaming
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils.cache import path_key
+
+MB = 1024 * 1024
+
+# gzip container (zlib wbits 16 + 15): each block becomes a complete gzip member,
+# and concatenated members decompress as one stream (gzip -d, zcat)
+_GZIP_WBITS = 31
+
+
+def compressibility(path, size: int, sample_bytes: int = 256 * 1024, level: int = 1) -> float:
+    """
+    Estimated compressed/raw size ratio of a file, from samples at its start, middle and end.
+
+    Returns:
+        Ratio in ]0, 1+], 1.0 when the file cannot be read
+    """
+    part = max(1, sample_bytes // 3)
+    raw = 0
+    packed = 0
+    try:
+        with open(path, 'rb') as f:
+            for offset in sorted({0, max(0, size // 2 - part // 2), max(0, size - part)}):
+                f.seek(offset)
+                data = f.read(part)
+                if data:
+                    raw += len(data)
+                    packed += len(zlib.compress(data, level))
+    except OSError:
+        return 1.0
+    return packed / raw if raw else 1.0
+
+
+class CompressionCache:
+    """
+    On-disk cache of gzip versions of push items, shared by the devices of a run.
+
+    - `get(path, size)` returns the path of the gzip blob, or None when the
+      item is too small or not compressible enough (decided once per file
+      from a sample, see `compressibility`).
+    - Blobs are written as independent gzip members of `block_bytes`,
+      compressed in parallel on `workers` threads (zlib releases the GIL).
+    - Blobs are keyed by path, size and mtime, so an unchanged chunk is
+      compressed once and reused by later devices and runs. Blobs unused
+      for `max_age_days` are pruned when the cache is created.
+    - The blobs on disk are kept within `max_bytes`: when a new blob goes
+      over it, the least recently used ones (oldest mtime, refreshed on
+      reuse) are deleted. A push whose blob was evicted is sent raw.
+    """
+
+    def __init__(self, cache_dir: Path, min_size: int = 1024 * 1024, max_ratio: float = 0.8, level: int = 1,
+                 block_bytes: int = 4 * MB, workers: Optional[int] = None, max_age_days: float = 7,
+                 max_bytes: int = 2048 * MB, logger=None):
+        self.cache_dir = Path(cache_dir)
+        self.min_size = min_size
+        self.max_ratio = max_ratio
+        self.level = level
+        self.block_bytes = block_bytes
+        self.workers = workers or os.cpu_count() or 2
+        self.max_bytes = max_bytes
+        self.logger = logger
+        self._decisions: Dict[str, bool] = {}
+        self._building: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        # Statistics
+        self.compressed_files = 0
+        self.compress_seconds = 0.0
+        self.evicted_files = 0
+        self._stored_bytes = 0  # Size of the blobs on disk
+        self._prune(max_age_days)
+
+    def get(self, path, size: int) -> Optional[Path]:
+        """Path of the gzip blob of `path`, compressing it on first use; None to push it raw."""
+        path = str(path)
+        if size < self.min_size:
+            return None
+        with self._lock:
+            decision = self._decisions.get(path)
+        if decision is None:
+            decision = compressibility(path, size, level=self.level) <= self.max_ratio
+            with self._lock:
+                self._decisions[path] = decision
+        if not decision:
+            return None
+
+        try:
+            blob = self.cache_dir / f"{path_key(f'{path}:{size}:{os.stat(path).st_mtime_ns}')}.gz"
+        except OSError:
+            return None
+        # One device compresses, the others wait for the blob
+        with self._lock:
+            event = self._building.get(path)
+            builder = event is None and not blob.exists()
+            if builder:
+                event = self._building[path] = threading.Event()
+        if not builder:
+            if event is not None:
+                event.wait()
+            try:
+                os.utime(blob)  # Keeps a reused blob away from pruning
+            except OSError:
+                return None
+            return blob
+        try:
+            self._compress(path, blob)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"Compression impossible de {Path(path).name}: {e}")
+        finally:
+            with self._lock:
+                del self._building[path]
+            event.set()
+        return blob if blob.exists() else None
+
+    def _compress(self, path: str, blob: Path):
+        started = time.monotonic()
+        partial = blob.with_suffix(".gz.part")
+
+        def compress_block(data):
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _GZIP_WBITS)
+            return compressor.compress(data) + compressor.flush()
+
+        with open(path, 'rb') as src, open(partial, 'wb') as dst, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Keep at most 2 blocks per worker in memory, written back in order
+            window = []
+            while True:
+                data = src.read(self.block_bytes)
+                if data:
+                    window.append(executor.submit(compress_block, data))
+                if window and (not data or len(window) >= 2 * self.workers):
+                    dst.write(window.pop(0).result())
+                if not data and not window:
+                    break
+        os.replace(partial, blob)
+        with self._lock:
+            self.compressed_files += 1
+            self.compress_seconds += time.monotonic() - started
+            self._stored_bytes += blob.stat().st_size
+            if self._stored_bytes > self.max_bytes:
+                self._evict(keep=blob)
+
+    def _prune(self, max_age_days: float):
+        cutoff = time.time() - max_age_days * 86400
+        for blob in self.cache_dir.glob("*.gz*"):
+            try:
+                stat = blob.stat()
+                if stat.st_mtime < cutoff:
+                    blob.unlink()
+                elif blob.suffix == ".gz":
+                    self._stored_bytes += stat.st_size
+            except OSError:
+                pass
+        if self._stored_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self, keep: Optional[Path] = None):
+        """Delete the least recently used blobs until the cache fits in `max_bytes`."""
+        blobs = []
+        for blob in self.cache_dir.glob("*.gz"):
+            try:
+                stat = blob.stat()
+            except OSError:
+                continue
+            blobs.append((stat.st_mtime, stat.st_size, blob))
+        self._stored_bytes = sum(size for _, size, _ in blobs)
+        for _, size, blob in sorted(blobs, key=lambda b: (b[0], str(b[2]))):
+            if self._stored_bytes <= self.max_bytes:
+                break
+            if blob == keep:
+                continue
+            try:
+                blob.unlink()
+            except OSError:
+                continue  # Still open by a push (Windows)
+            self._stored_bytes -= size
+            self.evicted_files += 1
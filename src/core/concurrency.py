@@ -0,0 +1,287 @@
+"""
+Adaptive Concurrency - AIMD control of the number of in-flight pushes per device
+Throughput is measured over a sliding window; the limit grows by one while the
+link keeps up and is cut multiplicatively when throughput drops or pushes fail.
+Failed pushes are retried with jittered exponential backoff behind a per-device
+circuit breaker
+"""
+
+import heapq
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+MB = 1024 * 1024
+
+
+class AimdController:
+    """
+    Additive-increase / multiplicative-decrease limit on concurrent pushes.
+
+    Every `window_s` seconds (and at least `limit` completions) the aggregate
+    throughput of the last window is compared to the previous one:
+    - a push failed, or throughput fell by more than `drop_tolerance`:
+      limit = max(min_limit, limit * decrease_factor)
+    - otherwise: limit = min(max_limit, limit + 1)
+
+    Each decision is kept in `decisions` (see `metrics()`).
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        window_s: float = 5.0,
+        decrease_factor: float = 0.5,
+        drop_tolerance: float = 0.1,
+        logger=None,
+        name: str = "",
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = max(self.min_limit, min(self.max_limit, initial))
+        self.window_s = window_s
+        self.decrease_factor = decrease_factor
+        self.drop_tolerance = drop_tolerance
+        self.logger = logger
+        self.name = name
+
+        self.decisions: List[Dict] = []
+        self._completions = deque()  # (timestamp, bytes) inside the current window
+        self._failures = 0
+        self._previous_rate: Optional[float] = None
+        self._window_start = time.monotonic()
+        self._started = self._window_start
+        self._limit_seconds = 0.0  # Integral of the limit over time, for the average
+        self._limit_since = self._window_start
+        self._lock = threading.Lock()
+
+    def record(self, nbytes: int, success: bool = True, now: Optional[float] = None):
+        """Account one finished push and adjust the limit when a window is complete."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if success:
+                self._completions.append((now, nbytes))
+            else:
+                self._failures += 1
+            # A window needs about one completion per slot, otherwise a few
+            # large chunks landing on either side of its edge skew the rate
+            if (now - self._window_start >= self.window_s
+                    and len(self._completions) + self._failures >= self.limit):
+                self._adjust(now)
+
+    def _adjust(self, now: float):
+        elapsed = now - self._window_start
+        rate = sum(nbytes for _, nbytes in self._completions) / elapsed if elapsed > 0 else 0.0
+        previous = self._previous_rate
+        old_limit = self.limit
+
+        if self._failures:
+            reason = "failure"
+            new_limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        elif previous is not None and rate < previous * (1 - self.drop_tolerance):
+            reason = "drop"
+            new_limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        else:
+            reason = "increase"
+            new_limit = min(self.max_limit, self.limit + 1)
+
+        self._limit_seconds += self.limit * (now - self._limit_since)
+        self._limit_since = now
+        self.limit = new_limit
+
+        self.decisions.append({
+            "time": round(now - self._started, 3),
+            "rate_mbps": round(rate / MB, 3),
+            "from": old_limit,
+            "to": new_limit,
+            "reason": reason,
+        })
+        if self.logger and new_limit != old_limit:
+            prefix = f"[{self.name}] " if self.name else ""
+            self.logger.info(f"{prefix}Concurrence: {old_limit} -> {new_limit} ({reason}, {rate / MB:.1f} MB/s)")
+
+        self._previous_rate = rate
+        self._completions.clear()
+        self._failures = 0
+        self._window_start = now
+
+    def average_limit(self, now: Optional[float] = None) -> float:
+        """Time-weighted average limit since the controller started."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            total = self._limit_seconds + self.limit * (now - self._limit_since)
+            elapsed = now - self._started
+        return total / elapsed if elapsed > 0 else float(self.limit)
+
+    def metrics(self) -> Dict:
+        """Current state and the decision log, ready to be dumped as JSON."""
+        return {
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "average_limit": round(self.average_limit(), 2),
+            "increases": sum(1 for d in self.decisions if d["to"] > d["from"]),
+            "decreases": sum(1 for d in self.decisions if d["to"] < d["from"]),
+            "decisions": list(self.decisions),
+        }
+
+
+class RetryPolicy:
+    """
+    Per-item retry budget with jittered exponential backoff.
+
+    Attempt n (1-based) of a failed item waits
+    uniform(0.5, 1.5) * min(max_delay, base_delay * 2 ** (n - 1)) seconds.
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.backoff_seconds = 0.0
+        self.exhausted = 0
+
+    def next_delay(self, attempt: int) -> Optional[float]:
+        """Delay before retry number `attempt`, or None when the item's budget is spent."""
+        if attempt > self.max_retries:
+            self.exhausted += 1
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+        self.retries += 1
+        self.backoff_seconds += delay
+        return delay
+
+    def metrics(self) -> Dict:
+        return {
+            "retries": self.retries,
+            "backoff_seconds": round(self.backoff_seconds, 2),
+            "exhausted": self.exhausted,
+        }
+
+
+class RetryQueue:
+    """
+    Failed items waiting out their backoff delay, earliest due first.
+
+    Due items are submitted ahead of the items not pushed yet; items pushed
+    with the same due time come out in insertion order.
+    """
+
+    def __init__(self):
+        self._heap = []  # (ready_time, sequence, item, attempt)
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item, attempt: int, delay: float, now: Optional[float] = None):
+        """Queue `item` for its retry number `attempt`, due in `delay` seconds."""
+        now = time.monotonic() if now is None else now
+        self._sequence += 1
+        heapq.heappush(self._heap, (now + delay, self._sequence, item, attempt))
+
+    def next_due(self) -> Optional[float]:
+        """Monotonic time at which the next retry is due, None when empty."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> Optional[Tuple]:
+        """(item, attempt) of the earliest retry if it is due, else None."""
+        now = time.monotonic() if now is None else now
+        if not self._heap or self._heap[0][0] > now:
+            return None
+        _, _, item, attempt = heapq.heappop(self._heap)
+        return item, attempt
+
+    def drain(self) -> List:
+        """Remove and return every queued item, in due order."""
+        items = [item for _, _, item, _ in sorted(self._heap)]
+        self._heap.clear()
+        return items
+
+
+class CircuitBreaker:
+    """
+    Stops pushing to a device that keeps failing (reset, unplugged, storage full).
+
+    - closed: pushes flow; `threshold` consecutive failures open the circuit
+    - open: nothing is submitted for `cooldown_s` seconds (doubled on each
+      new trip, capped at `max_cooldown_s`)
+    - half-open: a single probe push; success closes the circuit, failure
+      opens it again
+
+    After `max_trips` trips the device is given up (`tripped_out`).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int = 5, cooldown_s: float = 10.0, max_cooldown_s: float = 120.0,
+                 max_trips: int = 5, logger=None, name: str = ""):
+        self.threshold = max(1, threshold)
+        self.cooldown_s = cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+        self.max_trips = max_trips
+        self.logger = logger
+        self.name = name
+        self.state = self.CLOSED
+        self.trips = 0
+        self.open_seconds = 0.0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._reopen_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def tripped_out(self) -> bool:
+        return self.trips >= self.max_trips and self.state == self.OPEN
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """True if one more push may be submitted now."""
+        now = time.monotonic() if now is None else now
+        if self.state == self.OPEN and now >= self._reopen_at and not self.tripped_out:
+            self.state = self.HALF_OPEN
+            self.open_seconds += now - self._opened_at
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+        return self.state == self.CLOSED
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until the circuit may let a push through again."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._reopen_at - now) if self.state == self.OPEN else 0.0
+
+    def record(self, success: bool, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+        if success:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                self.state = self.CLOSED
+                self._log("Circuit refermé, reprise des transferts")
+            return
+        self._failures += 1
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._failures >= self.threshold):
+            self.trips += 1
+            cooldown = min(self.max_cooldown_s, self.cooldown_s * 2 ** (self.trips - 1))
+            self.state = self.OPEN
+            self._opened_at = now
+            self._reopen_at = now + cooldown
+            self._log(f"Circuit ouvert après {self._failures} échec(s) consécutif(s), pause de {cooldown:.0f}s")
+
+    def metrics(self) -> Dict:
+        return {"state": self.state, "trips": self.trips, "open_seconds": round(self.open_seconds, 2)}
+
+    def _log(self, message: str):
+        if self.logger:
+            prefix = f"[{self.name}] " if self.name else ""
+            self.logger.warning(f"{prefix}{message}")
@@ -0,0 +1,159 @@
+"""
+File Deduplicator - Finds byte-identical files in the source tree
+Each unique payload is transferred once, copies are recreated on the device
+"""
+
+import concurrent.futures
+import hashlib
+import shlex
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+# Bytes read from the start of each candidate before committing to a full hash
+PARTIAL_HASH_BYTES = 64 * 1024
+
+# Name of the batched materialization script pushed to the transfer root
+DEDUP_SCRIPT_NAME = "dedup_links.sh"
+
+
+class FileDeduplicator:
+    """
+    Provides static methods for duplicate detection and device-side materialization.
+    """
+
+    @staticmethod
+    def find_duplicates(
+        files_with_sizes: Sequence[Tuple[Path, int]],
+        min_size: int = 0,
+        workers: int = 4,
+    ) -> List[List[Path]]:
+        """
+        Find groups of byte-identical files.
+
+        Candidates are narrowed by size first, then by a hash of the first
+        PARTIAL_HASH_BYTES, and only then by a full MD5.
+
+        Args:
+            files_with_sizes: Sequence of (file_path, file_size) tuples
+            min_size: Files smaller than this are never deduplicated
+            workers: Number of hashing threads
+
+        Returns:
+            List of duplicate groups, each sorted by path (first entry is the canonical copy)
+        """
+        by_size: Dict[int, List[Path]] = {}
+        for file_path, file_size in files_with_sizes:
+            if file_size >= min_size:
+                by_size.setdefault(file_size, []).append(file_path)
+
+        candidates = [paths for paths in by_size.values() if len(paths) > 1]
+        if not candidates:
+            return []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # 1. Partial hash to discard files that only share a size
+            candidates = FileDeduplicator._split_by_hash(
+                executor, candidates, FileDeduplicator._partial_md5
+            )
+            # 2. Full hash on what remains
+            groups = FileDeduplicator._split_by_hash(
+                executor, candidates, FileDeduplicator._full_md5
+            )
+
+        return [sorted(group, key=str) for group in groups]
+
+    @staticmethod
+    def _split_by_hash(executor, groups, hash_func) -> List[List[Path]]:
+        """Refine each group by `hash_func`, keeping only sub-groups with 2+ files."""
+        paths = [path for group in groups for path in group]
+        digests = dict(zip(paths, executor.map(hash_func, paths)))
+
+        refined = []
+        for group in groups:
+            by_digest: Dict[str, List[Path]] = {}
+            for path in group:
+                digest = digests[path]
+                if digest is not None:
+                    by_digest.setdefault(digest, []).append(path)
+            refined.extend(sub for sub in by_digest.values() if len(sub) > 1)
+        return refined
+
+    @staticmethod
+    def _partial_md5(file_path: Path):
+        try:
+            with open(file_path, 'rb') as f:
+                return hashlib.md5(f.read(PARTIAL_HASH_BYTES)).hexdigest()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _full_md5(file_path: Path, chunk_size: int = 1024 * 1024):
+        md5 = hashlib.md5()
+        try:
+            with open(file_path, 'rb') as f:
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    md5.update(data)
+        except OSError:
+            return None
+        return md5.hexdigest()
+
+    @staticmethod
+    def generate_materialize_script(output_folder: Path, links: Sequence[Tuple[str, str]], logger=None) -> Path:
+        """
+        Generate the device-side script that recreates duplicates from their canonical copy.
+
+        The script is run by unified.sh from the transfer root once chunks and
+        bundles are restored. It tries a hard link once and falls back to `cp`
+        for every file when the filesystem does not support links (e.g. /sdcard).
+
+        Args:
+            output_folder: Local folder where the script is written
+            links: List of (canonical_rel_path, duplicate_rel_path) POSIX paths
+            logger: Optional logger instance
+
+        Returns:
+            Path to the generated script
+        """
+        script_path = output_folder / DEDUP_SCRIPT_NAME
+
+        lines = [
+            '#!/system/bin/sh',
+            '# Generated by ADB Transfer - recreates deduplicated files',
+            '# Usage: sh dedup_links.sh <transfer_root>',
+            'cd "$1" || exit 1',
+            'FAILED=0',
+            'USE_LN=0',
+        ]
+        if links:
+            first_src, first_dst = links[0]
+            probe_dst = f"{first_dst}.lnprobe"
+            lines.append(
+                f"mkdir -p {shlex.quote(str(Path(first_dst).parent.as_posix()))} && "
+                f"ln {shlex.quote(first_src)} {shlex.quote(probe_dst)} 2>/dev/null && "
+                f"rm -f {shlex.quote(probe_dst)} && USE_LN=1"
+            )
+
+        created_dirs = set()
+        for canonical, duplicate in links:
+            parent = Path(duplicate).parent.as_posix()
+            if parent not in ('', '.') and parent not in created_dirs:
+                lines.append(f"mkdir -p {shlex.quote(parent)}")
+                created_dirs.add(parent)
+            src = shlex.quote(canonical)
+            dst = shlex.quote(duplicate)
+            lines.append(
+                f'{{ [ "$USE_LN" -eq 1 ] && ln -f {src} {dst} 2>/dev/null; }} || cp -f {src} {dst} || FAILED=$((FAILED + 1))'
+            )
+
+        lines.append('echo "Dedup copies: ' + str(len(links)) + ', failed: $FAILED"')
+        lines.append('[ "$FAILED" -eq 0 ]')
+
+        # Write script with Unix line endings
+        with open(script_path, 'w', newline='\n', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        if logger: logger.info(f"Script de déduplication généré: {script_path.name} ({len(links)} copies)")
+        return script_path
@@ -0,0 +1,304 @@
+"""
+Path Filter - gitignore-style include/exclude rules plus size and mtime predicates
+Rules are compiled once into a few regexes; excluded directories are pruned before descent
+"""
+
+import hashlib
+import json
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+_AGE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_size(value) -> Optional[int]:
+    """Parse a size such as 4096, "512K", "10MB" or "1.5G" into bytes."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)(?:i?B)?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Taille invalide: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def parse_time(value, now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a point in time into a POSIX timestamp.
+
+    Accepts a timestamp, an ISO date ("2024-05-01", "2024-05-01T12:00") or an
+    age relative to now ("30m", "12h", "7d", "2w").
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([mhdw])", text)
+    if match:
+        now = time.time() if now is None else now
+        return now - float(match.group(1)) * _AGE_UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise ValueError(f"Date invalide: {value!r}")
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob (without leading/trailing slash handling) into a regex."""
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                at_start = i == 0 or pattern[i - 1] == '/'
+                at_end = i + 2 == n or pattern[i + 2] == '/'
+                if at_start and at_end:
+                    if i + 2 == n:
+                        out.append('.*')           # "foo/**": everything inside
+                    else:
+                        out.append('(?:.*/)?')     # "**/" zero or more directories
+                        i += 1                     # also consume the slash
+                    i += 2
+                    continue
+            out.append('[^/]*')
+            while i < n and pattern[i] == '*':
+                i += 1
+            continue
+        if c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2 if pattern.startswith('[!', i) or pattern.startswith('[^', i) else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class _Rule:
+    """One parsed gitignore line."""
+
+    __slots__ = ("negate", "dir_only", "anchored", "regex", "suffix")
+
+    def __init__(self, line: str):
+        self.negate = line.startswith('!')
+        if self.negate:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:]                # "\!name" / "\#name" literal
+        self.dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        # A slash anywhere but the end anchors the pattern to the root,
+        # otherwise it matches the basename at any depth
+        self.anchored = '/' in line
+        line = line.lstrip('/')
+        self.regex = _translate_glob(line)
+        # "*.ext" style rules (the common case) skip the regex engine entirely
+        self.suffix = None
+        if not self.anchored and line.startswith('*') and not any(c in line[1:] for c in '*?[\\'):
+            self.suffix = line[1:]
+
+
+def _parse_rules(lines: Sequence[str]) -> List[_Rule]:
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip()
+        if not line or line.startswith('#'):
+            continue
+        rules.append(_Rule(line))
+    return rules
+
+
+def _alternation(regexes: List[str]) -> Optional["re.Pattern"]:
+    if not regexes:
+        return None
+    return re.compile('(?:' + '|'.join(regexes) + r')\Z', re.DOTALL)
+
+
+class _RuleGroup:
+    """
+    Consecutive rules with the same sign, merged into one regex per kind.
+
+    Basename rules are matched against the entry name only, anchored rules
+    against the path relative to the scan root.
+    """
+
+    __slots__ = ("negate", "suffixes", "name_any", "path_any", "name_dir", "path_dir")
+
+    def __init__(self, negate: bool, rules: List[_Rule]):
+        self.negate = negate
+        self.suffixes = tuple(r.suffix for r in rules if r.suffix is not None and not r.dir_only)
+        self.name_any = _alternation([r.regex for r in rules if not r.anchored and not r.dir_only and r.suffix is None])
+        self.path_any = _alternation([r.regex for r in rules if r.anchored and not r.dir_only])
+        self.name_dir = _alternation([r.regex for r in rules if not r.anchored and r.dir_only])
+        self.path_dir = _alternation([r.regex for r in rules if r.anchored and r.dir_only])
+
+    def matches(self, rel_path: str, name: str, is_dir: bool) -> bool:
+        if self.suffixes and name.endswith(self.suffixes):
+            return True
+        if self.name_any is not None and self.name_any.match(name):
+            return True
+        if self.path_any is not None and self.path_any.match(rel_path):
+            return True
+        if is_dir:
+            if self.name_dir is not None and self.name_dir.match(name):
+                return True
+            if self.path_dir is not None and self.path_dir.match(rel_path):
+                return True
+        return False
+
+
+class PathFilter:
+    """
+    Compiled include/exclude matcher used by the scanner.
+
+    - `exclude`: gitignore lines (`*`, `?`, `[...]`, `**`, trailing `/` for
+      directories, leading or inner `/` to anchor, `!` to re-include). The
+      last matching line wins; an excluded directory is pruned and nothing
+      below it can be re-included, exactly like git.
+    - `include`: gitignore patterns; when present, only files matching one
+      of them (or lying under a matching directory) are kept.
+    - `min_size` / `max_size`: bytes or "512K", "10MB", "2G".
+    - `modified_after` / `modified_before`: ISO date or age ("7d", "12h").
+
+    Name and path rules only depend on the tree layout and are applied
+    inside the walk (and cached by the scan journal, see `rules_key`).
+    Size and mtime predicates are applied to every file record on each run.
+    """
+
+    def __init__(
+        self,
+        exclude: Sequence[str] = (),
+        include: Sequence[str] = (),
+        min_size=None,
+        max_size=None,
+        modified_after=None,
+        modified_before=None,
+    ):
+        self.exclude_lines = list(exclude)
+        self.include_lines = list(include)
+        self.min_size = parse_size(min_size)
+        self.max_size = parse_size(max_size)
+        self.modified_after = parse_time(modified_after)
+        self.modified_before = parse_time(modified_before)
+
+        # Exclude rules: groups evaluated from the last one, first hit decides
+        self._groups: List[_RuleGroup] = []
+        run: List[_Rule] = []
+        for rule in _parse_rules(self.exclude_lines):
+            if run and run[-1].negate != rule.negate:
+                self._groups.append(_RuleGroup(run[0].negate, run))
+                run = []
+            run.append(rule)
+        if run:
+            self._groups.append(_RuleGroup(run[0].negate, run))
+        self._groups.reverse()
+
+        # Include rules: a file is kept if it, or one of its parent
+        # directories, matches one of the patterns
+        include_rules = [rule for rule in _parse_rules(self.include_lines) if not rule.negate]
+        self._include_suffixes = tuple(r.suffix for r in include_rules if r.suffix is not None and not r.dir_only)
+        self._include_name = _alternation(
+            [r.regex for r in include_rules if not r.anchored and not r.dir_only and r.suffix is None]
+        )
+        self._include_path = _alternation(
+            [r.regex + ('/.+' if r.dir_only else '(?:/.+)?') for r in include_rules if r.anchored]
+        )
+        self._include_parent = _alternation(
+            ['(?:.*/)?' + r.regex + '/.+' for r in include_rules if not r.anchored]
+        )
+        self._has_include = bool(include_rules)
+        self._has_stat_predicates = any(
+            value is not None for value in (self.min_size, self.max_size, self.modified_after, self.modified_before)
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict, source_dir=None) -> Optional["PathFilter"]:
+        """
+        Build the filter for a transfer job from `config["filter_rules"]`.
+
+        `filter_rules` maps a source folder to its rules; the `"*"` entry
+        applies to every job. Exclude/include lists are concatenated (job
+        rules last, so they win), scalar predicates from the job override
+        the defaults.
+
+        Returns:
+            PathFilter instance, or None when no rule is configured
+        """
+        all_rules = config.get("filter_rules") or {}
+        merged: Dict = {"exclude": [], "include": []}
+        keys = ["*"]
+        if source_dir is not None:
+            keys.append(str(source_dir))
+        for key in keys:
+            rules = all_rules.get(key) or {}
+            for name, value in rules.items():
+                if name in ("exclude", "include"):
+                    merged[name].extend([value] if isinstance(value, str) else value)
+                else:
+                    merged[name] = value
+
+        if not any(merged.values()):
+            return None
+        return cls(**merged)
+
+    @property
+    def rules_key(self) -> str:
+        """Fingerprint of the rules applied inside the walk (for the scan journal)."""
+        payload = json.dumps([self.exclude_lines, self.include_lines], separators=(',', ':'))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    def is_excluded(self, rel_path: str, name: str, is_dir: bool) -> bool:
+        """True if the exclude rules reject this entry (directories: prune the subtree)."""
+        for group in self._groups:
+            if group.matches(rel_path, name, is_dir):
+                return not group.negate
+        return False
+
+    def prune_dir(self, rel_path: str, name: str) -> bool:
+        """True if the directory must not be descended into."""
+        return bool(self._groups) and self.is_excluded(rel_path, name, True)
+
+    def accept_name(self, rel_path: str, name: str) -> bool:
+        """Path rules for a file, checked before it is stat'ed."""
+        if self._groups and self.is_excluded(rel_path, name, False):
+            return False
+        if self._has_include:
+            return bool(
+                (self._include_suffixes and name.endswith(self._include_suffixes))
+                or (self._include_name is not None and self._include_name.match(name))
+                or (self._include_path is not None and self._include_path.match(rel_path))
+                or (self._include_parent is not None and self._include_parent.match(rel_path))
+            )
+        return True
+
+    def accept_stat(self, size: int, mtime: float) -> bool:
+        """Size and modification time predicates."""
+        if not self._has_stat_predicates:
+            return True
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        if self.modified_after is not None and mtime < self.modified_after:
+            return False
+        if self.modified_before is not None and mtime >= self.modified_before:
+            return False
+        return True
@@ -0,0 +1,181 @@
+"""
+File Inventory - Array-backed list of scanned files for multi-million-file sources
+Directories are interned once, basenames live in a single UTF-8 buffer, sizes and
+mtimes in typed arrays; Path objects are only built on demand
+"""
+
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+
+class FileInventory:
+    """
+    Columnar store of (path, size, mtime) records.
+
+    Per file it keeps a directory id (4 bytes), a basename offset (8 bytes),
+    the UTF-8 basename, the size and the mtime (8 bytes each) - instead of a
+    Path object, a tuple and two boxed numbers.
+
+    Files of one directory are expected to be added together and in name
+    order (DirectoryScanner does both), which makes `path_order()` a pure
+    integer sort.
+    """
+
+    def __init__(self):
+        self.dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self.dir_index = array('I')
+        self.name_offsets = array('Q', [0])
+        self.names = bytearray()
+        self.sizes = array('q')
+        self.mtimes = array('d')
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def add(self, path, size: int, mtime: float) -> int:
+        """Add one file and return its index."""
+        dir_path, name = os.path.split(os.fspath(path))
+        dir_id = self._dir_ids.get(dir_path)
+        if dir_id is None:
+            dir_id = self._dir_ids[dir_path] = len(self.dirs)
+            self.dirs.append(dir_path)
+        self.dir_index.append(dir_id)
+        self.names += name.encode('utf-8', 'surrogateescape')
+        self.name_offsets.append(len(self.names))
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        return len(self.sizes) - 1
+
+    def extend(self, records: Iterable[Sequence]) -> None:
+        """Add (path, size, mtime) records, e.g. straight from DirectoryScanner.iter_scan()."""
+        for path, size, mtime in records:
+            self.add(path, size, mtime)
+
+    def name(self, index: int) -> str:
+        return self.names[self.name_offsets[index]:self.name_offsets[index + 1]].decode('utf-8', 'surrogateescape')
+
+    def path_str(self, index: int) -> str:
+        return os.path.join(self.dirs[self.dir_index[index]], self.name(index))
+
+    def path(self, index: int) -> Path:
+        return Path(self.path_str(index))
+
+    def path_order(self) -> array:
+        """All indices ordered by (directory path, name) - deterministic across runs."""
+        dir_rank = array('I', bytes(4 * len(self.dirs)))
+        for rank, dir_id in enumerate(sorted(range(len(self.dirs)), key=self.dirs.__getitem__)):
+            dir_rank[dir_id] = rank
+        dir_index = self.dir_index
+        # Names are already in order inside each directory, so the insertion
+        # index breaks ties without decoding a single basename
+        return array('I', sorted(range(len(self)), key=lambda i: (dir_rank[dir_index[i]] << 32) | i))
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the inventory columns."""
+        return (
+            self.dir_index.itemsize * len(self.dir_index)
+            + self.name_offsets.itemsize * len(self.name_offsets)
+            + len(self.names)
+            + self.sizes.itemsize * len(self.sizes)
+            + self.mtimes.itemsize * len(self.mtimes)
+            + sum(len(d) + 49 for d in self.dirs)
+        )
+
+
+class FileEntry:
+    """
+    Lightweight view of one inventory record.
+
+    Unpacks like the `(file_path, file_size)` tuples used across the
+    transfer code, so it can be passed to BundlePacker, FileDeduplicator
+    and `_write_bundle` unchanged.
+    """
+
+    __slots__ = ("inventory", "index")
+
+    def __init__(self, inventory: FileInventory, index: int):
+        self.inventory = inventory
+        self.index = index
+
+    @property
+    def path(self) -> Path:
+        return self.inventory.path(self.index)
+
+    @property
+    def path_str(self) -> str:
+        return self.inventory.path_str(self.index)
+
+    @property
+    def size(self) -> int:
+        return self.inventory.sizes[self.index]
+
+    @property
+    def mtime(self) -> float:
+        return self.inventory.mtimes[self.index]
+
+    def __iter__(self):
+        yield self.path
+        yield self.size
+
+    def __getitem__(self, key):
+        if key == 0:
+            return self.path
+        if key == 1:
+            return self.size
+        raise IndexError(key)
+
+    def __len__(self):
+        return 2
+
+    def __repr__(self):
+        return f"FileEntry({self.path_str!r}, {self.size})"
+
+
+class InventoryView:
+    """
+    Ordered subset of an inventory (e.g. files to chunk, files to bundle).
+
+    Only an array of 4-byte indices is stored; entries are created while
+    iterating and dropped right after.
+    """
+
+    def __init__(self, inventory: FileInventory, indices: Iterable[int] = ()):
+        self.inventory = inventory
+        self.indices = array('I', indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __bool__(self) -> bool:
+        return len(self.indices) > 0
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        inventory = self.inventory
+        for index in self.indices:
+            yield FileEntry(inventory, index)
+
+    def __getitem__(self, position: int) -> FileEntry:
+        return FileEntry(self.inventory, self.indices[position])
+
+    def add(self, path, size: int, mtime: float) -> FileEntry:
+        """Add a new file to the inventory and to this view."""
+        index = self.inventory.add(path, size, mtime)
+        self.indices.append(index)
+        return FileEntry(self.inventory, index)
+
+    def sizes(self) -> array:
+        """Sizes in view order, as a typed array (input for BundlePacker.*_indices)."""
+        inventory_sizes = self.inventory.sizes
+        return array('q', (inventory_sizes[index] for index in self.indices))
+
+    def entries(self, positions: Iterable[int]) -> List[FileEntry]:
+        """Entries for positions in this view (e.g. one packed bundle)."""
+        return [self[position] for position in positions]
+
+    def exclude(self, path_strs) -> "InventoryView":
+        """New view without the files whose path string is in `path_strs`."""
+        path_str = self.inventory.path_str
+        return InventoryView(self.inventory, (i for i in self.indices if path_str(i) not in path_strs))
@@ -0,0 +1,127 @@
+"""
+Transfer Ledger - Local journal of confirmed pushes per (device, remote directory)
+Resume is computed from the journal and validated by one remote listing
+instead of one `stat` round-trip per chunk
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+LEDGER_VERSION = 1
+
+
+def local_digest(local_path, size: Optional[int] = None) -> str:
+    """Cheap fingerprint of a local file (size and mtime), for files without a content hash."""
+    st = os.stat(local_path)
+    return f"{st.st_size if size is None else size}:{st.st_mtime_ns}"
+
+
+class TransferLedger:
+    """
+    Append-only JSON-lines journal of the files pushed to one device.
+
+    Every confirmed push appends `{"r": remote_path, "s": size, "d": digest}`
+    and flushes the line, so the journal survives a crash of the app (a torn
+    last line is ignored on load). The latest line for a remote path wins.
+
+    On resume, `validate(listing)` keeps only the entries whose file is
+    still on the device with the same size (one batched listing, see
+    `TransferManager._list_remote_files`) and compacts the journal.
+    """
+
+    def __init__(self, ledger_path: Path, device_id: str, remote_root: str, logger=None):
+        self.ledger_path = Path(ledger_path)
+        self.device_id = device_id
+        self.remote_root = remote_root
+        self.logger = logger
+        self.entries: Dict[str, tuple] = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """Read the journal; returns the number of entries."""
+        self.entries = {}
+        try:
+            with open(self.ledger_path, 'r', encoding='utf-8') as f:
+                header = None
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write from a crash
+                    if header is None:
+                        header = record
+                        if (header.get("version") != LEDGER_VERSION or header.get("device") != self.device_id
+                                or header.get("root") != self.remote_root):
+                            return 0
+                        continue
+                    self.entries[record["r"]] = (record["s"], record["d"])
+        except OSError:
+            pass
+        return len(self.entries)
+
+    def validate(self, listing: Dict[str, int]) -> int:
+        """
+        Drop entries whose file is gone or has another size on the device, then compact.
+
+        Args:
+            listing: remote path -> size, from one listing of the remote directory
+
+        Returns:
+            Number of entries dropped
+        """
+        before = len(self.entries)
+        self.entries = {
+            remote: (size, digest) for remote, (size, digest) in self.entries.items()
+            if listing.get(remote) == size
+        }
+        self._rewrite()
+        return before - len(self.entries)
+
+    def is_confirmed(self, remote_path: str, size: int, digest: str) -> bool:
+        """True if this exact content (size and digest) was pushed to `remote_path`."""
+        return self.entries.get(remote_path) == (size, digest)
+
+    def record(self, remote_path: str, size: int, digest: str):
+        """Append one confirmed push."""
+        with self._lock:
+            self.entries[remote_path] = (size, digest)
+            if self._file is None:
+                self._open(append=True)
+            self._file.write(json.dumps({"r": remote_path, "s": size, "d": digest}, separators=(',', ':')) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self, append: bool):
+        exists = append and self.ledger_path.exists() and self.ledger_path.stat().st_size > 0
+        self._file = open(self.ledger_path, 'a' if append else 'w', encoding='utf-8')
+        if not exists:
+            self._file.write(json.dumps(self._header()) + "\n")
+
+    def _header(self) -> Dict:
+        return {"version": LEDGER_VERSION, "device": self.device_id, "root": self.remote_root}
+
+    def _rewrite(self):
+        """Replace the journal with one line per live entry (atomic)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            tmp_path = self.ledger_path.with_suffix('.tmp')
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(json.dumps(self._header()) + "\n")
+                    for remote, (size, digest) in self.entries.items():
+                        f.write(json.dumps({"r": remote, "s": size, "d": digest}, separators=(',', ':')) + "\n")
+                os.replace(tmp_path, self.ledger_path)
+            except OSError as e:
+                if self.logger:
+                    self.logger.warning(f"[{self.device_id}] Impossible de compacter le journal de transfert: {e}")
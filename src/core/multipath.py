@@ -0,0 +1,120 @@
+"""
+Multi-path Striping - Pushes to one phone over all of its transports (USB and WiFi)
+The same physical device can be visible as a USB serial and as ip:port; each push
+goes to the link expected to finish it first, following the measured throughput
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+MB = 1024 * 1024
+
+
+class _Link:
+    __slots__ = ("rate", "inflight", "failures", "alive", "down_since", "bytes", "items")
+
+    def __init__(self):
+        self.rate: Optional[float] = None  # Smoothed bytes/s of one push on this link
+        self.inflight = 0                  # Bytes of the pushes running on this link
+        self.failures = 0                  # Consecutive failures
+        self.alive = True
+        self.down_since = 0.0
+        self.bytes = 0
+        self.items = 0
+
+
+class MultipathStriper:
+    """
+    Weighted striping of pushes across the transports of one device.
+
+    - `pick(size)` returns the transport (adb device id) whose pending
+      bytes plus this push finish first at its measured rate, so each link
+      gets a share of the traffic proportional to its throughput. Links
+      without a measurement yet share the work evenly.
+    - `done(transport, size, seconds, success)` feeds the measurements
+      (`success` None: the push was killed on purpose, nothing is learned).
+      After `max_failures` consecutive failures a link is considered
+      dropped and the others take over; it gets one probe push again after
+      `probe_after_s`. When every link is down the first one keeps being
+      used, so the retry policy and circuit breaker decide.
+    """
+
+    def __init__(self, transports: List[str], logger=None, name: str = "", smoothing: float = 0.3,
+                 max_failures: int = 3, probe_after_s: float = 30.0):
+        self.transports = list(transports)
+        self.logger = logger
+        self.name = name or self.transports[0]
+        self.smoothing = smoothing
+        self.max_failures = max_failures
+        self.probe_after_s = probe_after_s
+        self._links: Dict[str, _Link] = {t: _Link() for t in self.transports}
+        self._lock = threading.Lock()
+
+    def pick(self, size: int) -> str:
+        now = time.monotonic()
+        with self._lock:
+            for transport, link in self._links.items():
+                if not link.alive and now - link.down_since >= self.probe_after_s:
+                    link.alive = True
+                    link.failures = self.max_failures - 1  # One failed probe drops it again
+                    self._log(f"Nouvel essai du lien {transport}")
+            alive = [t for t in self.transports if self._links[t].alive] or self.transports[:1]
+            known = [self._links[t].rate for t in alive if self._links[t].rate]
+            default_rate = max(known) if known else 1.0
+            transport = min(
+                alive,
+                key=lambda t: (self._links[t].inflight + size) / (self._links[t].rate or default_rate)
+            )
+            self._links[transport].inflight += size
+            return transport
+
+    def done(self, transport: str, size: int, seconds: Optional[float], success: Optional[bool]):
+        with self._lock:
+            link = self._links[transport]
+            link.inflight = max(0, link.inflight - size)
+            if success is None:
+                return
+            if success:
+                link.failures = 0
+                link.bytes += size
+                link.items += 1
+                if seconds:
+                    sample = size / max(seconds, 1e-3)
+                    link.rate = sample if link.rate is None else (
+                        self.smoothing * sample + (1 - self.smoothing) * link.rate
+                    )
+                return
+            link.failures += 1
+            if link.alive and link.failures >= self.max_failures and len(self.transports) > 1:
+                link.alive = False
+                link.down_since = time.monotonic()
+                others = ", ".join(t for t in self.transports if t != transport and self._links[t].alive)
+                self._log(f"Lien {transport} perdu après {link.failures} échecs, bascule sur {others or 'aucun'}", error=True)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                t: {
+                    "bytes": link.bytes,
+                    "items": link.items,
+                    "rate_mbps": round(link.rate / MB, 2) if link.rate else None,
+                    "alive": link.alive,
+                }
+                for t, link in self._links.items()
+            }
+
+    def log_summary(self):
+        if not self.logger:
+            return
+        metrics = self.metrics()
+        total = sum(m["bytes"] for m in metrics.values()) or 1
+        parts = [
+            f"{t}: {m['bytes'] / MB:.1f} MB ({m['bytes'] / total * 100:.0f}%, {m['rate_mbps'] or 0:.1f} MB/s)"
+            for t, m in metrics.items()
+        ]
+        self.logger.info(f"[{self.name}] Multi-chemin: " + ", ".join(parts))
+
+    def _log(self, message: str, error: bool = False):
+        if self.logger:
+            (self.logger.warning if error else self.logger.info)(f"[{self.name}] {message}")
@@ -0,0 +1,321 @@
+"""
+Transfer Planner - Chooses chunk/bundle sizes and worker counts from the scan inventory
+Uses device capabilities and the link throughput measured on previous runs,
+predicts the duration of each phase and compares it with the actual run
+"""
+
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+MB = 1024 * 1024
+
+# Weight of the newest measurement in the throughput averages
+HISTORY_ALPHA = 0.3
+
+# Fallbacks when nothing was measured yet (MB/s)
+DEFAULT_USB_LINK_MBPS = 35.0
+DEFAULT_WIFI_LINK_MBPS = 8.0
+DEFAULT_PREPARE_MBPS = 150.0
+DEFAULT_DEVICE_REASSEMBLY_MBPS = 80.0
+
+# Fixed cost of one `adb push` (process start + handshake), in seconds
+PUSH_OVERHEAD_S = 0.15
+
+# Chunks should take at least this many push overheads to send
+MIN_CHUNK_OVERHEADS = 20
+
+CHUNK_SIZE_BOUNDS = (16 * MB, 256 * MB)
+BUNDLE_SIZE_BOUNDS = (8 * MB, 128 * MB)
+THRESHOLD_BOUNDS = (1 * MB, 64 * MB)
+WORKER_BOUNDS = (1, 8)
+
+
+def _clamp(value, bounds):
+    return max(bounds[0], min(bounds[1], value))
+
+
+def _round_mb_pow2(value):
+    """Round a byte size down to a power-of-two number of MB."""
+    return MB << max(0, int(math.log2(max(1, value // MB))))
+
+
+class ThroughputHistory:
+    """
+    Exponential moving averages of measured rates, kept in the local cache.
+
+    Link throughput is stored per device serial and per worker count, so the
+    planner can pick the concurrency that worked best on that link.
+    """
+
+    def __init__(self, history_path: Path):
+        self.history_path = Path(history_path)
+        self.data = {"devices": {}, "local": {}}
+        self._lock = threading.Lock()
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            if isinstance(loaded, dict):
+                self.data.update(loaded)
+        except (OSError, ValueError):
+            pass
+
+    def _device(self, device_id: str) -> Dict:
+        return self.data["devices"].setdefault(device_id, {"link_by_workers": {}})
+
+    @staticmethod
+    def _average(previous, value):
+        if previous is None:
+            return value
+        return previous + HISTORY_ALPHA * (value - previous)
+
+    def link_mbps(self, device_id: str, workers: Optional[int] = None) -> Optional[float]:
+        device = self.data["devices"].get(device_id, {})
+        if workers is not None:
+            rate = device.get("link_by_workers", {}).get(str(workers))
+            if rate is not None:
+                return rate
+        return device.get("link_mbps")
+
+    def best_workers(self, device_id: str) -> Optional[int]:
+        by_workers = self.data["devices"].get(device_id, {}).get("link_by_workers", {})
+        if not by_workers:
+            return None
+        return int(max(by_workers, key=by_workers.get))
+
+    def local_mbps(self, name: str) -> Optional[float]:
+        return self.data["local"].get(name)
+
+    def device_mbps(self, device_id: str, name: str) -> Optional[float]:
+        return self.data["devices"].get(device_id, {}).get(name)
+
+    def record_link(self, device_id: str, workers: int, total_bytes: int, seconds: float):
+        if total_bytes <= 0 or seconds <= 0:
+            return
+        rate = total_bytes / MB / seconds
+        with self._lock:
+            device = self._device(device_id)
+            device["link_mbps"] = self._average(device.get("link_mbps"), rate)
+            by_workers = device["link_by_workers"]
+            by_workers[str(workers)] = self._average(by_workers.get(str(workers)), rate)
+
+    def record_local(self, name: str, total_bytes: int, seconds: float):
+        if total_bytes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self.data["local"][name] = self._average(self.data["local"].get(name), total_bytes / MB / seconds)
+
+    def record_device(self, device_id: str, name: str, total_bytes: int, seconds: float):
+        if total_bytes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            device = self._device(device_id)
+            device[name] = self._average(device.get(name), total_bytes / MB / seconds)
+
+    def save(self):
+        partial_path = self.history_path.with_suffix(".tmp")
+        with self._lock:
+            try:
+                with open(partial_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, indent=2)
+                os.replace(partial_path, self.history_path)
+            except OSError:
+                pass
+
+
+class TransferPlan:
+    """
+    Concrete plan for one transfer: settings to execute and predicted durations.
+
+    `settings` holds the config keys the plan overrides (chunk_size,
+    small_file_threshold, bundle_size, parallel_processes). `phases` holds
+    the predicted seconds for prepare / transfer / reassembly, `actual` the
+    measured ones.
+    """
+
+    PHASES = ("prepare", "transfer", "reassembly")
+
+    def __init__(self, settings: Dict, stats: Dict, phases: Dict, devices: Dict):
+        self.settings = settings
+        self.stats = stats
+        self.phases = phases
+        self.devices = devices
+        self.actual: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def predicted_total(self) -> float:
+        return sum(self.phases.values())
+
+    def strategy_for(self, file_size: int) -> str:
+        """Per-file strategy: "chunk" (split and reassembled) or "bundle" (zipped with other small files)."""
+        return "chunk" if file_size > self.settings["small_file_threshold"] else "bundle"
+
+    def record_actual(self, phase: str, seconds: float):
+        """Record a measured phase duration (devices run in parallel: keep the slowest)."""
+        with self._lock:
+            self.actual[phase] = max(self.actual.get(phase, 0.0), seconds)
+
+    def log(self, logger, dry_run: bool = False):
+        title = "Plan de transfert (simulation)" if dry_run else "Plan de transfert"
+        s = self.settings
+        st = self.stats
+        logger.info(f"===== {title} =====")
+        logger.info(
+            f"Fichiers: {st['chunk_files']} à fragmenter ({st['chunk_bytes'] / MB:.1f} MB, {st['chunks']} chunks), "
+            f"{st['bundle_files']} en bundles ({st['bundle_bytes'] / MB:.1f} MB, ~{st['bundles']} bundles)"
+        )
+        logger.info(
+            f"Paramètres: chunk {s['chunk_size'] // MB} MB, seuil {s['small_file_threshold'] / MB:.0f} MB, "
+            f"bundle {s['bundle_size'] // MB} MB, {s['parallel_processes']} workers"
+        )
+        for device_id, device in self.devices.items():
+            free = f", {device['free_bytes'] / (1024 * MB):.1f} GB libres" if device.get('free_bytes') is not None else ""
+            logger.info(
+                f"[{device_id}] {device['link']} ~{device['link_mbps']:.1f} MB/s ({device['link_source']}), "
+                f"{device.get('cpus') or '?'} CPU{free}"
+            )
+            if device.get('free_bytes') is not None and device['free_bytes'] < st['staging_bytes']:
+                logger.warning(f"[{device_id}] Espace insuffisant: {st['staging_bytes'] / (1024 * MB):.1f} GB nécessaires")
+        logger.info(
+            "Durée prévue: " + ", ".join(f"{phase} {self.phases[phase]:.1f}s" for phase in self.PHASES)
+            + f" (total {self.predicted_total:.1f}s)"
+        )
+
+    def log_comparison(self, logger):
+        """Log predicted vs measured durations for every phase that was measured."""
+        if not self.actual:
+            return
+        parts = []
+        for phase in self.PHASES:
+            if phase in self.actual:
+                predicted = self.phases[phase]
+                actual = self.actual[phase]
+                error = (actual - predicted) / predicted * 100 if predicted > 0 else 0.0
+                parts.append(f"{phase} {predicted:.1f}s/{actual:.1f}s ({error:+.0f}%)")
+        logger.info("Prévu/réel: " + ", ".join(parts))
+
+
+class TransferPlanner:
+    """
+    Builds a TransferPlan from the scan inventory, device probes and history.
+    """
+
+    def __init__(self, config: Dict, history: ThroughputHistory, logger=None):
+        self.config = config
+        self.history = history
+        self.logger = logger
+
+    @staticmethod
+    def probe_device(adb, device_id: str) -> Dict:
+        """Query CPU count and free space of the device storage."""
+        caps = {"cpus": None, "free_bytes": None, "wifi": ':' in device_id}
+        output = adb.run_command('shell "nproc 2>/dev/null || grep -c ^processor /proc/cpuinfo"', device_id)
+        if output and output[-1].isdigit():
+            caps["cpus"] = int(output[-1])
+        output = adb.run_command('shell "df -k /sdcard 2>/dev/null | tail -1"', device_id)
+        if output:
+            fields = output[-1].split()
+            # Filesystem 1K-blocks Used Available Use% Mounted-on
+            if len(fields) >= 4 and fields[3].isdigit():
+                caps["free_bytes"] = int(fields[3]) * 1024
+        return caps
+
+    def plan(self, files_to_chunk, files_to_batch, device_caps: Dict[str, Dict], auto_tune: bool = True) -> TransferPlan:
+        """
+        Build a plan for the scanned files.
+
+        Args:
+            files_to_chunk: InventoryView of large files (current split)
+            files_to_batch: InventoryView of small files (current split)
+            device_caps: {device_id: probe_device() result}
+            auto_tune: Pick chunk/bundle sizes, threshold and workers; if False the
+                current config values are kept and only durations are predicted
+        """
+        config = self.config
+        sizes = files_to_chunk.sizes() + files_to_batch.sizes()
+        total_bytes = sum(sizes)
+
+        workers = config.get("parallel_processes", 4)
+        chunk_size = config.get("chunk_size", 100 * MB)
+        threshold = config.get("small_file_threshold", 10 * MB)
+        bundle_size = config.get("bundle_size", 50 * MB)
+
+        devices = {}
+        for device_id, caps in device_caps.items():
+            devices[device_id] = dict(caps, link="WiFi" if caps.get("wifi") else "USB")
+
+        if auto_tune and devices:
+            # Concurrency that gave the best throughput on the slowest link
+            best = [self.history.best_workers(device_id) for device_id in devices]
+            best = [w for w in best if w]
+            if best:
+                workers = min(best)
+            workers = _clamp(workers, WORKER_BOUNDS)
+
+        for device_id, device in devices.items():
+            rate = self.history.link_mbps(device_id, workers)
+            device["link_source"] = "historique" if rate else "défaut"
+            device["link_mbps"] = rate or (DEFAULT_WIFI_LINK_MBPS if device.get("wifi") else DEFAULT_USB_LINK_MBPS)
+
+        link_mbps = min((d["link_mbps"] for d in devices.values()), default=DEFAULT_USB_LINK_MBPS)
+        per_worker = link_mbps * MB / max(1, workers)
+
+        if auto_tune:
+            # Files that push in under ~1s are cheaper inside a bundle than on their own
+            threshold = _round_mb_pow2(_clamp(per_worker, THRESHOLD_BOUNDS))
+            large_bytes = sum(size for size in sizes if size > threshold)
+            small_bytes = total_bytes - large_bytes
+
+            # Chunks big enough to amortize the push overhead, small enough
+            # that every worker gets several of them
+            min_chunk = per_worker * PUSH_OVERHEAD_S * MIN_CHUNK_OVERHEADS
+            chunk_size = _round_mb_pow2(_clamp(max(min_chunk, large_bytes / (4 * workers)), CHUNK_SIZE_BOUNDS))
+            # Enough bundles to keep all workers busy
+            bundle_size = _round_mb_pow2(_clamp(small_bytes / (2 * workers), BUNDLE_SIZE_BOUNDS))
+
+        chunk_sizes = [size for size in sizes if size > threshold]
+        chunk_bytes = sum(chunk_sizes)
+        bundle_bytes = total_bytes - chunk_bytes
+        chunks = sum(-(-size // chunk_size) for size in chunk_sizes)
+        bundles = -(-bundle_bytes // bundle_size) if bundle_bytes else 0
+        if bundles and config.get("balance_bundles", True) and workers > 1:
+            bundles = -(-bundles // workers) * workers
+
+        stats = {
+            "chunk_files": len(chunk_sizes),
+            "chunk_bytes": chunk_bytes,
+            "chunks": chunks,
+            "bundle_files": len(sizes) - len(chunk_sizes),
+            "bundle_bytes": bundle_bytes,
+            "bundles": bundles,
+            # Chunks and final files coexist on the device until reassembly ends
+            "staging_bytes": total_bytes + chunk_bytes,
+        }
+
+        prepare_mbps = self.history.local_mbps("prepare_mbps") or DEFAULT_PREPARE_MBPS
+        transfer = 0.0
+        reassembly = 0.0
+        push_items = chunks + bundles
+        for device_id, device in devices.items():
+            rate = device["link_mbps"] * MB
+            device_transfer = total_bytes / rate + push_items * PUSH_OVERHEAD_S / max(1, workers)
+            device_rate = (self.history.device_mbps(device_id, "reassembly_mbps") or DEFAULT_DEVICE_REASSEMBLY_MBPS) * MB
+            transfer = max(transfer, device_transfer)
+            reassembly = max(reassembly, total_bytes / device_rate)
+
+        phases = {
+            "prepare": total_bytes / (prepare_mbps * MB),
+            "transfer": transfer,
+            "reassembly": reassembly,
+        }
+        settings = {
+            "chunk_size": int(chunk_size),
+            "small_file_threshold": int(threshold),
+            "bundle_size": int(bundle_size),
+            "parallel_processes": int(workers),
+        }
+        return TransferPlan(settings, stats, phases, devices)
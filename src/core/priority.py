@@ -0,0 +1,121 @@
+"""
+Priority Classes - Path rules that decide which files reach the devices first
+Classes are ranked by priority then deadline; the push order, the bundle grouping
+and the on-device reassembly order (PRIORITY_ORDER_NAME) all follow the rank
+"""
+
+import math
+import time
+from typing import Dict, List, Optional
+
+from core.filters import PathFilter
+
+# Reassembly order read by unified.sh (one path relative to the transfer root per line)
+PRIORITY_ORDER_NAME = ".priority_order"
+
+DEFAULT_CLASS_NAME = "défaut"
+
+
+class PriorityClasses:
+    """
+    Ordered list of priority classes.
+
+    Each class is a dict from `config["priority_classes"]`:
+    - `name`: label used in the logs
+    - `patterns`: gitignore patterns relative to the source folder
+      (same syntax as the include rules of core/filters.py)
+    - `priority`: lower goes first (default 0)
+    - `deadline_s`: optional, seconds after the start of the push phase
+
+    Classes are ranked by (priority, deadline), so among equal priorities the
+    earliest deadline goes first. A file takes the rank of the first class it
+    matches; unmatched files get the last rank (default class).
+    """
+
+    def __init__(self, classes: List[Dict], aging_items: int = 0):
+        ranked = sorted(
+            (c for c in classes if c.get("patterns")),
+            key=lambda c: (c.get("priority", 0), c.get("deadline_s") or math.inf)
+        )
+        self.names = [c.get("name") or f"classe {i}" for i, c in enumerate(ranked)] + [DEFAULT_CLASS_NAME]
+        self.deadlines = [c.get("deadline_s") for c in ranked] + [None]
+        self._matchers = [PathFilter(include=c["patterns"]) for c in ranked]
+        self.aging_items = aging_items
+        self.default_rank = len(ranked)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["PriorityClasses"]:
+        """Build the classes from `config["priority_classes"]`, None when none is configured."""
+        classes = config.get("priority_classes") or []
+        if not any(c.get("patterns") for c in classes):
+            return None
+        return cls(classes, aging_items=config.get("priority_aging_items", 0))
+
+    def rank(self, rel_path: str) -> int:
+        """Rank of a file from its path relative to the source folder ('/' separators)."""
+        name = rel_path.rsplit('/', 1)[-1]
+        for rank, matcher in enumerate(self._matchers):
+            if matcher.accept_name(rel_path, name):
+                return rank
+        return self.default_rank
+
+    def stream_key(self, rank: int, sequence: int) -> int:
+        """
+        Aged rank of a streamed file that entered the window as record `sequence`.
+
+        Every `aging_items` records a waiting file gains one rank, so a steady
+        flow of high-priority files cannot starve the others.
+        """
+        if not self.aging_items:
+            return rank
+        return rank + sequence // self.aging_items
+
+
+class DeadlineTracker:
+    """Follows how many items of each class are left and reports met or missed deadlines."""
+
+    def __init__(self, classes: PriorityClasses, item_ranks: Dict[str, int], logger=None, name: str = ""):
+        self.classes = classes
+        self.logger = logger
+        self.prefix = f"[{name}] " if name else ""
+        self.started = time.monotonic()
+        self._item_ranks = item_ranks
+        self._left: Dict[int, int] = {}
+        self._missed = set()
+
+    def add(self, local_path: str):
+        rank = self._item_ranks.get(local_path)
+        if rank is not None:
+            self._left[rank] = self._left.get(rank, 0) + 1
+
+    def done(self, local_path: str):
+        rank = self._item_ranks.get(local_path)
+        if rank is None or rank not in self._left:
+            return
+        elapsed = time.monotonic() - self.started
+        self._check_missed(elapsed)
+        self._left[rank] -= 1
+        if self._left[rank]:
+            return
+        del self._left[rank]
+        if not self.logger:
+            return
+        deadline = self.classes.deadlines[rank]
+        message = f"{self.prefix}Classe '{self.classes.names[rank]}' transférée en {elapsed:.1f}s"
+        if deadline is None:
+            self.logger.info(message)
+        elif elapsed <= deadline:
+            self.logger.success(f"{message} (échéance {deadline}s respectée)")
+        else:
+            self.logger.warning(f"{message} (échéance {deadline}s dépassée)")
+
+    def _check_missed(self, elapsed: float):
+        for rank in self._left:
+            deadline = self.classes.deadlines[rank]
+            if deadline is not None and elapsed > deadline and rank not in self._missed:
+                self._missed.add(rank)
+                if self.logger:
+                    self.logger.warning(
+                        f"{self.prefix}Échéance de {deadline}s dépassée pour la classe "
+                        f"'{self.classes.names[rank]}' ({self._left[rank]} fichier(s) restant(s))"
+                    )
@@ -0,0 +1,252 @@
+"""
+Transfer Progress - Byte-level progress, throughput and ETA per device
+Every finished push feeds the tracker, which publishes structured ProgressEvent
+objects to its subscribers (UI, logs) instead of ad-hoc log strings
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+MB = 1024 * 1024
+
+# Phases in execution order; the ETA adds the estimates of the phases still ahead
+PHASES = ("scan", "prepare", "transfer", "reassembly", "done")
+
+
+class ProgressEvent:
+    """
+    One progress update.
+
+    kind: "phase" (phase change), "start" (device starts pushing),
+    "item" (one push finished), "device_done"
+    Byte counts, rates (MB/s) and ETA (seconds) are None when unknown.
+    `devices` holds the per-device snapshot, `aggregate` the sum over devices.
+    """
+
+    __slots__ = ("kind", "time", "phase", "device_id", "devices", "aggregate", "eta_s")
+
+    def __init__(self, kind: str, phase: str, device_id: Optional[str], devices: Dict[str, Dict],
+                 aggregate: Dict, eta_s: Optional[float]):
+        self.kind = kind
+        self.time = time.time()
+        self.phase = phase
+        self.device_id = device_id
+        self.devices = devices
+        self.aggregate = aggregate
+        self.eta_s = eta_s
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _DeviceProgress:
+    __slots__ = ("bytes_total", "files_total", "bytes_done", "files_done", "samples",
+                 "smoothed", "started", "finished", "success", "last_log")
+
+    def __init__(self, bytes_total: Optional[int], files_total: Optional[int]):
+        self.bytes_total = bytes_total
+        self.files_total = files_total
+        self.bytes_done = 0
+        self.files_done = 0
+        self.samples = deque()     # (time, bytes) of the pushes finished in the rate window
+        self.smoothed: Optional[float] = None
+        self.started = time.monotonic()
+        self.finished = False
+        self.success = None
+        self.last_log = self.started
+
+
+class ProgressTracker:
+    """
+    Byte-accurate progress of a transfer, shared by the device managers of a run.
+
+    - Instantaneous rate: bytes finished in the last `window_s` seconds.
+    - Smoothed rate: exponential moving average of the instantaneous rate.
+    - Device ETA: remaining bytes / smoothed rate. Run ETA: the slowest
+      device, plus the predicted duration of the phases after the transfer
+      (reassembly and move) from the transfer plan. Before the transfer the
+      remaining prepare time and the predicted transfer time are used.
+
+    Subscribers are called from the pushing threads and must be quick and
+    thread-safe; a UI can also poll `snapshot()` from its own thread.
+    """
+
+    def __init__(self, logger=None, window_s: float = 3.0, smoothing: float = 0.3, log_interval_s: float = 5.0):
+        self.logger = logger
+        self.window_s = window_s
+        self.smoothing = smoothing
+        self.log_interval_s = log_interval_s
+        self._subscribers: List[Callable[[ProgressEvent], None]] = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget the previous run (subscribers are kept)."""
+        with self._lock:
+            self.phase = "scan"
+            self._phase_started = time.monotonic()
+            self._estimates: Dict[str, float] = {}
+            self._devices: Dict[str, _DeviceProgress] = {}
+
+    def subscribe(self, callback: Callable[[ProgressEvent], None]):
+        self._subscribers.append(callback)
+
+    def set_estimates(self, phases: Dict[str, float]):
+        """Predicted seconds per phase (TransferPlan.phases)."""
+        with self._lock:
+            self._estimates = dict(phases)
+
+    def set_phase(self, phase: str):
+        with self._lock:
+            if PHASES.index(phase) < PHASES.index(self.phase):
+                return  # Devices run in parallel: never go back
+            self.phase = phase
+            self._phase_started = time.monotonic()
+        self._publish("phase", None)
+
+    def start_device(self, device_id: str, bytes_total: Optional[int] = None, files_total: Optional[int] = None):
+        """A device starts pushing; totals are None when items are streamed."""
+        with self._lock:
+            self._devices[device_id] = _DeviceProgress(bytes_total, files_total)
+        self.set_phase("transfer")
+        self._publish("start", device_id)
+
+    def item_done(self, device_id: str, nbytes: int):
+        """One push finished with `nbytes` bytes written to the device."""
+        now = time.monotonic()
+        log = False
+        with self._lock:
+            device = self._devices.get(device_id)
+            if device is None:
+                device = self._devices[device_id] = _DeviceProgress(None, None)
+            device.bytes_done += nbytes
+            device.files_done += 1
+            device.samples.append((now, nbytes))
+            rate = self._instant_rate(device, now)
+            device.smoothed = rate if device.smoothed is None else (
+                self.smoothing * rate + (1 - self.smoothing) * device.smoothed
+            )
+            if now - device.last_log >= self.log_interval_s:
+                device.last_log = now
+                log = True
+        event = self._publish("item", device_id)
+        if log and self.logger:
+            self._log(event)
+
+    def device_done(self, device_id: str, success: bool):
+        with self._lock:
+            device = self._devices.get(device_id)
+            if device is None:
+                return
+            device.finished = True
+            device.success = success
+        self._publish("device_done", device_id)
+
+    def snapshot(self, kind: str = "phase", device_id: Optional[str] = None) -> ProgressEvent:
+        """Current state as an event (without publishing it)."""
+        now = time.monotonic()
+        with self._lock:
+            devices = {}
+            device_etas = []
+            for dev_id, device in self._devices.items():
+                info = self._device_info(device, now)
+                devices[dev_id] = info
+                if not device.finished:
+                    device_etas.append(info["eta_s"])
+            aggregate = {
+                "bytes_done": sum(d["bytes_done"] for d in devices.values()),
+                "files_done": sum(d["files_done"] for d in devices.values()),
+                "bytes_total": (sum(d["bytes_total"] for d in devices.values())
+                                if devices and all(d["bytes_total"] is not None for d in devices.values()) else None),
+                "rate_mbps": sum(d["rate_mbps"] for d in devices.values()),
+                "smoothed_mbps": sum(d["smoothed_mbps"] or 0.0 for d in devices.values() if not d["finished"]),
+            }
+            eta = self._run_eta(device_etas, now)
+            return ProgressEvent(kind, self.phase, device_id, devices, aggregate, eta)
+
+    def _publish(self, kind: str, device_id: Optional[str]) -> ProgressEvent:
+        event = self.snapshot(kind, device_id)
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"Erreur d'un abonné à la progression: {e}")
+        return event
+
+    def _instant_rate(self, device: _DeviceProgress, now: float) -> float:
+        while device.samples and now - device.samples[0][0] > self.window_s:
+            device.samples.popleft()
+        # Before a full window has elapsed, divide by the time since the device started
+        span = min(self.window_s, now - device.started)
+        return sum(nbytes for _, nbytes in device.samples) / span if span > 0 else 0.0
+
+    def _device_info(self, device: _DeviceProgress, now: float) -> Dict:
+        rate = self._instant_rate(device, now) if not device.finished else 0.0
+        remaining = None
+        if device.bytes_total is not None:
+            remaining = max(0, device.bytes_total - device.bytes_done)
+        if device.finished:
+            eta = 0.0
+        elif remaining is not None and device.smoothed:
+            eta = remaining / device.smoothed
+        else:
+            eta = None
+        return {
+            "bytes_done": device.bytes_done,
+            "bytes_total": device.bytes_total,
+            "files_done": device.files_done,
+            "files_total": device.files_total,
+            "percent": (device.bytes_done / device.bytes_total * 100) if device.bytes_total else None,
+            "rate_mbps": rate / MB,
+            "smoothed_mbps": device.smoothed / MB if device.smoothed is not None else None,
+            "eta_s": eta,
+            "elapsed_s": now - device.started,
+            "finished": device.finished,
+            "success": device.success,
+        }
+
+    def _run_eta(self, device_etas: List[Optional[float]], now: float) -> Optional[float]:
+        """Seconds left for the whole run (transfer + later phases), None if unknown."""
+        phase = self.phase
+        if phase == "done":
+            return 0.0
+        in_phase = now - self._phase_started
+        estimates = self._estimates
+        later = PHASES[PHASES.index(phase) + 1:-1]
+        if phase == "transfer":
+            if not device_etas or any(eta is None for eta in device_etas):
+                return None
+            current = max(device_etas)
+        elif phase in estimates:
+            current = max(0.0, estimates[phase] - in_phase)
+        else:
+            return None
+        if any(p not in estimates for p in later):
+            return None
+        return current + sum(estimates[p] for p in later)
+
+    def _log(self, event: ProgressEvent):
+        info = event.devices.get(event.device_id)
+        if not info:
+            return
+        done = info["bytes_done"] / MB
+        if info["bytes_total"]:
+            amount = f"{done:.1f}/{info['bytes_total'] / MB:.1f} MB ({info['percent']:.1f}%)"
+        else:
+            amount = f"{done:.1f} MB ({info['files_done']} fichiers)"
+        smoothed = info["smoothed_mbps"] or 0.0
+        eta = f", ETA {format_duration(event.eta_s)}" if event.eta_s is not None else ""
+        self.logger.info(
+            f"[{event.device_id}] Progression: {amount}, {info['rate_mbps']:.1f} MB/s (lissé {smoothed:.1f}){eta}"
+        )
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format seconds as H:MM:SS ("--:--" when unknown)."""
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,179 @@
+"""
+Shared Read Cache - Reads each pushed file from disk once for all devices of a fan-out
+Blocks are kept in memory until every device has pushed (or skipped) them; a device
+that runs ahead waits for budget, which keeps the devices loosely synchronized
+"""
+
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+MB = 1024 * 1024
+
+
+class _Block:
+    __slots__ = ("data", "size", "pending", "readers", "loaded")
+
+    def __init__(self, size: int, pending: Set[str]):
+        self.data: Optional[bytes] = None
+        self.size = size
+        self.pending = pending      # Devices that still have to push this block
+        self.readers = 0            # Pushes currently streaming the block
+        self.loaded = False
+
+
+class SharedReadCache:
+    """
+    Bounded in-memory cache of local files, keyed by path, shared by the devices of a run.
+
+    - `acquire(device_id, path, size)` returns the file content, reading it
+      from disk only if no other device did it before. When the cache is
+      full it blocks until the slowest devices consume older blocks.
+    - `release(device_id, path)` once the push is done (or failed): the
+      block is evicted as soon as every device has released or skipped it.
+    - `skip(device_id, path)` for files a device does not need (resume).
+    - `finish(device_id)` drops every reference still held by a device.
+
+    Files bigger than the budget, and files requested again after their
+    eviction (retries), are not cached: `acquire` returns None and the
+    caller reads them from disk itself.
+    """
+
+    def __init__(self, device_ids: Iterable[str], budget_bytes: int, logger=None):
+        self.budget = max(0, int(budget_bytes))
+        self.logger = logger
+        self._active: Set[str] = set(device_ids)
+        self._blocks: Dict[str, _Block] = {}
+        self._skipped: Dict[str, Set[str]] = {}
+        self._evicted: Set[str] = set()
+        self._used = 0
+        self._cancelled = False
+        self._condition = threading.Condition()
+        # Statistics
+        self.disk_bytes = 0        # Read from disk by the cache
+        self.served_bytes = 0      # Handed out to pushes
+        self.bypass_bytes = 0      # Left to the caller (too big, evicted)
+        self.peak_bytes = 0
+
+    def acquire(self, device_id: str, path: str, size: int) -> Optional[bytes]:
+        """
+        Content of `path` for one push, or None if the caller must read the file itself.
+
+        Raises:
+            OSError: the file could not be read
+        """
+        with self._condition:
+            block = self._blocks.get(path)
+            if block is None:
+                if (self._cancelled or size > self.budget or path in self._evicted
+                        or device_id not in self._active):
+                    self.bypass_bytes += size
+                    return None
+                # Wait for room: the first device to reach a file loads it
+                while not self._cancelled and self._used and self._used + size > self.budget:
+                    self._condition.wait()
+                    block = self._blocks.get(path)
+                    if block is not None:
+                        break
+                if self._cancelled:
+                    return None
+                if block is None:
+                    pending = self._active - self._skipped.pop(path, set())
+                    block = self._blocks[path] = _Block(size, pending)
+                    self._used += size
+                    self.peak_bytes = max(self.peak_bytes, self._used)
+                    loader = True
+                else:
+                    loader = False
+            else:
+                loader = False
+            block.readers += 1
+
+            if not loader:
+                while not block.loaded and not self._cancelled:
+                    self._condition.wait()
+                if block.data is None:
+                    # Load failed or cancelled: let the caller read the file
+                    block.readers -= 1
+                    self.bypass_bytes += size
+                    return None
+                self.served_bytes += block.size
+                return block.data
+
+        # Read outside the lock so other devices keep pushing cached blocks
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            with self._condition:
+                block.readers -= 1
+                block.loaded = True
+                self._drop(path, block)
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            block.data = data
+            block.loaded = True
+            self.disk_bytes += len(data)
+            self.served_bytes += len(data)
+            self._condition.notify_all()
+        return data
+
+    def release(self, device_id: str, path: str):
+        """The device is done with `path` (pushed or failed)."""
+        with self._condition:
+            block = self._blocks.get(path)
+            if block is None:
+                return
+            block.readers = max(0, block.readers - 1)
+            block.pending.discard(device_id)
+            self._maybe_evict(path, block)
+
+    def skip(self, device_id: str, path: str):
+        """The device will not push `path` (already present on it)."""
+        with self._condition:
+            block = self._blocks.get(path)
+            if block is None:
+                if path not in self._evicted:
+                    self._skipped.setdefault(path, set()).add(device_id)
+                return
+            block.pending.discard(device_id)
+            self._maybe_evict(path, block)
+
+    def finish(self, device_id: str):
+        """The device pushes nothing more: blocks it did not consume stop waiting for it."""
+        with self._condition:
+            self._active.discard(device_id)
+            for path, block in list(self._blocks.items()):
+                block.pending.discard(device_id)
+                self._maybe_evict(path, block)
+
+    def cancel(self):
+        """Wake every waiting push; later calls return None."""
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+
+    def _maybe_evict(self, path: str, block: _Block):
+        if not block.pending and not block.readers and block.loaded:
+            self._drop(path, block)
+            self._evicted.add(path)
+            self._condition.notify_all()
+
+    def _drop(self, path: str, block: _Block):
+        if self._blocks.get(path) is block:
+            del self._blocks[path]
+            self._used -= block.size
+            block.data = None
+
+    def log_summary(self):
+        """Log how many bytes were read from disk versus pushed to the devices."""
+        if not self.logger:
+            return
+        pushed = self.served_bytes + self.bypass_bytes
+        read = self.disk_bytes + self.bypass_bytes
+        ratio = read / pushed * 100 if pushed else 0.0
+        self.logger.info(
+            f"Cache de lecture partagé: {read / MB:.1f} MB lus sur disque pour {pushed / MB:.1f} MB poussés "
+            f"({ratio:.0f}%), pic mémoire {self.peak_bytes / MB:.1f} MB"
+        )
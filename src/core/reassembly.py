@@ -1,7 +1,19 @@
 # claude_v2/src/core/reassembly.py
-import time
+import shlex
+import threading
 from pathlib import Path
 from utils.adb import Adb
+from core.checksum import DeviceChecksummer, remote_sizes
+
+
+def direct_placement_target(config, remote_temp_dir: str, target_dir: str):
+    """Destination written directly by pushes and unified.sh (direct placement), None to stage in the temp dir."""
+    if not config.get("direct_placement", False) or not target_dir:
+        return None
+    if target_dir.rstrip('/') == remote_temp_dir.rstrip('/'):
+        return None
+    return target_dir.rstrip('/')
+
 
 class ReassemblyManager:
     def __init__(self, config, logger, adb: Adb, device_id: str, modal_callback=None):
@@ -11,11 +23,17 @@ class ReassemblyManager:
         self.device_id = device_id
         self.modal_callback = modal_callback
         self.cancelled = False
+        self._cancel_event = threading.Event()  # Wakes every wait of this manager on cancel
+        self.direct_target = None  # Final directory unified.sh writes to (direct placement)
+        self.manifests = []  # Chunk manifests of the transfer, checked against the reassembled files
+        self._checksummer = False  # DeviceChecksummer once probed (None: no md5 tool on the device)
+        self.transfer_manager = None  # TransferManager of the device, re-pushes the chunks of a repair
 
     def reassemble_via_adb_shell(self, remote_temp_dir: str, target_dir: str):
         """Reassemble files via ADB shell (no Termux)."""
         self.logger.info("Démarrage du réassemblage via ADB shell...")
         self.logger.info(f"[{self.device_id}] [DEBUG] Remote Temp: {remote_temp_dir}, Target: {target_dir}")
+        self.direct_target = direct_placement_target(self.config, remote_temp_dir, target_dir)
 
         if self.config.get("unlock_device"):
             self._unlock_device()
@@ -38,19 +56,17 @@ class ReassemblyManager:
 
         # 3. Execute reassembly script in background
         self.logger.info("Exécution du script de réassemblage...")
-        cmd = f"cd {remote_temp_dir} && nohup sh ./unified.sh {remote_temp_dir} > /dev/null 2>&1 &"
-        self.logger.info(f"[{self.device_id}] Commande: {cmd}")
-        reassemble_cmd = f"shell '{cmd}'"
-        self.adb.run_command(reassemble_cmd, self.device_id)
+        self._start_script_in_background(remote_temp_dir)
 
         # 4. Wait for completion using marker file
         if not self._wait_for_reassembly_completion(remote_temp_dir):
             self.logger.error("Le réassemblage a échoué.")
             return False
 
-        # 5. Verify reassembled files
+        # 5. Verify reassembled files (bad ones are reassembled again)
         if not self._verify_reassembled_files(remote_temp_dir):
-            self.logger.warning("Vérification des fichiers réassemblés a échoué")
+            self.logger.error("Vérification des fichiers réassemblés a échoué")
+            return False
         
         # 6. Move files to destination
         # In ADB shell mode, we always move to target directory if specified,
@@ -103,16 +119,16 @@ class ReassemblyManager:
 
         # Wake up device
         self.adb.run_command("shell input keyevent KEYCODE_WAKEUP", self.device_id)
-        time.sleep(1.5)
+        self._sleep(1.5)
 
         # Swipe up to dismiss lock screen (works for most devices)
         self.adb.run_command("shell input swipe 500 1800 500 500 300", self.device_id)
-        time.sleep(1.5)
+        self._sleep(1.5)
 
         if unlock_method == "swipe":
             # Additional swipe to unlock (some devices need this)
             self.adb.run_command("shell input swipe 500 1600 500 400 300", self.device_id)
-            time.sleep(1)
+            self._sleep(1)
         elif unlock_method == "pin":
             if unlock_secret:
                 self.logger.info(f"[{self.device_id}] Saisie du code PIN...")
@@ -120,8 +136,8 @@ class ReassemblyManager:
                     if digit.isdigit():
                         keycode = 7 + int(digit)
                         self.adb.run_command(f"shell input keyevent {keycode}", self.device_id)
-                        time.sleep(0.3)
-                time.sleep(0.5)
+                        self._sleep(0.3)
+                self._sleep(0.5)
                 self.adb.run_command("shell input keyevent KEYCODE_ENTER", self.device_id)
         elif unlock_method == "password":
             if unlock_secret:
@@ -129,17 +145,27 @@ class ReassemblyManager:
                 # Escape special characters for shell
                 escaped_secret = unlock_secret.replace('"', '\\"')
                 self.adb.run_command(f'shell input text "{escaped_secret}"', self.device_id)
-                time.sleep(0.5)
+                self._sleep(0.5)
                 self.adb.run_command("shell input keyevent KEYCODE_ENTER", self.device_id)
 
-        time.sleep(2)
+        self._sleep(2)
         self.logger.success(f"[{self.device_id}] Déverrouillage terminé")
 
     def cancel(self):
-        """Cancel the reassembly process."""
+        """Cancel the reassembly process.
+        
+        Pending waits return at once and the adb commands running for this
+        device are killed.
+        """
         self.cancelled = True
+        self._cancel_event.set()
+        self.adb.terminate(self.device_id)
         self.logger.info("Réassemblage annulé par l'utilisateur.")
 
+    def _sleep(self, seconds: float) -> bool:
+        """Sleep unless cancelled; returns True if the wait was cut short by a cancel."""
+        return self._cancel_event.wait(seconds)
+
     def _check_storage_permission_granted(self):
         """Check if storage permission was granted by checking if /sdcard/storage exists."""
         result = self.adb.run_command(
@@ -176,6 +202,7 @@ class ReassemblyManager:
             return False
 
         self.logger.info("Démarrage du réassemblage via Termux...")
+        self.direct_target = direct_placement_target(self.config, remote_temp_dir, target_dir)
 
         # 0. Unlock device if enabled
         if self.config.get("unlock_device", True):
@@ -229,7 +256,7 @@ class ReassemblyManager:
 
         self.logger.info("Ouverture de Termux...")
         self.adb.run_command(f"shell am start -n com.termux/.app.TermuxActivity", self.device_id)
-        time.sleep(5)  # Wait for Termux to fully open
+        self._sleep(5)  # Wait for Termux to fully open
 
         if self.cancelled:
             return False
@@ -250,13 +277,13 @@ class ReassemblyManager:
         self.logger.info("Demande de permission de stockage...")
         # Tap on Termux to ensure focus
         self.adb.run_command(f"shell input tap 500 1000", self.device_id)
-        time.sleep(0.5)
+        self._sleep(0.5)
 
         # Type the command character by character
         self._type_in_termux("termux-setup-storage")
-        time.sleep(0.5)
+        self._sleep(0.5)
         self.adb.run_command(f"shell input keyevent KEYCODE_ENTER", self.device_id)
-        time.sleep(2)
+        self._sleep(2)
 
         if self.cancelled:
             return False
@@ -274,7 +301,8 @@ class ReassemblyManager:
                     self.logger.success(f"[{self.device_id}] Permission détectée automatiquement!")
                     permission_granted = True
                     break
-                time.sleep(check_interval)
+                if self._sleep(check_interval):
+                    return False
                 elapsed += check_interval
 
             if not permission_granted:
@@ -298,19 +326,19 @@ class ReassemblyManager:
 
         # 6. Execute reassembly script
         if self.modal_callback:
-            self.modal_callback("command_execution", command=f"cd {remote_temp_dir} && sh ./unified.sh {remote_temp_dir}")
+            self.modal_callback("command_execution", command=f"cd {remote_temp_dir} && sh ./unified.sh {self._script_args(remote_temp_dir)}")
 
         self.logger.info("Exécution du script de réassemblage...")
 
         # Change directory
         self._type_in_termux(f"cd {remote_temp_dir}")
-        time.sleep(0.5)
+        self._sleep(0.5)
         self.adb.run_command(f"shell input keyevent KEYCODE_ENTER", self.device_id)
-        time.sleep(1)
+        self._sleep(1)
 
         # Execute script
-        self._type_in_termux(f"sh ./unified.sh {remote_temp_dir}")
-        time.sleep(0.5)
+        self._type_in_termux(f"sh ./unified.sh {self._script_args(remote_temp_dir)}")
+        self._sleep(0.5)
         self.adb.run_command(f"shell input keyevent KEYCODE_ENTER", self.device_id)
 
         # 7. Show progress modal
@@ -329,9 +357,10 @@ class ReassemblyManager:
         if self.cancelled:
             return False
 
-        # 8. Verify reassembled files
+        # 8. Verify reassembled files (bad ones are reassembled again)
         if not self._verify_reassembled_files(remote_temp_dir):
-            self.logger.warning("Vérification des fichiers réassemblés a échoué")
+            self.logger.error("Vérification des fichiers réassemblés a échoué")
+            return False
 
         # 9. Move files to final destination if configured
         if self.config.get("auto_move_after_reassembly", False):
@@ -373,6 +402,11 @@ class ReassemblyManager:
         Returns:
             True if successful, False otherwise
         """
+        if self.direct_target and self.direct_target == target_dir.rstrip('/'):
+            # unified.sh already extracted and reassembled into the destination
+            self.logger.info(f"[{self.device_id}] Placement direct: fichiers déjà dans {target_dir}, aucun déplacement")
+            return True
+
         # Create target directory
         self.adb.run_command(f'shell "mkdir -p \'{target_dir}\'"', self.device_id)
 
@@ -393,7 +427,7 @@ class ReassemblyManager:
         # Move reassembled files (files in temp root, not in _chunks folders, not unified.sh)
         # Find all files that don't belong to chunk folders
         self.adb.run_command(
-            f'shell "find {remote_temp_dir} -maxdepth 1 -type f ! -name \'unified.sh\' ! -name \'*.json\' -exec mv {{}} \'{target_dir}/\' \\; 2>/dev/null || true"',
+            f'shell "find {remote_temp_dir} -maxdepth 1 -type f ! -name \'unified.sh\' ! -name \'*.json\' ! -name \'.extracted_bundles\' ! -name \'.reassembly_complete\' ! -name \'dedup_links.sh\' ! -name \'.priority_order\' -exec mv {{}} \'{target_dir}/\' \\; 2>/dev/null || true"',
             self.device_id
         )
 
@@ -433,25 +467,25 @@ class ReassemblyManager:
         """Open Termux app."""
         self.logger.info(f"[{self.device_id}] Ouverture de Termux...")
         self.adb.run_command(f"shell am start -n com.termux/.app.TermuxActivity", self.device_id)
-        time.sleep(5)  # Wait for Termux to open
+        self._sleep(5)  # Wait for Termux to open
 
     def _wait_for_termux_init(self):
         """Wait for Termux to initialize."""
         self.logger.info(f"[{self.device_id}] Attente de l'initialisation de Termux...")
-        time.sleep(3)
+        self._sleep(3)
 
     def _request_storage_permission(self):
         """Request storage permission via termux-setup-storage."""
         self.logger.info(f"[{self.device_id}] Demande de permission de stockage...")
         # Tap on Termux to ensure focus
         self.adb.run_command(f"shell input tap 500 1000", self.device_id)
-        time.sleep(0.5)
+        self._sleep(0.5)
 
         # Type the command
         self._type_in_termux("termux-setup-storage")
-        time.sleep(0.5)
+        self._sleep(0.5)
         self.adb.run_command(f"shell input keyevent KEYCODE_ENTER", self.device_id)
-        time.sleep(2)
+        self._sleep(2)
 
     def _execute_reassembly_command(self, remote_temp_dir: str):
         """Execute the reassembly script."""
@@ -459,19 +493,21 @@ class ReassemblyManager:
 
         # Change directory
         self._type_in_termux(f"cd {remote_temp_dir}")
-        time.sleep(0.5)
+        self._sleep(0.5)
         self.adb.run_command(f"shell input keyevent KEYCODE_ENTER", self.device_id)
-        time.sleep(1)
+        self._sleep(1)
 
         # Execute script
-        self._type_in_termux(f"sh ./unified.sh {remote_temp_dir}")
-        time.sleep(0.5)
+        self._type_in_termux(f"sh ./unified.sh {self._script_args(remote_temp_dir)}")
+        self._sleep(0.5)
         self.adb.run_command(f"shell input keyevent KEYCODE_ENTER", self.device_id)
 
     def _wait_for_reassembly_completion(self, remote_temp_dir: str):
         """Wait for reassembly script to complete by checking for marker file."""
         self.logger.info(f"[{self.device_id}] Attente de la fin du réassemblage...")
-        time.sleep(5)  # Initial wait
+        if self._sleep(5):  # Initial wait
+            self._stop_remote_script(remote_temp_dir)
+            return False
 
         marker_file = f"{remote_temp_dir}/.reassembly_complete"
         
@@ -482,6 +518,7 @@ class ReassemblyManager:
         
         while elapsed < max_wait:
             if self.cancelled:
+                self._stop_remote_script(remote_temp_dir)
                 return False
 
             # Check for completion marker file
@@ -500,9 +537,7 @@ class ReassemblyManager:
                     self.device_id
                 )
                 if content:
-                    for line in content:
-                        if line.strip():
-                            self.logger.info(f"[{self.device_id}] {line.strip()}")
+                    self._log_marker_content(content)
                 
                 return True
             
@@ -513,7 +548,7 @@ class ReassemblyManager:
             )
             if not ps_output or all('unified.sh' not in line for line in ps_output):
                 # Process ended but no marker - check if marker exists
-                time.sleep(2)
+                self._sleep(2)
                 result = self.adb.run_command(
                     f'shell "[ -f {marker_file} ] && echo exists"',
                     self.device_id
@@ -522,7 +557,7 @@ class ReassemblyManager:
                     self.logger.success(f"[{self.device_id}] Réassemblage terminé.")
                     return True
 
-            time.sleep(check_interval)
+            self._sleep(check_interval)
             elapsed += check_interval
             
             # Log progress every minute
@@ -532,21 +567,198 @@ class ReassemblyManager:
         self.logger.error(f"[{self.device_id}] Timeout du réassemblage ({max_wait//60} minutes).")
         return False
 
+    def _start_script_in_background(self, remote_temp_dir: str):
+        """Run unified.sh on the device through adb shell, detached (completion is seen through the marker file)."""
+        cmd = f"cd {remote_temp_dir} && nohup sh ./unified.sh {self._script_args(remote_temp_dir)} > /dev/null 2>&1 &"
+        self.logger.info(f"[{self.device_id}] Commande: {cmd}")
+        self.adb.run_command(f"shell '{cmd}'", self.device_id)
+
+    def _stop_remote_script(self, remote_temp_dir: str):
+        """Best effort: stop the reassembly script left running on the device after a cancel."""
+        self.logger.info(f"[{self.device_id}] Arrêt du script de réassemblage sur l'appareil...")
+        self.adb.run_command(f"shell 'pkill -f \"unified.sh {remote_temp_dir}\" 2>/dev/null; true'", self.device_id)
+
+    def _script_args(self, remote_temp_dir: str) -> str:
+        """Arguments for unified.sh: transfer root, on-device job count (0 = CPU cores) and direct destination."""
+        jobs = int(self.config.get("device_parallel_jobs", 0))
+        if self.direct_target:
+            return f"{remote_temp_dir} {jobs} {self.direct_target}"
+        return f"{remote_temp_dir} {jobs}"
+
+    def _log_marker_content(self, content):
+        """Log the completion marker: summary lines, then failed jobs only."""
+        ok_jobs = 0
+        for line in content:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("job "):
+                if " ok:" in line:
+                    ok_jobs += 1
+                    continue
+                self.logger.error(f"[{self.device_id}] {line}")
+            else:
+                self.logger.info(f"[{self.device_id}] {line}")
+        if ok_jobs:
+            self.logger.info(f"[{self.device_id}] {ok_jobs} tâche(s) de réassemblage réussie(s)")
+
     def _move_files_to_destination(self, remote_temp_dir: str, target_dir: str):
         """Move reassembled files to final destination."""
         self.logger.info(f"[{self.device_id}] Déplacement vers {target_dir}...")
         return self._move_to_final_destination(remote_temp_dir, target_dir)
 
-    def _verify_reassembled_files(self, remote_temp_dir: str):
-        """Verify reassembled files exist and have correct sizes."""
+    def _verify_reassembled_files(self, remote_temp_dir: str, repair: bool = True):
+        """
+        Verify the reassembled files against the chunk manifests (`self.manifests`).
+
+        Every size is read with batched `stat` calls; with `verify_reassembled_digest`
+        the MD5 of the files is also computed on the device, several files in
+        parallel. With `repair`, the bad files are reassembled again from their
+        chunks (see `_repair_reassembled_files`). Without manifests (manual move),
+        the reassembled files are only listed.
+
+        Returns:
+            True if every reassembled file matches its manifest
+        """
         if not self.config.get("verify_after_reassembly", True):
             return True
-        
+        if not self.manifests:
+            return self._list_reassembled_files(remote_temp_dir)
+
+        self.logger.info(f"[{self.device_id}] Vérification des fichiers réassemblés...")
+        bad = self._find_bad_reassembled_files(remote_temp_dir, self.manifests)
+        if not bad:
+            return True
+        self.logger.error(f"[{self.device_id}] {len(bad)}/{len(self.manifests)} fichier(s) réassemblé(s) incorrect(s)")
+        if not repair or self.cancelled:
+            return False
+        return self._repair_reassembled_files(remote_temp_dir, bad)
+
+    def _find_bad_reassembled_files(self, remote_temp_dir: str, manifests):
+        """Manifests whose reassembled file is missing, has the wrong size or (optionally) the wrong MD5."""
+        paths = [self._reassembled_path(remote_temp_dir, manifest) for manifest in manifests]
+        sizes = remote_sizes(self.adb, self.device_id, paths)
+        bad = []
+        sized = []
+        for manifest, path in zip(manifests, paths):
+            size = sizes.get(path)
+            expected = manifest.get('original_size')
+            if size is None:
+                self.logger.error(f"[{self.device_id}] Fichier réassemblé manquant: {path}")
+                bad.append(manifest)
+            elif expected is not None and size != expected:
+                self.logger.error(f"[{self.device_id}] Taille incorrecte: {path} ({size} octets au lieu de {expected})")
+                bad.append(manifest)
+            else:
+                sized.append((manifest, path))
+
+        checked = "taille"
+        if sized and self.config.get("verify_reassembled_digest", False):
+            digests = self._reassembled_digests([path for _, path in sized])
+            if digests is None:
+                self.logger.warning(f"[{self.device_id}] MD5 des fichiers réassemblés indisponible, tailles uniquement")
+            else:
+                checked = "taille et MD5"
+                for manifest, path in sized:
+                    if digests.get(path) != str(manifest.get('original_md5', '')).lower():
+                        self.logger.error(f"[{self.device_id}] MD5 incorrect: {path}")
+                        bad.append(manifest)
+
+        if not bad:
+            self.logger.success(f"[{self.device_id}] {len(manifests)} fichier(s) réassemblé(s) vérifié(s) ({checked})")
+        return bad
+
+    def _reassembled_digests(self, remote_paths):
+        """{remote path: md5} of reassembled files, None without md5 tool on the device."""
+        if self._checksummer is False:
+            jobs = int(self.config.get("device_parallel_jobs", 0))
+            self._checksummer = DeviceChecksummer.probe(self.adb, self.device_id, jobs=jobs)
+        if self._checksummer is None:
+            return None
+        self.logger.info(f"[{self.device_id}] Calcul du MD5 de {len(remote_paths)} fichier(s) réassemblé(s)...")
+        return self._checksummer.file_digests(remote_paths)
+
+    def _reassembled_path(self, remote_temp_dir: str, manifest) -> str:
+        """Path unified.sh writes the file of a manifest to: next to its chunk folder, under the direct target if set."""
+        root = self.direct_target or remote_temp_dir.rstrip('/')
+        chunk_folder = manifest['chunk_folder'].replace('\\', '/')
+        parent = chunk_folder.rsplit('/', 1)[0] if '/' in chunk_folder else ''
+        name = manifest['original_file'].replace('\\', '/').rsplit('/', 1)[-1]
+        return "/".join(part for part in (root, parent, name) if part)
+
+    def _repair_reassembled_files(self, remote_temp_dir: str, manifests) -> bool:
+        """
+        Reassemble again only the files of `manifests`, then check them once more.
+
+        The bad outputs are deleted and the chunks missing or truncated on the
+        device (unified.sh deletes a chunk folder after reassembling it) are
+        pushed again from the local chunk folders through `transfer_manager`
+        (`_retry_failed_chunks`). unified.sh is then run in the background:
+        it only finds these chunk folders.
+
+        Returns:
+            True if every file is correct after the new reassembly
+        """
+        self.logger.warning(f"[{self.device_id}] Nouveau réassemblage de {len(manifests)} fichier(s)...")
+
+        # 1. Delete the bad outputs
+        paths = [self._reassembled_path(remote_temp_dir, manifest) for manifest in manifests]
+        for start in range(0, len(paths), 50):
+            batch = " ".join(shlex.quote(p) for p in paths[start:start + 50])
+            self.adb.run_command(f'shell "rm -f {batch}"', self.device_id)
+
+        # 2. Push again the chunks that are not on the device with their size
+        uploads = []
+        for manifest in manifests:
+            remote_chunk_dir = f"{remote_temp_dir}/{manifest['chunk_folder']}".replace('\\', '/')
+            if not manifest.get('persistent_source'):
+                self.logger.error(f"[{self.device_id}] Chunks locaux introuvables pour {manifest['original_file']}")
+                return False
+            local_chunk_dir = Path(manifest['persistent_source'])
+            uploads.append((local_chunk_dir / "chunk_metadata.json", f"{remote_chunk_dir}/chunk_metadata.json", None))
+            for chunk_info in manifest['chunks']:
+                uploads.append((local_chunk_dir / chunk_info['filename'],
+                                f"{remote_chunk_dir}/{chunk_info['filename']}", chunk_info['size']))
+        present = remote_sizes(self.adb, self.device_id, [remote for _, remote, _ in uploads])
+        uploads = [
+            (local, remote) for local, remote, size in uploads
+            if remote not in present or (size is not None and present[remote] != size)
+        ]
+        if uploads:
+            if self.transfer_manager is None:
+                self.logger.error(f"[{self.device_id}] Aucun gestionnaire de transfert pour renvoyer les chunks")
+                return False
+            if self.cancelled:
+                return False
+            self.logger.info(f"[{self.device_id}] Renvoi de {len(uploads)} fichier(s) de chunks...")
+            remote_dirs = sorted({remote.rsplit('/', 1)[0] for _, remote in uploads})
+            self.transfer_manager._make_remote_dirs(remote_dirs, self.device_id)
+            # Same pool, retries, circuit breaker and watchdog as the transfer
+            if not self.transfer_manager._retry_failed_chunks(
+                    [(str(local), remote) for local, remote in uploads], self.device_id):
+                self.logger.error(f"[{self.device_id}] Échec du renvoi des chunks")
+                return False
+
+        # 3. Run unified.sh again on the remaining chunk folders
+        self._start_script_in_background(remote_temp_dir)
+        if not self._wait_for_reassembly_completion(remote_temp_dir):
+            self.logger.error(f"[{self.device_id}] Le nouveau réassemblage a échoué.")
+            return False
+
+        # 4. Check these files once more
+        bad = self._find_bad_reassembled_files(remote_temp_dir, manifests)
+        if bad:
+            self.logger.error(f"[{self.device_id}] {len(bad)} fichier(s) toujours incorrect(s) après un nouveau réassemblage")
+            return False
+        return True
+
+    def _list_reassembled_files(self, remote_temp_dir: str):
+        """List the reassembled files of the temp folder (no manifest to check them against)."""
         self.logger.info(f"[{self.device_id}] Vérification des fichiers réassemblés...")
         
         # Check for reassembled files (non-chunk, non-metadata files)
         result = self.adb.run_command(
-            f'shell "find {remote_temp_dir} -maxdepth 1 -type f ! -name \'unified.sh\' ! -name \'.reassembly_complete\' ! -name \'*.json\'"',
+            f'shell "find {remote_temp_dir} -maxdepth 1 -type f ! -name \'unified.sh\' ! -name \'.reassembly_complete\' ! -name \'.extracted_bundles\' ! -name \'.priority_order\' ! -name \'*.json\'"',
             self.device_id
         )
         
@@ -0,0 +1,289 @@
+"""
+Directory Scanner - Parallel os.scandir based traversal of the source tree
+Reuses DirEntry data instead of issuing a second stat() per file
+"""
+
+import concurrent.futures
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# (path, size, mtime) record emitted for every file
+FileRecord = Tuple[str, int, float]
+
+# Bump when the journal layout changes, older journals are then ignored
+JOURNAL_VERSION = 1
+
+# Directories modified this close to the snapshot time are always re-read:
+# a change in the same timestamp tick would otherwise go unnoticed (FAT has 2s)
+JOURNAL_RACY_WINDOW_NS = 2 * 1_000_000_000
+
+
+def skip_chunk_folders(name: str) -> bool:
+    """Default pruning rule: never descend into persistent `*_chunks` folders."""
+    return name.endswith('_chunks')
+
+
+class DirectoryScanner:
+    """
+    Walks a directory tree with a pool of threads, one directory per task.
+
+    Results match `os.walk` + `Path.stat()`: symlinked directories are not
+    followed, symlinked files are stat'ed through the link, and directories
+    rejected by `prune_dir` or `path_filter` are never opened. Files rejected
+    by the filter's path rules are not even stat'ed.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        prune_dir: Optional[Callable[[str], bool]] = skip_chunk_folders,
+        on_error: Optional[Callable[[str, OSError], None]] = None,
+        journal: Optional["ScanJournal"] = None,
+        path_filter=None,
+    ):
+        """
+        Args:
+            workers: Number of traversal threads
+            prune_dir: Called with a directory name, returns True to skip that subtree
+            on_error: Called with (path, error) for files that cannot be stat'ed
+            journal: Optional ScanJournal, unchanged directories are served from it
+            path_filter: Optional PathFilter (include/exclude, size and mtime rules)
+        """
+        self.workers = max(1, workers)
+        self.prune_dir = prune_dir
+        self.on_error = on_error
+        self.journal = journal
+        self.path_filter = path_filter
+        self._root_len = 0
+
+    def scan(self, root) -> List[FileRecord]:
+        """Scan the whole tree and return records sorted by path (deterministic order)."""
+        records = list(self.iter_scan(root))
+        records.sort(key=lambda record: record[0])
+        return records
+
+    def iter_scan(self, root) -> Iterator[FileRecord]:
+        """
+        Yield (path, size, mtime) records as directories are read.
+
+        Order follows task completion, not the tree, so callers that need a
+        stable order should use `scan()`.
+        """
+        root = os.fspath(root)
+        # Offset of the path relative to the root inside entry.path
+        self._root_len = len(os.path.join(root, ''))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {executor.submit(self._scan_directory, root)}
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    files, subdirs = future.result()
+                    for subdir in subdirs:
+                        pending.add(executor.submit(self._scan_directory, subdir))
+                    yield from files
+
+    def _scan_directory(self, path: str):
+        """Read one directory: returns (file records, sub-directories to visit)."""
+        if self.journal is None:
+            files, subdirs = self._read_directory(path)
+            return self._apply_stat_predicates(files), subdirs
+
+        # One stat per directory: if its mtime is unchanged, no entry was
+        # added, removed or renamed, so the cached listing is still valid
+        try:
+            dir_mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return [], []
+
+        cached = self.journal.lookup(path, dir_mtime_ns)
+        if cached is not None:
+            files, subdirs = cached
+        else:
+            files, subdirs = self._read_directory(path)
+        self.journal.record(path, dir_mtime_ns, files, subdirs)
+        # Size/mtime predicates are not part of the journaled listing:
+        # a relative age like "7d" moves between runs
+        return self._apply_stat_predicates(files), subdirs
+
+    def _apply_stat_predicates(self, files: List[FileRecord]) -> List[FileRecord]:
+        if self.path_filter is None:
+            return files
+        accept = self.path_filter.accept_stat
+        return [record for record in files if accept(record[1], record[2])]
+
+    def _relative(self, entry_path: str) -> str:
+        rel_path = entry_path[self._root_len:]
+        return rel_path if os.sep == '/' else rel_path.replace(os.sep, '/')
+
+    def _read_directory(self, path: str):
+        """List one directory with os.scandir."""
+        files = []
+        subdirs = []
+        path_filter = self.path_filter
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if is_dir:
+                        if self.prune_dir and self.prune_dir(entry.name):
+                            continue
+                        # Pruned from the DirEntry name alone: no syscall for excluded subtrees
+                        if path_filter is not None and path_filter.prune_dir(self._relative(entry.path), entry.name):
+                            continue
+                        # Like os.walk(followlinks=False): list, but don't follow
+                        try:
+                            if entry.is_symlink():
+                                continue
+                        except OSError:
+                            continue
+                        subdirs.append(entry.path)
+                        continue
+
+                    if path_filter is not None and not path_filter.accept_name(self._relative(entry.path), entry.name):
+                        continue
+
+                    try:
+                        st = entry.stat()
+                    except OSError as e:
+                        if self.on_error:
+                            self.on_error(entry.path, e)
+                        continue
+                    files.append((entry.path, st.st_size, st.st_mtime))
+        except OSError:
+            # Unreadable directory: os.walk silently skips these too
+            pass
+        # Name order inside a directory keeps results (and FileInventory) deterministic
+        files.sort()
+        return files, subdirs
+
+
+class ScanJournal:
+    """
+    Snapshot of a previous scan: directory mtimes plus their file records.
+
+    A directory whose mtime did not change is served from the snapshot
+    without being listed again. Files edited in place do not change their
+    directory mtime, so on load a random sample of cached files is re-stat'ed
+    and any mismatch discards the whole journal (full rescan). The journal is
+    also ignored when it is older than `max_age_hours` or was written with
+    different scan rules.
+    """
+
+    def __init__(self, journal_path: Path, root, rules_key: str = "", logger=None):
+        self.journal_path = Path(journal_path)
+        self.root = os.fspath(root)
+        self.rules_key = rules_key
+        self.logger = logger
+        self.previous: Dict[str, list] = {}
+        self.previous_time_ns = 0
+        self.current: Dict[str, list] = {}
+        self.reused_dirs = 0
+        self.scanned_dirs = 0
+        self._lock = threading.Lock()
+
+    def load(self, max_age_hours: float = 24, verify_sample: int = 256) -> bool:
+        """
+        Load the previous snapshot if it is usable.
+
+        Returns:
+            True if the snapshot will be used, False if a full rescan is needed
+        """
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if (data.get("version") != JOURNAL_VERSION or data.get("root") != self.root
+                or data.get("rules") != self.rules_key):
+            self._log("Journal de scan incompatible, analyse complète")
+            return False
+
+        age_hours = (time.time_ns() - data.get("time_ns", 0)) / 3.6e12
+        if age_hours > max_age_hours:
+            self._log(f"Journal de scan trop ancien ({age_hours:.1f} h), analyse complète")
+            return False
+
+        self.previous = data.get("dirs", {})
+        self.previous_time_ns = data.get("time_ns", 0)
+
+        if not self._verify_sample(verify_sample):
+            self._log("Journal de scan incohérent (fichiers modifiés), analyse complète")
+            self.previous = {}
+            return False
+        return True
+
+    def _verify_sample(self, sample_size: int) -> bool:
+        """Re-stat a random sample of cached files, False on any mismatch."""
+        dirs_with_files = [d for d, (_, _, files) in self.previous.items() if files]
+        if not dirs_with_files:
+            return True
+        for _ in range(sample_size):
+            dir_path = random.choice(dirs_with_files)
+            name, size, mtime = random.choice(self.previous[dir_path][2])
+            try:
+                st = os.stat(os.path.join(dir_path, name))
+            except OSError:
+                return False
+            if st.st_size != size or st.st_mtime != mtime:
+                return False
+        return True
+
+    def lookup(self, dir_path: str, dir_mtime_ns: int):
+        """Cached (files, subdirs) for an unchanged directory, else None."""
+        entry = self.previous.get(dir_path)
+        if (entry is None or entry[0] != dir_mtime_ns
+                or dir_mtime_ns >= self.previous_time_ns - JOURNAL_RACY_WINDOW_NS):
+            with self._lock:
+                self.scanned_dirs += 1
+            return None
+        with self._lock:
+            self.reused_dirs += 1
+        _, subdirs, files = entry
+        return [(os.path.join(dir_path, name), size, mtime) for name, size, mtime in files], list(subdirs)
+
+    def record(self, dir_path: str, dir_mtime_ns: int, files: List[FileRecord], subdirs: List[str]):
+        """Record the listing of a directory for the next snapshot."""
+        self.current[dir_path] = [
+            dir_mtime_ns,
+            subdirs,
+            [(os.path.basename(path), size, mtime) for path, size, mtime in files],
+        ]
+
+    def save(self, started_ns: int):
+        """
+        Write the new snapshot atomically.
+
+        Args:
+            started_ns: time.time_ns() taken before the scan started, used as the
+                snapshot time so changes made during the scan are caught next run
+        """
+        data = {
+            "version": JOURNAL_VERSION,
+            "root": self.root,
+            "rules": self.rules_key,
+            "time_ns": started_ns,
+            "dirs": self.current,
+        }
+        partial_path = self.journal_path.with_suffix(".tmp")
+        try:
+            with open(partial_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(partial_path, self.journal_path)
+        except OSError as e:
+            self._log(f"Impossible d'enregistrer le journal de scan: {e}")
+
+    def _log(self, message):
+        if self.logger:
+            self.logger.info(message)
@@ -0,0 +1,101 @@
+"""
+Speculative Pushes - Backup copies of straggling pushes at the tail of a transfer
+A push running far longer than the median push rate predicts gets a second copy
+to a side path; the first copy to finish wins and the other one is killed
+"""
+
+from typing import Dict, Optional
+
+MB = 1024 * 1024
+
+
+class SpeculationTracker:
+    """
+    Races between straggling pushes (primaries) and their backup copies.
+
+    A running push is a straggler once it has run longer than both
+    `min_seconds` and `factor` times what the median push rate predicts for
+    its size; backups are only launched while the duplicated bytes stay
+    within `budget_bytes`. Each race ends in one of three ways:
+    - the primary finished first: the backup lost (its partial copy is removed)
+    - the backup finished first: the primary lost and the backup is promoted
+      (renamed over the final path)
+    - one copy failed: the other one carries on alone
+
+    The caller kills the losers; their results are ignored (`end_loser()`).
+    Futures are only used as keys, so any hashable stands in for them.
+    """
+
+    def __init__(self, factor: float = 3.0, min_seconds: float = 5.0, budget_bytes: int = 256 * MB):
+        self.factor = factor
+        self.min_seconds = min_seconds
+        self.budget_bytes = budget_bytes
+        self.backup_for = {}  # primary -> backup
+        self.backup_of = {}  # backup -> primary (None once the primary failed)
+        self.losers = set()  # Copies that lost their race (killed, result ignored)
+        self.promotions = set()  # Renames of winning backups
+        self.launched = 0
+        self.won = 0
+        self.bytes = 0
+
+    def busy(self, future) -> bool:
+        """True if `future` already races, lost a race or promotes a backup."""
+        return (future in self.backup_for or future in self.backup_of
+                or future in self.losers or future in self.promotions)
+
+    def is_straggler(self, elapsed: float, size: int, median_rate: float) -> bool:
+        """True if a push of `size` bytes running for `elapsed` seconds deserves a backup."""
+        if elapsed < max(self.min_seconds, self.factor * size / median_rate):
+            return False
+        return self.bytes + size <= self.budget_bytes
+
+    def launch(self, primary, backup, size: int):
+        """`backup` now races `primary`."""
+        self.launched += 1
+        self.bytes += size
+        self.backup_for[primary] = backup
+        self.backup_of[backup] = primary
+
+    def is_backup(self, future) -> bool:
+        return future in self.backup_of
+
+    def is_loser(self, future) -> bool:
+        return future in self.losers
+
+    def end_loser(self, future) -> bool:
+        """The losing copy `future` finished; True if it was a backup (partial copy to remove)."""
+        self.losers.discard(future)
+        if future in self.backup_of:
+            del self.backup_of[future]
+            return True
+        return False
+
+    def end_backup(self, backup) -> Optional[object]:
+        """The backup finished first: its primary, None if the primary already failed."""
+        primary = self.backup_of.pop(backup)
+        if primary is not None:
+            self.backup_for.pop(primary, None)
+        return primary
+
+    def end_primary(self, primary) -> Optional[object]:
+        """The primary (or a promotion) finished: the backup still racing it, if any."""
+        self.promotions.discard(primary)
+        return self.backup_for.pop(primary, None)
+
+    def backup_won(self, primary, promotion):
+        """A backup finished cleanly: `primary` lost, `promotion` renames the copy into place."""
+        self.won += 1
+        if primary is not None:
+            self.losers.add(primary)
+        self.promotions.add(promotion)
+
+    def primary_won(self, backup):
+        """The primary finished cleanly: `backup` lost (kept in `backup_of` until it ends)."""
+        self.losers.add(backup)
+
+    def primary_failed(self, backup):
+        """The primary failed: `backup` carries on alone and reports the item's outcome."""
+        self.backup_of[backup] = None
+
+    def metrics(self) -> Dict:
+        return {"launched": self.launched, "won": self.won, "bytes": self.bytes}
@@ -1,18 +1,109 @@
 # claude_v2/src/core/transfer.py
 import os
+import re
+import json
 import tempfile
 import shutil
 import concurrent.futures
 import zipfile
+from array import array
 from pathlib import Path
 import shlex
 import time
+import heapq
+import queue
+import statistics
+import threading
+from collections import deque
 
 from core.file_chunker import FileChunker
+from core.bin_packing import BundlePacker
+from core.dedup import FileDeduplicator, DEDUP_SCRIPT_NAME
+from core.scanner import DirectoryScanner, ScanJournal
+from core.filters import PathFilter
+from core.inventory import FileInventory, InventoryView
+from core.planner import ThroughputHistory, TransferPlanner
+from core.concurrency import AimdController, RetryPolicy, RetryQueue, CircuitBreaker
+from core.ledger import TransferLedger, local_digest
+from core.priority import PriorityClasses, DeadlineTracker, PRIORITY_ORDER_NAME
+from core.progress import ProgressTracker
+from core.watchdog import StallWatchdog, PushStalledError
+from core.compression import CompressionCache
+from core.multipath import MultipathStriper
+from core.speculation import SpeculationTracker
+from core.checksum import DeviceChecksummer, remote_sizes
 from utils.adb import Adb
 
 from utils.termux import TermuxInstaller
-from core.reassembly import ReassemblyManager
+from core.reassembly import ReassemblyManager, direct_placement_target
+from utils.cache import get_cache_dir, path_key
+
+# Marks the end of a fanned-out item stream
+_STREAM_END = object()
+
+# Speculative backup copies of straggling pushes are written next to the final path
+SPECULATIVE_SUFFIX = ".spec"
+SPECULATION_MIN_SAMPLES = 5  # Finished pushes needed before the median rate is trusted
+SPECULATION_CHECK_S = 0.5  # How often stragglers are looked for at the tail of a transfer
+
+# Direct placement: files that need no reassembly are pushed to their final path
+# under this suffix and renamed once the push phase succeeded
+DIRECT_PART_SUFFIX = ".adbt_part"
+
+# How long a cancelled transfer waits for its killed pushes before cleaning up
+CANCEL_GRACE_S = 0.5
+
+# Summary printed by `adb push`: "...: 1 file pushed, 0 skipped. 38.2 MB/s (104857600 bytes in 2.616s)"
+_PUSH_SUMMARY = re.compile(r"\((\d+) bytes in [\d.]+s\)")
+
+
+class _PushRun:
+    """State of one `_push_items` call, shared by the TransferManager methods that drive it."""
+
+    def __init__(self, items, device_id, max_workers, track_progress, controller, retry_policy,
+                 breaker, watchdog, deadlines, speculation, speculate):
+        self.device_id = device_id
+        self.track_progress = track_progress
+        self.controller = controller
+        self.retry_policy = retry_policy
+        self.breaker = breaker
+        self.watchdog = watchdog
+        self.deadlines = deadlines
+        self.speculation = speculation
+        self.speculate = speculate
+        if controller:
+            self.pool_size = controller.max_limit
+        else:
+            self.pool_size = max_workers
+            self.max_in_flight = max_workers * 2  # Keep workers fed without queuing everything
+        self.source = iter(items)
+        self.source_done = False
+        self.pending = None  # Next (item, attempt) to submit
+        self.future_to_file = {}  # Map futures to (file info, size, attempt)
+        self.retry_queue = RetryQueue()
+        self.interrupted = []  # Remote paths of pushes killed by a cancel (partial files)
+        self.results = {
+            'successful': [],
+            'failed': [],
+            'bytes': 0,
+            'workers': max_workers,
+            'retries': 0,
+            'backoff_s': 0.0,
+            'stalls': 0,
+            'speculative': 0,
+            'compression': None
+        }
+
+    @property
+    def limit(self):
+        """Pushes allowed in flight right now."""
+        return self.controller.limit if self.controller else self.max_in_flight
+
+    @property
+    def exhausted(self):
+        """True once nothing is left to submit (stream read, no pending item, no retry queued)."""
+        return self.source_done and self.pending is None and not self.retry_queue
+
 
 class TransferManager:
     def __init__(self, config, logger):
@@ -20,19 +111,77 @@ class TransferManager:
         self.logger = logger
         self.adb = Adb(self.logger)
         self.termux_installer = TermuxInstaller(self.logger, self.adb)
-        self.files_to_chunk = []
-        self.files_to_batch = []
+        self.reset_file_lists()
         self.manifests = []
+        self.bundle_paths = []
+        self.extracted_bundles = set()
+        self.duplicate_links = []
+        self.dedup_saved_bytes = 0
+        self.plan = None
+        self.history = None
+        self.bandwidth_scheduler = None  # Shared BandwidthScheduler for multi-device runs
+        self.read_cache = None  # SharedReadCache for multi-device runs
+        self.ledger = None  # TransferLedger of the device being pushed to
+        self.watchdog = None  # StallWatchdog of the device being pushed to
+        self.reassembly_manager = None  # ReassemblyManager of the running start_transfer()
+        self.target_dir = None  # Final directory on the device (direct placement)
+        self._checksummers = {}  # device id -> DeviceChecksummer, None when the device has no md5 tool
+        self._direct_items = []  # (local path, temporary remote path, final remote path, size) of direct files
+        self._direct_pending = []  # Direct items pushed in this run, still under their temporary name
+        self.compression = None  # CompressionCache (shared in multi-device runs)
+        self._compress_transports = set()  # Transports of the device with compressed pushes enabled
+        self.transports = None  # adb ids of the device (USB serial, ip:port), the first one is the primary
+        self.multipath = None  # MultipathStriper when the device has several transports
+        self._push_durations = {}  # remote path -> seconds of the finished push, for the striper
+        self._compression_stats = {'items': 0, 'raw': 0, 'wire': 0, 'seconds': 0.0}
+        self._push_processes = {}  # remote path -> (adb process, start time) of the running pushes
+        self._abandoned_pushes = set()  # Remote paths whose push must be killed (lost a speculative race)
+        self._push_rates = deque(maxlen=200)  # Bytes/s of the last finished pushes
+        self._push_lock = threading.Lock()
+        self._remote_listing = None  # remote path -> size, from one listing (resume)
+        self._chunk_digests = {}
+        self.scan_order = None
+        self.priority_classes = None  # PriorityClasses when config["priority_classes"] is set
+        self.item_priority = {}  # local path of a push item -> class rank
+        self.progress = ProgressTracker(self.logger)  # Byte-level progress events (shared in multi-device runs)
         self.modal_callback = None  # Will be set by UI
         self.cancelled = False
 
+    def reset_file_lists(self):
+        """Start a new, empty file inventory.
+        
+        files_to_chunk and files_to_batch are index views over one compact
+        FileInventory; iterating them yields FileEntry objects that unpack
+        like (file_path, file_size) tuples.
+        """
+        self.inventory = FileInventory()
+        self.files_to_chunk = InventoryView(self.inventory)
+        self.files_to_batch = InventoryView(self.inventory)
+        self.file_ranks = None  # Priority class rank per inventory index
+        self.item_priority = {}
+        self.direct_files = []  # (local path, path relative to the source, size) pushed to the destination
+        self.duplicate_paths = set()  # Path strings of the copies dropped by deduplicate_files
+
     def cancel(self):
-        """Cancel transfer operations."""
+        """Cancel transfer operations.
+        
+        Running adb commands are killed at once; `_push_items` then removes
+        the partial remote files and returns.
+        """
         self.cancelled = True
-        self.logger.info("Transfert annulé par l'utilisateur")
+        if self.bandwidth_scheduler is not None:
+            self.bandwidth_scheduler.cancel()
+        if self.read_cache is not None:
+            self.read_cache.cancel()
+        if self.reassembly_manager is not None:
+            self.reassembly_manager.cancel()
+        killed = self.adb.terminate()
+        self.logger.info("Transfert annulé par l'utilisateur" + (f" ({killed} commande(s) adb arrêtée(s))" if killed else ""))
 
     def start_transfer(self, source_dir, target_dir, device_id):
         total_start_time = time.time()
+        self.progress.reset()
+        self.target_dir = target_dir
         self.logger.info(f"Initialisation du transfert de {source_dir} vers {target_dir} sur l'appareil {device_id}")
         self.logger.info(f"Configuration: {self.config}")
 
@@ -42,38 +191,51 @@ class TransferManager:
             self.temp_dir = Path(temp_dir)
             self.logger.info(f"Dossier temporaire créé: {self.temp_dir}")
 
-            # 1. Scan files
-            self.logger.info("Analyse des fichiers...")
-            self.scan_files(source_dir)
-            self.logger.info(f"{len(self.files_to_chunk)} fichiers à fragmenter.")
-            self.logger.info(f"{len(self.files_to_batch)} fichiers à traiter en lots.")
+            remote_temp_dir = self.config.get("remote_temp_dir", "/sdcard/transfer_temp")
+            streaming = self.config.get("streaming_mode", False)
 
-            # 2. Process files (chunking and batching)
-            chunking_start_time = time.time()
-            self.logger.info("Préparation des fichiers...")
-            self.process_files(Path(source_dir))
-            chunking_time = time.time() - chunking_start_time
-            self.logger.info(f"Temps de préparation des fichiers: {chunking_time:.2f} secondes.")
+            if not streaming:
+                # 1. Scan files
+                self.logger.info("Analyse des fichiers...")
+                self.scan_files(source_dir)
+                self.logger.info(f"{len(self.files_to_chunk)} fichiers à fragmenter.")
+                self.logger.info(f"{len(self.files_to_batch)} fichiers à traiter en lots.")
+                self.deduplicate_files(source_dir)
+                self.plan_transfer([device_id])
 
-            # 3. Transfer files
+                # 2. Process files (chunking and batching)
+                chunking_start_time = time.time()
+                self.progress.set_phase("prepare")
+                self.logger.info("Préparation des fichiers...")
+                self.process_files(Path(source_dir))
+                chunking_time = time.time() - chunking_start_time
+                self.record_phase("prepare", chunking_time)
+                self.logger.info(f"Temps de préparation des fichiers: {chunking_time:.2f} secondes.")
+
+            # 3. Transfer files (streaming: scan and preparation run while pushing)
             transfer_start_time = time.time()
             self.logger.info("Transfert des fichiers...")
-            remote_temp_dir = self.config.get("remote_temp_dir", "/sdcard/transfer_temp")
-            self.parallel_transfer(remote_temp_dir, device_id)
+            items = self.iter_streaming_items(source_dir, remote_temp_dir) if streaming else None
+            self.parallel_transfer(remote_temp_dir, device_id, items=items)
             transfer_time = time.time() - transfer_start_time
             self.logger.info(f"Temps de transfert des fichiers: {transfer_time:.2f} secondes.")
             
             
             # 4. Reassemble files via Termux
             reassembly_start_time = time.time()
+            self.progress.set_phase("reassembly")
             self.logger.info("Réassemblage des fichiers sur l'appareil...")
-            reassembly_manager = ReassemblyManager(
+            reassembly_manager = self.reassembly_manager = ReassemblyManager(
                 self.config, 
                 self.logger, 
                 self.adb, 
                 device_id,
                 modal_callback=getattr(self, 'modal_callback', None)
             )
+            reassembly_manager.manifests = self.manifests
+            reassembly_manager.transfer_manager = self
+            if self.cancelled:
+                reassembly_manager.cancel()
             success = reassembly_manager.reassemble_via_termux(remote_temp_dir, target_dir)
             reassembly_time = time.time() - reassembly_start_time
             
@@ -82,6 +244,9 @@ class TransferManager:
                 return
             
             self.logger.info(f"Temps de réassemblage des fichiers: {reassembly_time:.2f} secondes.")
+            self.record_phase("reassembly", reassembly_time, device_id=device_id)
+            self.finish_plan()
+            self.progress.set_phase("done")
 
             # Note: Cleanup is now handled by reassembly_manager
 
@@ -97,33 +262,228 @@ class TransferManager:
         """
         try:
             self.logger.info(f"[{device_id}] Initialisation du transfert...")
+            self.target_dir = target_dir
 
             # Note: Termux check removed - now done at startup
 
             with tempfile.TemporaryDirectory() as temp_dir:
                 self.temp_dir = Path(temp_dir)
 
-                # 1. Scan files
-                self.logger.info(f"[{device_id}] Analyse des fichiers...")
-                self.scan_files(source_dir)
-                self.logger.info(f"[{device_id}] {len(self.files_to_chunk)} fichiers à fragmenter, {len(self.files_to_batch)} en lots.")
+                remote_temp_dir = self.config.get("remote_temp_dir", "/sdcard/transfer_temp")
+                streaming = self.config.get("streaming_mode", False)
 
-                # 2. Process files (chunking and batching)
-                self.logger.info(f"[{device_id}] Préparation des fichiers...")
-                self.process_files(Path(source_dir))
+                if not streaming:
+                    # 1. Scan files
+                    self.logger.info(f"[{device_id}] Analyse des fichiers...")
+                    self.scan_files(source_dir)
+                    self.logger.info(f"[{device_id}] {len(self.files_to_chunk)} fichiers à fragmenter, {len(self.files_to_batch)} en lots.")
+                    self.deduplicate_files(source_dir)
+                    self.plan_transfer([device_id])
+
+                    # 2. Process files (chunking and batching)
+                    self.logger.info(f"[{device_id}] Préparation des fichiers...")
+                    prepare_start_time = time.time()
+                    self.process_files(Path(source_dir))
+                    self.record_phase("prepare", time.time() - prepare_start_time)
 
-                # 3. Transfer files
+                # 3. Transfer files (streaming: scan and preparation run while pushing)
                 self.logger.info(f"[{device_id}] Transfert des fichiers...")
-                remote_temp_dir = self.config.get("remote_temp_dir", "/sdcard/transfer_temp")
-                self.parallel_transfer(remote_temp_dir, device_id)
+                items = self.iter_streaming_items(source_dir, remote_temp_dir) if streaming else None
+                if not self.parallel_transfer(remote_temp_dir, device_id, items=items):
+                    return False
 
                 self.logger.success(f"[{device_id}] Transfert terminé.")
+                self.finish_plan()
                 return True
 
         except Exception as e:
             self.logger.error(f"[{device_id}] Erreur lors du transfert: {e}")
             return False
 
+    def _create_scanner(self, source_dir):
+        """Create the source scanner and, if enabled, load its scan journal.
+        
+        Returns:
+            Tuple (scanner, journal or None, scan start time in ns)
+        """
+        # Parallel os.scandir traversal, reusing DirEntry stat data (one stat per file)
+        # Chunk folders are pruned - the scanner never descends into them
+        # With the scan journal, directories unchanged since the last run are not re-listed
+        path_filter = PathFilter.from_config(self.config, source_dir)
+        if path_filter is not None:
+            self.logger.info(f"Filtres actifs: {len(path_filter.exclude_lines)} exclusion(s), {len(path_filter.include_lines)} inclusion(s)")
+        
+        journal = None
+        scan_started_ns = time.time_ns()
+        if self.config.get("scan_journal", False):
+            journal_path = get_cache_dir(self.config, "scan_journal") / f"{path_key(Path(source_dir).resolve())}.json"
+            rules_key = path_filter.rules_key if path_filter is not None else ""
+            journal = ScanJournal(journal_path, source_dir, rules_key=rules_key, logger=self.logger)
+            journal.load(
+                max_age_hours=self.config.get("scan_journal_max_age_hours", 24),
+                verify_sample=self.config.get("scan_journal_verify_sample", 256),
+            )
+        
+        scanner = DirectoryScanner(
+            workers=self.config.get("scan_workers", 8),
+            on_error=lambda path, e: self.logger.error(f"Erreur lors de l'accès au fichier {path}: {e}"),
+            journal=journal,
+            path_filter=path_filter,
+        )
+        return scanner, journal, scan_started_ns
+    
+    def _save_scan_journal(self, journal, scan_started_ns):
+        if journal is not None:
+            journal.save(scan_started_ns)
+            self.logger.info(f"Journal de scan: {journal.reused_dirs} dossier(s) inchangé(s), {journal.scanned_dirs} relu(s)")
+
+    def iter_streaming_items(self, source_dir, remote_temp_dir):
+        """Scan, prepare and yield push items while the source is still being walked.
+        
+        Large files are chunked as soon as they are found and their chunks are
+        yielded right away; small files fill a bundle that is yielded as soon as
+        it reaches the bundle size. SJF ordering uses a bounded window (min-heap
+        of `sjf_window` files) instead of a global sort.
+        
+        Deduplication and incremental bundles need the complete file list and
+        are not used in this mode.
+        
+        Yields:
+            (local_path, remote_path, size) tuples
+        """
+        source_dir = Path(source_dir)
+        small_file_threshold = self.config.get("small_file_threshold", 10 * 1024 * 1024)
+        chunk_size = self.config.get("chunk_size", 100 * 1024 * 1024)
+        target_bundle_size = self.config.get("bundle_size", 50 * 1024 * 1024)
+        
+        scanner, journal, scan_started_ns = self._create_scanner(source_dir)
+        records = scanner.iter_scan(source_dir)
+        sjf = self.config.get("sjf_scheduling", True)
+        classes = self.priority_classes = PriorityClasses.from_config(self.config)
+        root = os.path.join(str(source_dir), '')
+        if classes is not None:
+            # Window ordered by aged class rank, then size (SJF) inside a class
+            records = ((path, size, mtime, classes.rank(self._relative_path(path, root)))
+                       for path, size, mtime in records)
+            records = self._sjf_window(
+                records, self.config.get("sjf_window", 1000),
+                key=lambda seq, record: (classes.stream_key(record[3], seq), record[1] if sjf else 0)
+            )
+            self.logger.info(f"Classes de priorité: {', '.join(classes.names)}")
+        else:
+            if sjf:
+                records = self._sjf_window(records, self.config.get("sjf_window", 1000))
+            records = ((path, size, mtime, 0) for path, size, mtime in records)
+        if sjf:
+            self.logger.info("SJF scheduling activé: ordre par taille sur une fenêtre glissante")
+        
+        # One open bundle per class, so a bundle never delays a higher class
+        open_bundles = {}
+        for path, file_size, mtime, rank in records:
+            if self.cancelled:
+                return
+            file_path = Path(path)
+            
+            # The stream moved on to a lower class: seal the bundles of the higher ones
+            for open_rank in [r for r in open_bundles if r < rank]:
+                yield self._write_stream_bundle(open_bundles.pop(open_rank)[0], source_dir, remote_temp_dir, open_rank)
+            
+            if file_size > small_file_threshold:
+                self.files_to_chunk.add(path, file_size, mtime)
+                manifest = FileChunker.chunk_file(
+                    file_path=file_path,
+                    source_folder=source_dir,
+                    output_folder=self.temp_dir,
+                    chunk_size_bytes=chunk_size,
+                    progress_callback=self.logger.info,
+                    logger=self.logger,
+                    persistent_chunks=True,
+                )
+                self.manifests.append(manifest)
+                self._set_manifest_rank(manifest, rank)
+                
+                chunk_folder_path = Path(manifest['persistent_source']) if manifest.get('persistent_source') else self.temp_dir / manifest["chunk_folder"]
+                remote_chunk_dir = f"{remote_temp_dir}/{manifest['chunk_folder']}".replace('\\', '/')
+                for chunk_info in manifest['chunks']:
+                    yield (str(chunk_folder_path / chunk_info['filename']),
+                           f"{remote_chunk_dir}/{chunk_info['filename']}", chunk_info['size'])
+                metadata_file = chunk_folder_path / "chunk_metadata.json"
+                yield (str(metadata_file), f"{remote_chunk_dir}/chunk_metadata.json", metadata_file.stat().st_size)
+            else:
+                self.files_to_batch.add(path, file_size, mtime)
+                bundle_files, bundle_bytes = open_bundles.get(rank, ([], 0))
+                if bundle_files and bundle_bytes + file_size > target_bundle_size:
+                    yield self._write_stream_bundle(bundle_files, source_dir, remote_temp_dir, rank)
+                    bundle_files, bundle_bytes = [], 0
+                bundle_files.append((file_path, file_size))
+                open_bundles[rank] = (bundle_files, bundle_bytes + file_size)
+        
+        for rank in sorted(open_bundles):
+            yield self._write_stream_bundle(open_bundles[rank][0], source_dir, remote_temp_dir, rank)
+        
+        if classes is not None:
+            order_file = self._write_priority_order()
+            yield str(order_file), f"{remote_temp_dir}/{PRIORITY_ORDER_NAME}", order_file.stat().st_size
+        
+        self._save_scan_journal(journal, scan_started_ns)
+        self.logger.info(f"Préparation en continu terminée: {len(self.manifests)} fichiers fragmentés, {len(self.files_to_batch)} fichiers groupés")
+    
+    def _write_stream_bundle(self, bundle_files, source_dir, remote_temp_dir, rank=0):
+        """Write the next streaming bundle and return its push item."""
+        bundle_path = self.temp_dir / f"bundle_stream_{len(self.bundle_paths):04d}.zip"
+        self._write_bundle(bundle_path, bundle_files, source_dir)
+        self.bundle_paths.append(bundle_path)
+        self.item_priority[str(bundle_path)] = rank
+        bundle_size = bundle_path.stat().st_size
+        self.logger.success(f"Bundle {bundle_path.name}: {bundle_size / (1024 * 1024):.2f} MB ({len(bundle_files)} fichiers)")
+        return str(bundle_path), f"{remote_temp_dir}/{bundle_path.name}", bundle_size
+    
+    @staticmethod
+    def _sjf_window(records, window, key=None):
+        """Approximate SJF over a stream: always emit the smallest of the next `window` files.
+        
+        `key(sequence, record)` replaces the size as ordering key (e.g. priority class first).
+        """
+        heap = []
+        for sequence, record in enumerate(records):
+            heapq.heappush(heap, (record[1] if key is None else key(sequence, record), sequence, record))
+            if len(heap) > window:
+                yield heapq.heappop(heap)[2]
+        while heap:
+            yield heapq.heappop(heap)[2]
+    
+    @staticmethod
+    def fan_out_items(items, count):
+        """Split one item iterator into `count` iterators that each see every item.
+        
+        A producer thread drains `items`, so every consumer (one per device) can
+        progress at its own pace while the source is still being prepared.
+        """
+        queues = [queue.Queue() for _ in range(count)]
+        
+        def produce():
+            try:
+                for item in items:
+                    for q in queues:
+                        q.put(item)
+                end = _STREAM_END
+            except Exception as e:
+                end = e
+            for q in queues:
+                q.put(end)
+        
+        def consume(q):
+            while True:
+                item = q.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        
+        threading.Thread(target=produce, daemon=True).start()
+        return [consume(q) for q in queues]
+
     def scan_files(self, source_dir):
         """Scan directory for files, split into large (chunk) and small (batch) lists.
         
@@ -132,122 +492,471 @@ class TransferManager:
         """
         small_file_threshold = self.config.get("small_file_threshold", 10 * 1024 * 1024)
         
-        # Temporary list to store files with their sizes for sorting
-        files_with_sizes = []
+        # Records go straight into the columnar inventory, no per-file Path/tuple is kept
+        scanner, journal, scan_started_ns = self._create_scanner(source_dir)
+        self.reset_file_lists()
+        inventory = self.inventory
+        inventory.extend(scanner.iter_scan(source_dir))
+        self._save_scan_journal(journal, scan_started_ns)
         
-        for root, dirs, files in os.walk(source_dir):
-            # Skip chunk folders - don't descend into them
-            dirs[:] = [d for d in dirs if not d.endswith('_chunks')]
-            
-            for file in files:
-                file_path = Path(root) / file
-                try:
-                    file_size = file_path.stat().st_size
-                    files_with_sizes.append((file_path, file_size))
-                except OSError as e:
-                    self.logger.error(f"Erreur lors de l'accès au fichier {file_path}: {e}")
+        order = inventory.path_order()
+        sizes = inventory.sizes
         
         # Apply SJF (Shortest Job First) scheduling if enabled
         if self.config.get("sjf_scheduling", True):
-            files_with_sizes.sort(key=lambda x: x[1])  # Sort by size, smallest first
+            order = sorted(order, key=sizes.__getitem__)  # Sort by size, smallest first (stable)
             self.logger.info("SJF scheduling activé: fichiers triés par taille")
         
-        # Split into large and small files
-        for file_path, file_size in files_with_sizes:
-            if file_size > small_file_threshold:
-                self.files_to_chunk.append(file_path)
-            else:
-                self.files_to_batch.append((file_path, file_size))  # Store size for bin packing
+        # Priority classes come before SJF: stable sort on the class rank
+        self.priority_classes = PriorityClasses.from_config(self.config)
+        if self.priority_classes is not None:
+            self.file_ranks = self._rank_files(source_dir)
+            order = sorted(order, key=self.file_ranks.__getitem__)
+        
+        self.scan_order = order
+        self._split_files(small_file_threshold)
+        self.logger.info(f"Inventaire: {len(inventory)} fichiers, {inventory.nbytes() / (1024 * 1024):.1f} MB en mémoire")
+
+    @staticmethod
+    def _relative_path(path, root):
+        """Path relative to the source folder with '/' separators (root ends with a separator)."""
+        rel = path[len(root):] if path.startswith(root) else os.path.relpath(path, root)
+        return rel.replace('\\', '/')
+    
+    def _rank_files(self, source_dir):
+        """Priority class rank of every inventory record, logged per class."""
+        classes = self.priority_classes
+        inventory = self.inventory
+        root = os.path.join(str(source_dir), '')
+        ranks = array('H', (classes.rank(self._relative_path(inventory.path_str(i), root)) for i in range(len(inventory))))
+        counts = [0] * len(classes.names)
+        for rank in ranks:
+            counts[rank] += 1
+        self.logger.info("Classes de priorité: " + ", ".join(
+            f"{name} ({count} fichier(s))" for name, count in zip(classes.names, counts)
+        ))
+        return ranks
+    
+    def _set_manifest_rank(self, manifest, rank):
+        """Give the chunks and metadata of a chunked file the class rank of the file."""
+        chunk_folder_path = Path(manifest['persistent_source']) if manifest.get('persistent_source') else self.temp_dir / manifest["chunk_folder"]
+        manifest['priority'] = rank
+        for chunk_info in manifest['chunks']:
+            self.item_priority[str(chunk_folder_path / chunk_info['filename'])] = rank
+        self.item_priority[str(chunk_folder_path / "chunk_metadata.json")] = rank
+    
+    def _write_priority_order(self):
+        """Write the on-device reassembly order (chunk folders and bundles, highest class first)."""
+        entries = [(manifest.get('priority', 0), manifest['chunk_folder'].replace('\\', '/')) for manifest in self.manifests]
+        entries += [(self.item_priority.get(str(bundle_path), 0), bundle_path.name) for bundle_path in self.bundle_paths]
+        order_path = self.temp_dir / PRIORITY_ORDER_NAME
+        with open(order_path, 'w', encoding='utf-8', newline='\n') as f:
+            for _, rel_path in sorted(entries, key=lambda entry: entry[0]):
+                f.write(rel_path + "\n")
+        return order_path
+    
+    def _split_files(self, small_file_threshold):
+        """Split the scanned inventory into large (chunk) and small (batch) views, keeping the scan order."""
+        sizes = self.inventory.sizes
+        order = self.scan_order
+        self.files_to_chunk = InventoryView(self.inventory, (i for i in order if sizes[i] > small_file_threshold))
+        self.files_to_batch = InventoryView(self.inventory, (i for i in order if sizes[i] <= small_file_threshold))
+        if self.duplicate_paths:
+            self.files_to_chunk = self.files_to_chunk.exclude(self.duplicate_paths)
+            self.files_to_batch = self.files_to_batch.exclude(self.duplicate_paths)
+
+    def plan_transfer(self, device_ids, dry_run=False):
+        """Build the transfer plan for the scanned files (see TransferPlanner).
+        
+        Device capabilities are probed over ADB and link rates come from the
+        throughput history of previous runs. With `auto_tune` enabled the
+        plan's chunk size, small-file threshold, bundle size and worker count
+        replace the configured ones for this transfer (never on a dry run).
+        
+        Returns:
+            TransferPlan
+        """
+        self.history = ThroughputHistory(get_cache_dir(self.config, "planner") / "throughput.json")
+        planner = TransferPlanner(self.config, self.history, self.logger)
+        device_caps = {device_id: TransferPlanner.probe_device(self.adb, device_id) for device_id in device_ids}
+        auto_tune = self.config.get("auto_tune", False)
+        
+        plan = planner.plan(self.files_to_chunk, self.files_to_batch, device_caps, auto_tune=auto_tune)
+        plan.log(self.logger, dry_run=dry_run)
+        if dry_run:
+            return plan
+        
+        self.plan = plan
+        self.progress.set_estimates(plan.phases)
+        if auto_tune:
+            self.apply_plan(plan)
+        return plan
+
+    def apply_plan(self, plan):
+        """Execute `plan`: its settings override the config for this manager only."""
+        previous_threshold = self.config.get("small_file_threshold", 10 * 1024 * 1024)
+        # Copy, so the tuned values never end up saved in config.json
+        self.config = dict(self.config, **plan.settings)
+        self.plan = plan
+        if self.scan_order is not None and plan.settings["small_file_threshold"] != previous_threshold:
+            self._split_files(plan.settings["small_file_threshold"])
+            self.logger.info(f"Plan appliqué: {len(self.files_to_chunk)} fichiers à fragmenter, {len(self.files_to_batch)} en lots")
+
+    def dry_run(self, source_dir, device_ids):
+        """Scan and plan without preparing or pushing anything.
+        
+        Returns:
+            TransferPlan with the predicted duration of each phase
+        """
+        self.logger.info("Simulation: analyse des fichiers...")
+        self.scan_files(source_dir)
+        self.deduplicate_files(source_dir, dry_run=True)
+        return self.plan_transfer(device_ids, dry_run=True)
+
+    def record_phase(self, phase, seconds, total_bytes=None, device_id=None, workers=None):
+        """Record a measured phase for the predicted/actual comparison and the throughput history."""
+        if self.plan is None:
+            return
+        self.plan.record_actual(phase, seconds)
+        if total_bytes is None:
+            total_bytes = self.plan.stats["chunk_bytes"] + self.plan.stats["bundle_bytes"]
+        if phase == "prepare":
+            self.history.record_local("prepare_mbps", total_bytes, seconds)
+        elif phase == "transfer" and device_id:
+            workers = workers or self.config.get("parallel_processes", 4)
+            self.history.record_link(device_id, workers, total_bytes, seconds)
+        elif phase == "reassembly" and device_id:
+            self.history.record_device(device_id, "reassembly_mbps", total_bytes, seconds)
+
+    def finish_plan(self):
+        """Log predicted vs actual durations and persist the measured rates."""
+        if self.plan is None:
+            return
+        self.plan.log_comparison(self.logger)
+        self.history.save()
+
+    def deduplicate_files(self, source_dir, dry_run=False):
+        """Drop byte-identical copies from the scan results before planning and preparation.
+        
+        Only one copy of each payload is chunked/bundled and pushed. The others
+        are recreated on the device by a batched script (see FileDeduplicator)
+        that unified.sh runs after reassembly (not written on a dry run).
+        """
+        if not self.config.get("deduplicate_files", True):
+            return
+        
+        source_dir = Path(source_dir)
+        min_size = self.config.get("dedup_min_size", 64 * 1024)
+        candidates = [
+            (entry.path, entry.size) for view in (self.files_to_chunk, self.files_to_batch)
+            for entry in view if entry.size >= min_size
+        ]
+        sizes = dict(candidates)
+        
+        groups = FileDeduplicator.find_duplicates(
+            candidates,
+            min_size=min_size,
+            workers=self.config.get("parallel_processes", 4),
+        )
+        if not groups:
+            return
+        
+        duplicates = set()
+        for group in groups:
+            canonical = group[0].relative_to(source_dir).as_posix()
+            for duplicate in group[1:]:
+                duplicates.add(str(duplicate))
+                self.duplicate_links.append((canonical, duplicate.relative_to(source_dir).as_posix()))
+                self.dedup_saved_bytes += sizes[duplicate]
+        
+        self.duplicate_paths |= duplicates
+        self.files_to_chunk = self.files_to_chunk.exclude(duplicates)
+        self.files_to_batch = self.files_to_batch.exclude(duplicates)
+        
+        if not dry_run:
+            FileDeduplicator.generate_materialize_script(self.temp_dir, self.duplicate_links, self.logger)
+        self.logger.success(
+            f"Déduplication: {len(self.duplicate_links)} copie(s) identique(s), "
+            f"{self.dedup_saved_bytes / (1024 * 1024):.2f} MB économisés"
+        )
 
     def process_files(self, source_dir: Path):
         # Process large files
-        for file_path in self.files_to_chunk:
+        # With direct placement, files that fit in one chunk are pushed as-is to the destination
+        chunk_size = self.config.get("chunk_size", 100 * 1024 * 1024)
+        direct_root = self._direct_root()
+        root = os.path.join(str(source_dir), '')
+        self.direct_files = []
+        for entry in self.files_to_chunk:
+            if direct_root is not None and entry.size <= chunk_size:
+                path = entry.path_str
+                self.direct_files.append((path, self._relative_path(path, root), entry.size))
+                if self.file_ranks is not None:
+                    self.item_priority[path] = self.file_ranks[entry.index]
+                continue
             manifest = FileChunker.chunk_file(
-                file_path=file_path,
+                file_path=entry.path,
                 source_folder=source_dir,
                 output_folder=self.temp_dir,
-                chunk_size_bytes=self.config.get("chunk_size", 100 * 1024 * 1024),
+                chunk_size_bytes=chunk_size,
                 progress_callback=self.logger.info,
                 logger=self.logger,
                 persistent_chunks=True,  # Enable persistent chunks
             )
             self.manifests.append(manifest)
+            if self.file_ranks is not None:
+                self._set_manifest_rank(manifest, self.file_ranks[entry.index])
 
             # Note: No copy needed! Transfer will read directly from persistent_source
+        if self.direct_files:
+            self.logger.info(f"Placement direct: {len(self.direct_files)} fichier(s) envoyé(s) sans fragmentation vers {direct_root}")
 
         # Process small files - Create ZIP bundles using bin packing for efficient transfer
         # The unified.sh script on device already handles bundle_*.zip extraction
+        # With priority classes, each class is packed separately (highest class first)
         if self.files_to_batch:
             target_bundle_size = self.config.get("bundle_size", 50 * 1024 * 1024)  # 50MB default
             
-            # Use First Fit Decreasing (FFD) bin packing algorithm
-            bundles = self._bin_pack_files(self.files_to_batch, target_bundle_size)
-            
-            self.logger.info(f"Création de {len(bundles)} bundle(s) ZIP pour {len(self.files_to_batch)} petits fichiers...")
-            
-            for i, bundle_files in enumerate(bundles):
-                bundle_name = f"bundle_batch_{i:03d}.zip" if len(bundles) > 1 else "bundle_batch.zip"
-                bundle_path = self.temp_dir / bundle_name
+            if self.config.get("incremental_bundles", False):
+                self._build_incremental_bundles(source_dir, target_bundle_size)
+            else:
+                # Use Best Fit Decreasing (BFD) bin packing algorithm
+                bundles = [
+                    (rank, view, positions)
+                    for rank, view in self._class_views(self.files_to_batch)
+                    for positions in self._bin_pack_files(view, target_bundle_size)
+                ]
                 
-                with zipfile.ZipFile(bundle_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
-                    # Use compression level 1 (fastest) - we want speed, not max compression
-                    for file_path, file_size in bundle_files:
-                        rel_path = file_path.relative_to(source_dir)
-                        zf.write(file_path, arcname=str(rel_path))
+                self.logger.info(f"Création de {len(bundles)} bundle(s) ZIP pour {len(self.files_to_batch)} petits fichiers...")
                 
+                for i, (rank, view, positions) in enumerate(bundles):
+                    bundle_files = view.entries(positions)
+                    bundle_name = f"bundle_batch_{i:03d}.zip" if len(bundles) > 1 else "bundle_batch.zip"
+                    bundle_path = self.temp_dir / bundle_name
+                    self._write_bundle(bundle_path, bundle_files, source_dir)
+                    self.bundle_paths.append(bundle_path)
+                    self.item_priority[str(bundle_path)] = rank
+                    
+                    bundle_size_mb = bundle_path.stat().st_size / (1024 * 1024)
+                    self.logger.success(f"Bundle {bundle_name}: {bundle_size_mb:.2f} MB ({len(bundle_files)} fichiers)")
+        
+        if self.priority_classes is not None:
+            self._write_priority_order()
+    
+    def _class_views(self, files):
+        """Split a view by priority class, highest class first (a single view without classes)."""
+        if self.file_ranks is None:
+            return [(0, files)]
+        by_rank = {}
+        for index in files.indices:
+            by_rank.setdefault(self.file_ranks[index], array('I')).append(index)
+        return [(rank, InventoryView(files.inventory, by_rank[rank])) for rank in sorted(by_rank)]
+    
+    def _write_bundle(self, bundle_path, bundle_files, source_dir):
+        """Write a list of (file_path, file_size) tuples into a ZIP bundle."""
+        with zipfile.ZipFile(bundle_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            # Use compression level 1 (fastest) - we want speed, not max compression
+            for file_path, file_size in bundle_files:
+                rel_path = file_path.relative_to(source_dir)
+                zf.write(file_path, arcname=str(rel_path))
+    
+    def _build_incremental_bundles(self, source_dir, target_bundle_size):
+        """Build content-addressed bundles in the local cache, reusing unchanged ones.
+        
+        Bundles are grouped deterministically (see BundlePacker.pack_stable) and
+        named after their members' fingerprints, so a bundle whose files did not
+        change keeps the same name and is reused as-is from a previous run.
+        Cached bundles no longer referenced by this source are pruned.
+        """
+        cache_dir = get_cache_dir(self.config, "bundles", path_key(Path(source_dir).resolve()))
+        bundles = [
+            (rank, bundle_files)
+            for rank, view in self._class_views(self.files_to_batch)
+            for bundle_files in BundlePacker.pack_stable(view, target_bundle_size, source_dir)
+        ]
+        
+        self.logger.info(f"Bundles incrémentaux: {len(bundles)} bundle(s) pour {len(self.files_to_batch)} petits fichiers...")
+        
+        built = 0
+        reused = 0
+        for rank, bundle_files in bundles:
+            bundle_name = f"bundle_{BundlePacker.bundle_id(bundle_files, source_dir)}.zip"
+            bundle_path = cache_dir / bundle_name
+            
+            if bundle_path.exists():
+                reused += 1
+            else:
+                # Write under a temporary name so an interrupted run never leaves a truncated bundle
+                partial_path = bundle_path.with_suffix(".zip.part")
+                self._write_bundle(partial_path, bundle_files, source_dir)
+                os.replace(partial_path, bundle_path)
+                built += 1
                 bundle_size_mb = bundle_path.stat().st_size / (1024 * 1024)
                 self.logger.success(f"Bundle {bundle_name}: {bundle_size_mb:.2f} MB ({len(bundle_files)} fichiers)")
+            
+            self.bundle_paths.append(bundle_path)
+            self.item_priority[str(bundle_path)] = rank
+        
+        # Prune stale bundles from previous runs of this source
+        current = set(self.bundle_paths)
+        for stale_path in cache_dir.glob("bundle_*.zip*"):
+            if stale_path not in current:
+                try:
+                    stale_path.unlink()
+                except OSError as e:
+                    self.logger.warning(f"Impossible de supprimer {stale_path.name}: {e}")
+        
+        self.logger.info(f"Bundles incrémentaux: {built} créé(s), {reused} réutilisé(s)")
     
-    def _bin_pack_files(self, files_with_sizes, target_size):
-        """Pack files into bundles using First Fit Decreasing algorithm.
+    def _bin_pack_files(self, files, target_size):
+        """Pack files into bundles using Best Fit Decreasing (see BundlePacker).
+        
+        If bundle balancing is enabled, the bundle count is rounded up to a
+        multiple of the worker count so parallel pushes finish together.
+        Packing runs on the typed size array of the view.
         
         Args:
-            files_with_sizes: List of (file_path, file_size) tuples
+            files: InventoryView of the files to bundle
             target_size: Target size per bundle in bytes
             
         Returns:
-            List of bundles, where each bundle is a list of (file_path, file_size) tuples
+            List of bundles, each an array of positions in `files`
         """
-        # Sort by size descending (FFD algorithm)
-        sorted_files = sorted(files_with_sizes, key=lambda x: x[1], reverse=True)
-        
-        bundles = []
-        bundle_sizes = []
-        
-        for file_path, file_size in sorted_files:
-            # Find first bundle that can fit this file
-            placed = False
-            for i, current_size in enumerate(bundle_sizes):
-                if current_size + file_size <= target_size:
-                    bundles[i].append((file_path, file_size))
-                    bundle_sizes[i] += file_size
-                    placed = True
-                    break
-            
-            # If no bundle can fit, create a new one
-            if not placed:
-                bundles.append([(file_path, file_size)])
-                bundle_sizes.append(file_size)
-        
-        return bundles
+        sizes = files.sizes()
+        if self.config.get("balance_bundles", True):
+            workers = self.config.get("parallel_processes", 4)
+            return BundlePacker.pack_for_workers_indices(sizes, target_size, workers)
+        return BundlePacker.pack_indices(sizes, target_size)
 
-    def parallel_transfer(self, remote_temp_dir, device_id):
+    def parallel_transfer(self, remote_temp_dir, device_id, items=None):
         """Transfer chunks individually with per-device worker pool.
         
         Features:
-        - Resume support: skips chunks that already exist with correct size
+        - Resume support: skips chunks that already exist with correct size,
+          from the local transfer ledger checked against one remote listing
         - Multiple bundle support: handles multiple ZIP bundles from bin packing
+        - Streaming: `items` can be an iterator of (local_path, remote_path, size)
+          produced while the source is still being scanned and prepared
         """
         max_workers = self.config.get("parallel_processes", 4)
         resume_enabled = self.config.get("resume_transfer", True)
         
-        # Create remote temp dir
-        self.adb.run_command(f'shell "mkdir -p {remote_temp_dir}"', device_id)
+        # Everything after this point releases the device's share of the shared
+        # scheduler and read cache, even when resume or item collection fails
+        scheduler = self.bandwidth_scheduler
+        try:
+            # Create remote temp dir
+            self.adb.run_command(f'shell "mkdir -p {remote_temp_dir}"', device_id)
+            self._prepare_resume(remote_temp_dir, device_id, resume_enabled)
+
+            if items is None:
+                files_to_transfer = self._collect_transfer_items(remote_temp_dir, device_id)
+                total_files = len(files_to_transfer)
+            else:
+                files_to_transfer = self._skip_existing_items(items, device_id) if resume_enabled else items
+                total_files = None
+        
+            # Transfer all files in parallel using worker pool
+            if total_files is None:
+                self.logger.info(f"[{device_id}] Transfert en continu avec {max_workers} workers...")
+            else:
+                self.logger.info(f"[{device_id}] Transfert de {total_files} fichiers avec {max_workers} workers...")
+        
+            total_bytes = sum(item[2] for item in files_to_transfer) if total_files is not None else None
+            if scheduler is not None:
+                scheduler.register(device_id, total_bytes)
+        
+            self.watchdog = self._create_watchdog(device_id)
+            transports = self.transports or [device_id]
+            self._compress_transports = {t for t in transports if self._compression_enabled(t)}
+            self.multipath = None
+            if len(transports) > 1:
+                self.multipath = MultipathStriper(transports, logger=self.logger, name=device_id)
+                self.logger.info(f"[{device_id}] Transfert multi-chemin via {', '.join(transports)}")
+            self.progress.start_device(device_id, total_bytes, total_files)
+            push_start_time = time.time()
+            transfer_results = self._push_items(files_to_transfer, device_id, max_workers, total_files)
+            self.progress.device_done(device_id, bool(transfer_results) and not transfer_results['failed'])
+        finally:
+            if scheduler is not None:
+                scheduler.finish(device_id)
+            if self.read_cache is not None:
+                self.read_cache.finish(device_id)
+            if self.ledger is not None:
+                self.ledger.close()
+        if transfer_results is None:
+            return False
+        if items is None:
+            # Streaming pushes overlap with preparation, so only batch runs measure the link
+            self.record_phase("transfer", time.time() - push_start_time, transfer_results['bytes'], device_id,
+                              workers=transfer_results['workers'])
+        total_files = len(transfer_results['successful']) + len(transfer_results['failed'])
+        
+        # Failed pushes were already retried inside the pool (_push_items)
+        if transfer_results['failed']:
+            self.logger.error(
+                f"[{device_id}] {len(transfer_results['failed'])} fichiers échoués "
+                f"après {transfer_results['retries']} nouvelle(s) tentative(s)"
+            )
+            return False
+
+        self.logger.success(f"[{device_id}] Transfert terminé: {total_files} fichiers")
+        
+        if self._direct_pending and not self._place_direct_files(self._direct_pending, device_id):
+            return False
+
+        # Post-transfer verification (BEFORE cleanup so we can retry if needed)
+        # Skip if skip_early_verification is enabled (user trusts ADB push)
+        skip_early = self.config.get("skip_early_verification", False)
+        verify_transfer = self.config.get("verify_transfer", True) and not skip_early
+        
+        if verify_transfer:
+            if not self._verify_transfer_on_device(remote_temp_dir, device_id):
+                self.logger.error(f"[{device_id}] Vérification échouée")
+                return False
+        elif skip_early:
+            self.logger.info(f"[{device_id}] Vérification précoce ignorée (mode rapide)")
 
+        # Aggressive cleanup: delete local chunk files AFTER successful verification
+        # Note: For persistent chunks, we keep them for reuse across transfers
+        # Only temp folder files (non-persistent) would be cleaned here
+        if self.config.get("aggressive_temp_cleanup", True):
+            self.logger.info(f"[{device_id}] Nettoyage des fichiers temporaires locaux...")
+            cleaned_files = 0
+            for manifest in self.manifests:
+                # Only clean temp folder (skip persistent chunks - they're reusable)
+                if not manifest.get('persistent_source'):
+                    chunk_folder_path = self.temp_dir / manifest["chunk_folder"]
+                    if chunk_folder_path.exists():
+                        # Delete only .bin files, keep metadata for verification
+                        chunk_files = list(chunk_folder_path.glob("chunk_*.bin"))
+                        for chunk_file in chunk_files:
+                            try:
+                                chunk_file.unlink()
+                                cleaned_files += 1
+                            except Exception as e:
+                                self.logger.warning(f"[{device_id}] Impossible de supprimer {chunk_file.name}: {e}")
+
+            if cleaned_files > 0:
+                self.logger.info(f"[{device_id}] Nettoyage terminé: {cleaned_files} fichiers supprimés")
+            else:
+                self.logger.info(f"[{device_id}] Aucun fichier temporaire à nettoyer (utilisation de chunks persistants)")
+
+        return True
+    
+    def _collect_transfer_items(self, remote_temp_dir, device_id):
+        """Build the list of (local_path, remote_path, size) to push for prepared files."""
+        resume_enabled = self.config.get("resume_transfer", True)
+        
         # Collect all files to transfer (chunks + metadata + batch files)
         files_to_transfer = []
         skipped_files = 0
-        future_to_file = {}  # Map futures to file info for tracking
+        
+        # Create all remote chunk directories in a few round-trips
+        self._make_remote_dirs(
+            [f"{remote_temp_dir}/{manifest['chunk_folder']}".replace('\\', '/') for manifest in self.manifests],
+            device_id
+        )
         
         # Add chunk files with resume support
         for manifest in self.manifests:
@@ -258,9 +967,9 @@ class TransferManager:
                 chunk_folder_path = self.temp_dir / manifest["chunk_folder"]
 
             remote_chunk_dir = f"{remote_temp_dir}/{manifest['chunk_folder']}".replace('\\', '/')
-
-            # Create remote chunk directory
-            self.adb.run_command(f'shell "mkdir -p {remote_chunk_dir}"', device_id)
+            for chunk_info in manifest.get('chunks', []):
+                if chunk_info.get('md5'):
+                    self._chunk_digests[str(chunk_folder_path / chunk_info['filename'])] = chunk_info['md5']
 
             # Get all chunk files and metadata
             chunk_files = sorted(chunk_folder_path.glob("chunk_*.bin"))
@@ -273,8 +982,9 @@ class TransferManager:
                 
                 # Resume support: check if file already exists with correct size
                 if resume_enabled:
-                    if self._check_remote_file_exists(remote_path, local_size, device_id):
+                    if self._is_already_pushed(chunk_file, remote_path, local_size, device_id):
                         skipped_files += 1
+                        self._release_cached(chunk_file, device_id)
                         continue  # Skip this file
                 
                 files_to_transfer.append((str(chunk_file), remote_path, local_size))
@@ -284,127 +994,865 @@ class TransferManager:
                 remote_metadata_path = f"{remote_chunk_dir}/chunk_metadata.json".replace('\\', '/')
                 files_to_transfer.append((str(metadata_file), remote_metadata_path, metadata_file.stat().st_size))
         
+        # Files pushed straight to their final path under a temporary name (direct placement)
+        self._direct_items = []
+        self._direct_pending = []
+        direct_root = self._direct_root()
+        if self.direct_files and direct_root is not None:
+            finals = [f"{direct_root}/{rel_path}" for _, rel_path, _ in self.direct_files]
+            self._make_remote_dirs(sorted({final.rsplit('/', 1)[0] for final in finals}), device_id)
+            placed = self._stat_remote_files(finals, device_id) if resume_enabled else {}
+            for (local_path, _, size), final in zip(self.direct_files, finals):
+                item = (local_path, final + DIRECT_PART_SUFFIX, final, size)
+                self._direct_items.append(item)
+                if placed.get(final) == size:
+                    skipped_files += 1
+                    self._release_cached(local_path, device_id)
+                    continue
+                self._direct_pending.append(item)
+                files_to_transfer.append((local_path, item[1], size))
+        
         if skipped_files > 0:
             self.logger.info(f"[{device_id}] Resume: {skipped_files} fichiers déjà présents, ignorés")
         
-        # Find and transfer all bundle ZIP files (supports multiple bundles from bin packing)
-        bundle_files = list(self.temp_dir.glob("bundle_batch*.zip"))
-        bundles_transferred = 0
+        # Add the deduplication script (always transferred, it is tiny)
+        dedup_script = self.temp_dir / DEDUP_SCRIPT_NAME
+        if dedup_script.exists():
+            files_to_transfer.append((str(dedup_script), f"{remote_temp_dir}/{DEDUP_SCRIPT_NAME}", dedup_script.stat().st_size))
         
-        for bundle_path in bundle_files:
+        # Add all bundle ZIP files to the same worker pool (supports multiple bundles from bin packing)
+        # Incremental bundles already extracted on the device by a previous run are skipped
+        self.extracted_bundles = self._get_extracted_bundles(remote_temp_dir, device_id)
+        
+        for bundle_path in self.bundle_paths:
+            if bundle_path.name in self.extracted_bundles:
+                self._release_cached(bundle_path, device_id)
+                continue
+            
             remote_bundle_path = f"{remote_temp_dir}/{bundle_path.name}".replace('\\', '/')
             bundle_size = bundle_path.stat().st_size
             
             # Resume support for bundles too
-            if resume_enabled and self._check_remote_file_exists(remote_bundle_path, bundle_size, device_id):
+            if resume_enabled and self._is_already_pushed(bundle_path, remote_bundle_path, bundle_size, device_id):
                 self.logger.info(f"[{device_id}] Resume: {bundle_path.name} déjà présent, ignoré")
+                self._release_cached(bundle_path, device_id)
                 continue
             
-            bundle_size_mb = bundle_size / (1024 * 1024)
-            self.logger.info(f"[{device_id}] Transfert de {bundle_path.name} ({bundle_size_mb:.2f} MB)...")
+            files_to_transfer.append((str(bundle_path), remote_bundle_path, bundle_size))
+        
+        if self.extracted_bundles:
+            unchanged = sum(1 for bundle_path in self.bundle_paths if bundle_path.name in self.extracted_bundles)
+            self.logger.info(f"[{device_id}] Bundles incrémentaux: {unchanged} bundle(s) inchangé(s), ignorés")
+        
+        # Priority classes: push class by class (stable, keeps SJF inside a class)
+        if self.priority_classes is not None:
+            priority_order = self.temp_dir / PRIORITY_ORDER_NAME
+            if priority_order.exists():
+                files_to_transfer.append((str(priority_order), f"{remote_temp_dir}/{PRIORITY_ORDER_NAME}", priority_order.stat().st_size))
+            default_rank = self.priority_classes.default_rank
+            files_to_transfer.sort(key=lambda item: self.item_priority.get(item[0], default_rank))
+        
+        return files_to_transfer
+    
+    def _prepare_resume(self, remote_temp_dir, device_id, resume_enabled):
+        """Open the device's transfer ledger and fetch the remote listing used for resume.
+        
+        The listing is one `find | stat` over the remote temp dir; if it fails,
+        resume falls back to one `stat` per item.
+        """
+        self._remote_listing = None
+        self.ledger = None
+        if self.config.get("transfer_ledger", True):
+            ledger_dir = get_cache_dir(self.config, "ledgers")
+            self.ledger = TransferLedger(
+                ledger_dir / f"{path_key(f'{device_id}:{remote_temp_dir}')}.jsonl",
+                device_id, remote_temp_dir, self.logger
+            )
+        if not resume_enabled:
+            return
+        
+        if self.ledger is not None:
+            self.ledger.load()
+        self._remote_listing = self._list_remote_files(remote_temp_dir, device_id)
+        if self._remote_listing is None:
+            self.logger.warning(f"[{device_id}] Listing distant impossible, vérification fichier par fichier")
+            return
+        if self.ledger is not None:
+            dropped = self.ledger.validate(self._remote_listing)
+            self.logger.info(
+                f"[{device_id}] Resume: {len(self.ledger.entries)} fichiers confirmés par le journal local"
+                + (f", {dropped} invalidés" if dropped else "")
+            )
+    
+    def _list_remote_files(self, remote_dir, device_id):
+        """Sizes of every file under `remote_dir` in one round-trip, or None on error."""
+        remote_dir = remote_dir.rstrip('/')
+        result = self.adb.run_command(
+            f'shell "find {remote_dir} -type f -exec stat -c \'%s %n\' {{}} + 2>/dev/null; true"',
+            device_id
+        )
+        if result is None:
+            return None
+        listing = {}
+        for line in result:
+            size, _, path = line.partition(' ')
+            if size.isdigit() and path:
+                listing[path] = int(size)
+        return listing
+    
+    def _direct_root(self):
+        """Destination directory of direct placement, None when files are staged in the temp dir."""
+        remote_temp_dir = self.config.get("remote_temp_dir", "/sdcard/transfer_temp")
+        return direct_placement_target(self.config, remote_temp_dir, self.target_dir)
+    
+    def _device_chunk_digests(self, chunk_dirs, device_id):
+        """MD5 of the chunks of `chunk_dirs` computed on the device ({remote path: md5}).
+        
+        Returns None when checksum verification is off, or when the device
+        has no working md5 tool (sizes are then the only check).
+        """
+        if not self.config.get("verify_checksums", False):
+            return None
+        if device_id not in self._checksummers:
+            jobs = int(self.config.get("device_parallel_jobs", 0))
+            checksummer = DeviceChecksummer.probe(self.adb, device_id, jobs=jobs)
+            if checksummer is None:
+                self.logger.warning(f"[{device_id}] md5sum indisponible sur l'appareil, vérification des tailles uniquement")
+            self._checksummers[device_id] = checksummer
+        checksummer = self._checksummers[device_id]
+        if checksummer is None:
+            return None
+        started = time.monotonic()
+        digests = checksummer.digests(chunk_dirs)
+        if digests is None:
+            self.logger.warning(f"[{device_id}] Calcul des MD5 sur l'appareil impossible, vérification des tailles uniquement")
+            return None
+        self.logger.info(
+            f"[{device_id}] MD5 de {len(digests)} chunk(s) calculés sur l'appareil en {time.monotonic() - started:.1f}s "
+            f"({checksummer.tool})"
+        )
+        return digests
+    
+    def _stat_remote_files(self, remote_paths, device_id, batch_size=50):
+        """Sizes of the given remote files that exist, with one `stat` per batch."""
+        return remote_sizes(self.adb, device_id, remote_paths, batch_size)
+    
+    def _place_direct_files(self, items, device_id, batch_size=50):
+        """Rename pushed direct files to their final path (atomic `mv` on the device), one command per batch.
+        
+        Returns:
+            True if every file is in place
+        """
+        failed = 0
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            moves = "; ".join(
+                f"mv -f {shlex.quote(part)} {shlex.quote(final)} 2>/dev/null || echo {shlex.quote(final)}"
+                for _, part, final, _ in batch
+            )
+            result = self.adb.run_command(f'shell "{moves}"', device_id)
+            if result is None:
+                failed += len(batch)
+                continue
+            for line in result:
+                if line.strip():
+                    failed += 1
+                    self.logger.error(f"[{device_id}] Placement impossible: {line.strip()}")
+        if failed:
+            self.logger.error(f"[{device_id}] Placement direct: {failed} fichier(s) non placé(s)")
+            return False
+        self.logger.info(f"[{device_id}] Placement direct: {len(items)} fichier(s) renommé(s) à leur emplacement final")
+        return True
+    
+    def _make_remote_dirs(self, remote_dirs, device_id, batch_size=50):
+        """`mkdir -p` many remote directories with one command per batch."""
+        for start in range(0, len(remote_dirs), batch_size):
+            batch = " ".join(shlex.quote(d) for d in remote_dirs[start:start + batch_size])
+            self.adb.run_command(f'shell "mkdir -p {batch}"', device_id)
+    
+    def _ledger_digest(self, local_path, size):
+        """Chunk MD5 from its manifest when known, else the local size and mtime."""
+        digest = self._chunk_digests.get(str(local_path))
+        if digest is None:
             try:
-                self.adb.run_command(f'push "{bundle_path}" "{remote_bundle_path}"', device_id)
-                bundles_transferred += 1
-                self.logger.success(f"[{device_id}] {bundle_path.name} transféré avec succès")
-            except Exception as e:
-                self.logger.error(f"[{device_id}] Échec du transfert de {bundle_path.name}: {e}")
+                digest = local_digest(local_path, size)
+            except OSError:
+                digest = ""
+        return digest
+    
+    def _is_already_pushed(self, local_path, remote_path, size, device_id):
+        """Resume check for one item.
+        
+        With a remote listing: the file must be listed with the right size and,
+        when the ledger knows previous pushes, recorded there with the same
+        digest (catches content rewritten at the same size). Without a listing:
+        one `stat` on the device.
+        """
+        if self._remote_listing is None:
+            return self._check_remote_file_exists(remote_path, size, device_id)
+        if self._remote_listing.get(remote_path) != size:
+            return False
+        if self.ledger is not None and self.ledger.entries:
+            return self.ledger.is_confirmed(remote_path, size, self._ledger_digest(local_path, size))
+        return True
+    
+    def _skip_existing_items(self, items, device_id):
+        """Resume support for streamed items: drop files already on the device with the right size."""
+        skipped_files = 0
+        for local_path, remote_path, file_size in items:
+            if not remote_path.endswith(".json") and self._is_already_pushed(local_path, remote_path, file_size, device_id):
+                skipped_files += 1
+                self._release_cached(local_path, device_id)
+                continue
+            yield local_path, remote_path, file_size
+        if skipped_files > 0:
+            self.logger.info(f"[{device_id}] Resume: {skipped_files} fichiers déjà présents, ignorés")
+    
+    def _push_items(self, items, device_id, max_workers, total_files=None, track_progress=True):
+        """Push (local_path, remote_path, size) items with a bounded number in flight.
         
-        # Transfer all files in parallel using worker pool
-        self.logger.info(f"[{device_id}] Transfert de {len(files_to_transfer)} fichiers avec {max_workers} workers...")
+        Items are pulled lazily, so an iterator that is still being produced
+        (streaming mode) starts pushing as soon as its first item is ready.
         
-        # Track transfer results
-        transfer_results = {
-            'successful': [],
-            'failed': []
-        }
+        With adaptive concurrency the number of pushes in flight follows an
+        AIMD controller fed with the device's measured throughput, starting
+        at `max_workers`.
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            
-            for local_path, remote_path, file_size in files_to_transfer:
-                future = executor.submit(
-                    self.adb.run_command,
-                    f'push "{local_path}" "{remote_path}"',
-                    device_id
-                )
-                futures.append(future)
-                future_to_file[future] = (local_path, remote_path)
-            
-            # Wait for all transfers to complete
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                # Check for cancellation
+        A failed push is resubmitted to the same pool after a jittered
+        exponential backoff (RetryPolicy), ahead of the items not pushed yet,
+        until its retry budget is spent (`_push_failed`). A per-device
+        CircuitBreaker pauses submissions after consecutive failures and gives
+        the device up (every remaining item failed) when it keeps tripping, as
+        does the stall watchdog once it fenced the device after repeated
+        stalls (`_give_up_device`).
+        
+        At the tail of the transfer (nothing left to submit, free slots), a
+        push running far longer than the median push rate predicts gets a
+        speculative backup copy to `<remote>.spec` (`_launch_backups`); the
+        first copy to finish wins and a winning backup is renamed over the
+        final path once the original push is killed (`_harvest_pushes`).
+        
+        Returns:
+            Dict with 'successful' and 'failed' lists of (local_path, remote_path),
+            the pushed 'bytes', the average number of 'workers', the number of
+            'retries', the total 'backoff_s', the number of 'stalls' and of
+            'speculative' backups, the 'compression' statistics (items, raw and
+            wire bytes, seconds), or None if the transfer was cancelled
+        """
+        run = self._start_push_run(items, device_id, max_workers, total_files, track_progress)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=run.pool_size) as executor:
+            while True:
                 if self.cancelled:
-                    self.logger.info(f"[{device_id}] Transfert annulé par l'utilisateur")
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    return False
-
+                    self._cancel_push_run(run, executor)
+                    return None
+                
+                self._fill_push_window(run, executor)
+                if not run.future_to_file:
+                    reason = self._give_up_reason(run)
+                    if reason:
+                        self._give_up_device(run, reason)
+                        break
+                    if run.exhausted:
+                        break
+                
+                # Tail of the transfer: idle slots go to backups of the stragglers
+                at_tail = run.speculate and run.exhausted
+                if at_tail and len(run.future_to_file) < run.limit:
+                    self._launch_backups(run, executor)
+                
+                timeout = self._push_wait_timeout(run, at_tail)
+                if run.future_to_file:
+                    done, _ = concurrent.futures.wait(run.future_to_file, timeout=timeout,
+                                                      return_when=concurrent.futures.FIRST_COMPLETED)
+                    self._harvest_pushes(run, done, executor)
+                elif timeout is not None:
+                    time.sleep(min(timeout, 0.5))  # Short naps keep cancellation responsive
+        
+        return self._finish_push_run(run)
+    
+    def _start_push_run(self, items, device_id, max_workers, total_files, track_progress):
+        """State of a new `_push_items` call: controllers, retry policy, breaker and deadlines."""
+        # Deadlines are only meaningful when the whole item list is known upfront
+        deadlines = None
+        if self.priority_classes is not None and total_files is not None:
+            deadlines = DeadlineTracker(self.priority_classes, self.item_priority, self.logger, device_id)
+            for item in items:
+                deadlines.add(item[0])
+        
+        controller = None
+        if self.config.get("adaptive_concurrency", True):
+            controller = AimdController(
+                initial=max_workers,
+                min_limit=self.config.get("min_parallel_processes", 1),
+                max_limit=self.config.get("max_parallel_processes", 8),
+                window_s=self.config.get("concurrency_window", 5),
+                logger=self.logger,
+                name=device_id,
+            )
+        
+        retry_enabled = self.config.get("retry_failed_chunks", True)
+        retry_policy = RetryPolicy(
+            max_retries=self.config.get("max_retries", 3) if retry_enabled else 0,
+            base_delay=self.config.get("retry_backoff_base", 1.0),
+            max_delay=self.config.get("retry_backoff_max", 30.0),
+        )
+        breaker = None
+        if self.config.get("circuit_breaker_threshold", 5) > 0:
+            breaker = CircuitBreaker(
+                threshold=self.config.get("circuit_breaker_threshold", 5),
+                cooldown_s=self.config.get("circuit_breaker_cooldown", 10),
+                logger=self.logger,
+                name=device_id,
+            )
+        speculation = SpeculationTracker(
+            factor=self.config.get("speculation_factor", 3.0),
+            min_seconds=self.config.get("speculation_min_seconds", 5),
+            budget_bytes=self.config.get("speculation_max_mb", 256) * 1024 * 1024,
+        )
+        self._push_rates.clear()
+        self._compression_stats = {'items': 0, 'raw': 0, 'wire': 0, 'seconds': 0.0}
+        return _PushRun(
+            items, device_id, max_workers, track_progress,
+            controller=controller,
+            retry_policy=retry_policy,
+            breaker=breaker,
+            watchdog=self.watchdog,
+            deadlines=deadlines,
+            speculation=speculation,
+            speculate=self.config.get("speculative_pushes", True),
+        )
+    
+    def _fill_push_window(self, run, executor):
+        """Submit pushes until the window is full: due retries first, then new items.
+        
+        Nothing is submitted while the watchdog fenced the device or the
+        circuit breaker holds it back; the next item then stays pending.
+        """
+        now = time.monotonic()
+        while len(run.future_to_file) < run.limit:
+            if run.pending is None:
+                due = run.retry_queue.pop_due(now)
+                if due is not None:
+                    run.pending = due
+                elif not run.source_done:
+                    item = next(run.source, None)
+                    if item is None:
+                        run.source_done = True
+                        continue
+                    run.pending = (item, 0)
+                else:
+                    break
+            if (run.watchdog and run.watchdog.fenced) or (run.breaker and not run.breaker.allow()):
+                break
+            (local_path, remote_path, file_size), attempt = run.pending
+            run.pending = None
+            future = executor.submit(self._push_file, local_path, remote_path, file_size, run.device_id)
+            run.future_to_file[future] = ((local_path, remote_path), file_size, attempt)
+    
+    def _push_wait_timeout(self, run, at_tail):
+        """How long to wait for a push to finish before looking at the window again.
+        
+        The wait ends early when the next retry is due (free slots only), when
+        the circuit breaker half-opens and, at the tail, to look for stragglers.
+        None waits for the next push to finish.
+        """
+        timeout = None
+        if run.retry_queue and len(run.future_to_file) < run.limit:
+            timeout = max(0.0, run.retry_queue.next_due() - time.monotonic())
+        if run.watchdog and run.watchdog.fenced:
+            timeout = None  # Only wait for the pushes still in flight
+        elif run.breaker and not run.breaker.tripped_out:
+            if run.breaker.state == CircuitBreaker.HALF_OPEN:
+                timeout = None  # Only the probe's outcome can unblock submissions
+            elif run.breaker.wait_time() > 0:
+                timeout = run.breaker.wait_time()
+        if at_tail:
+            timeout = SPECULATION_CHECK_S if timeout is None else min(timeout, SPECULATION_CHECK_S)
+        return timeout
+    
+    def _push_succeeded(self, run, file_info, file_size, output):
+        """Account a finished push: progress, controllers, ledger and deadlines."""
+        if run.track_progress:
+            self.progress.item_done(run.device_id, self._pushed_bytes(output, file_size))
+        if run.controller:
+            run.controller.record(file_size)
+        if run.breaker:
+            run.breaker.record(True)
+        if self.ledger is not None:
+            self.ledger.record(file_info[1], file_size, self._ledger_digest(file_info[0], file_size))
+        if run.deadlines is not None:
+            run.deadlines.done(file_info[0])
+        run.results['successful'].append(file_info)
+        run.results['bytes'] += file_size
+    
+    def _push_failed(self, run, file_info, file_size, attempt, error):
+        """Queue a failed push for a retry after its backoff, or fail it once its budget is spent.
+        
+        A push that failed because the transfer was cancelled is only noted
+        as interrupted (its partial file is removed by `_abort_pushes`).
+        """
+        device_id = run.device_id
+        if self.cancelled:
+            run.interrupted.append(file_info[1])
+            return
+        if run.controller:
+            run.controller.record(file_size, success=False)
+        if run.breaker:
+            run.breaker.record(False)
+        delay = run.retry_policy.next_delay(attempt + 1)
+        if delay is None:
+            run.results['failed'].append(file_info)
+            self.logger.error(f"[{device_id}] Échec transfert: {Path(file_info[0]).name} - {error}")
+            return
+        self.logger.warning(
+            f"[{device_id}] Échec transfert: {Path(file_info[0]).name} - {error}, "
+            f"nouvelle tentative {attempt + 1}/{run.retry_policy.max_retries} dans {delay:.1f}s"
+        )
+        run.retry_queue.push((file_info[0], file_info[1], file_size), attempt + 1, delay)
+    
+    def _harvest_pushes(self, run, done, executor):
+        """Settle the finished futures: plain pushes, speculative races and promotions."""
+        device_id = run.device_id
+        speculation = run.speculation
+        for future in done:
+            file_info, file_size, attempt = run.future_to_file.pop(future)
+            remote_path = file_info[1]
+            if speculation.is_loser(future):
+                if speculation.end_loser(future):
+                    # Losing backup: drop its partial copy
+                    self._forget_abandoned(remote_path + SPECULATIVE_SUFFIX)
+                    self._remove_remote_files([remote_path + SPECULATIVE_SUFFIX], device_id)
+                else:
+                    self._forget_abandoned(remote_path)
+                continue
+            
+            if speculation.is_backup(future):
+                primary = speculation.end_backup(future)
                 try:
-                    result = future.result()
-                    file_info = future_to_file[future]
-                    transfer_results['successful'].append(file_info)
-                    completed += 1
-                    if completed % 10 == 0:  # Log progress every 10 files
-                        progress = (completed / len(files_to_transfer)) * 100
-                        self.logger.info(f"[{device_id}] Progression: {completed}/{len(files_to_transfer)} ({progress:.1f}%)")
+                    future.result()
                 except Exception as e:
-                    file_info = future_to_file[future]
-                    transfer_results['failed'].append(file_info)
-                    self.logger.error(f"[{device_id}] Échec transfert: {Path(file_info[0]).name} - {e}")
+                    self._remove_remote_files([remote_path + SPECULATIVE_SUFFIX], device_id)
+                    if primary is None:
+                        self._push_failed(run, file_info, file_size, attempt, e)
+                    continue
+                # The backup won: stop the original, then rename the copy into place
+                if primary is not None:
+                    self._abandon_push(remote_path)
+                self.logger.info(f"[{device_id}] Copie spéculative plus rapide: {Path(file_info[0]).name}")
+                promotion = executor.submit(self._promote_backup, primary, remote_path, file_size, device_id)
+                run.future_to_file[promotion] = (file_info, file_size, attempt)
+                speculation.backup_won(primary, promotion)
+                continue
+            
+            backup = speculation.end_primary(future)
+            try:
+                output = future.result()
+            except Exception as e:
+                if backup is not None:
+                    speculation.primary_failed(backup)
+                    continue
+                self._push_failed(run, file_info, file_size, attempt, e)
+                continue
+            if backup is not None:
+                speculation.primary_won(backup)
+                self._abandon_push(remote_path + SPECULATIVE_SUFFIX)
+            self._push_succeeded(run, file_info, file_size, output)
+    
+    def _launch_backups(self, run, executor):
+        """Start speculative copies of the stragglers while slots are idle."""
+        if len(self._push_rates) < SPECULATION_MIN_SAMPLES:
+            return
+        median_rate = statistics.median(self._push_rates)
+        now = time.monotonic()
+        speculation = run.speculation
+        for future, (file_info, file_size, attempt) in list(run.future_to_file.items()):
+            if len(run.future_to_file) >= run.limit:
+                return
+            if speculation.busy(future):
+                continue
+            started = self._push_started(file_info[1])
+            if started is None:
+                continue  # Not running yet, or a promotion
+            elapsed = now - started
+            if not speculation.is_straggler(elapsed, file_size, median_rate):
+                continue
+            self.logger.info(
+                f"[{run.device_id}] Copie spéculative de {Path(file_info[0]).name} "
+                f"({elapsed:.0f}s écoulées, ~{file_size / median_rate:.0f}s attendues)"
+            )
+            backup = executor.submit(self._push_file, file_info[0], file_info[1] + SPECULATIVE_SUFFIX,
+                                     file_size, run.device_id, True)
+            run.future_to_file[backup] = (file_info, file_size, attempt)
+            speculation.launch(future, backup, file_size)
+    
+    @staticmethod
+    def _give_up_reason(run):
+        """Why the device is given up (circuit tripped out, fenced by the watchdog), else None."""
+        if run.breaker and run.breaker.tripped_out:
+            return f"{run.breaker.trips} ouverture(s) du circuit"
+        if run.watchdog and run.watchdog.fenced:
+            return f"{run.watchdog.stalls} transfert(s) bloqué(s)"
+        return None
+    
+    def _give_up_device(self, run, reason):
+        """The device was given up: fail everything not pushed yet."""
+        remaining = run.retry_queue.drain()
+        if run.pending is not None:
+            remaining.append(run.pending[0])
+            run.pending = None
+        remaining.extend(run.source)  # Drain the stream so the other devices are not blocked
+        run.source_done = True
+        for local_path, remote_path, _ in remaining:
+            run.results['failed'].append((local_path, remote_path))
+            self._release_cached(local_path, run.device_id)
+        self.logger.error(f"[{run.device_id}] Appareil abandonné ({reason}), {len(remaining)} fichier(s) non transféré(s)")
+    
+    def _cancel_push_run(self, run, executor):
+        """Stop a cancelled `_push_items` call: drop the queued pushes, kill the running ones."""
+        self.logger.info(f"[{run.device_id}] Transfert annulé par l'utilisateur")
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._abort_pushes(run.future_to_file, run.speculation.backup_of, run.interrupted, run.device_id)
+    
+    def _finish_push_run(self, run):
+        """Fill in the run's statistics, log and export its metrics; returns the results dict."""
+        device_id = run.device_id
+        results = run.results
+        speculation = run.speculation
+        results['retries'] = run.retry_policy.retries
+        results['backoff_s'] = run.retry_policy.backoff_seconds
+        if run.controller:
+            results['workers'] = max(1, round(run.controller.average_limit()))
+        if run.watchdog:
+            results['stalls'] = run.watchdog.stalls
+        results['speculative'] = speculation.launched
+        if speculation.launched:
+            self.logger.info(
+                f"[{device_id}] Copies spéculatives: {speculation.launched} lancée(s), "
+                f"{speculation.won} gagnante(s), {speculation.bytes / (1024 * 1024):.1f} MB dupliqués"
+            )
+        results['compression'] = dict(self._compression_stats)
+        self._log_compression(device_id)
+        if self.multipath is not None:
+            results['multipath'] = self.multipath.metrics()
+            self.multipath.log_summary()
+        self._export_push_metrics(device_id, run.controller, run.retry_policy, run.breaker, run.watchdog,
+                                  speculation.metrics())
+        return results
+    
+    def _push_file(self, local_path, remote_path, file_size, device_id, speculative=False):
+        """Run one push, holding a slot of the shared bandwidth scheduler if any.
         
-        # Check for failed transfers
-        if transfer_results['failed']:
-            self.logger.warning(f"[{device_id}] {len(transfer_results['failed'])} fichiers échoués")
-
-            # Retry failed chunks if enabled
-            if self.config.get("retry_failed_chunks", True):
-                if self._retry_failed_chunks(transfer_results['failed'], device_id):
-                    self.logger.success(f"[{device_id}] Tous les fichiers échoués ont été retransférés")
-                else:
-                    self.logger.error(f"[{device_id}] Certains fichiers n'ont pas pu être transférés")
-                    return False
-
-        self.logger.success(f"[{device_id}] Transfert terminé: {len(files_to_transfer)} fichiers")
-
-        # Post-transfer verification (BEFORE cleanup so we can retry if needed)
-        # Skip if skip_early_verification is enabled (user trusts ADB push)
-        skip_early = self.config.get("skip_early_verification", False)
-        verify_transfer = self.config.get("verify_transfer", True) and not skip_early
+        With a shared read cache the content is taken from the cache (read
+        from disk by the first device only) and written with `exec-in`;
+        files the cache does not hold are pushed from disk with `adb push`.
+        The cache is consulted before taking a bandwidth slot, so a device
+        waiting for cache room never holds slots the slower devices need.
         
-        if verify_transfer:
-            if not self._verify_transfer_on_device(remote_temp_dir, device_id):
-                self.logger.error(f"[{device_id}] Vérification échouée")
-                return False
-        elif skip_early:
-            self.logger.info(f"[{device_id}] Vérification précoce ignorée (mode rapide)")
-
-        # Aggressive cleanup: delete local chunk files AFTER successful verification
-        # Note: For persistent chunks, we keep them for reuse across transfers
-        # Only temp folder files (non-persistent) would be cleaned here
-        if self.config.get("aggressive_temp_cleanup", True):
-            self.logger.info(f"[{device_id}] Nettoyage des fichiers temporaires locaux...")
-            cleaned_files = 0
-            for manifest in self.manifests:
-                # Only clean temp folder (skip persistent chunks - they're reusable)
-                if not manifest.get('persistent_source'):
-                    chunk_folder_path = self.temp_dir / manifest["chunk_folder"]
-                    if chunk_folder_path.exists():
-                        # Delete only .bin files, keep metadata for verification
-                        chunk_files = list(chunk_folder_path.glob("chunk_*.bin"))
-                        for chunk_file in chunk_files:
-                            try:
-                                chunk_file.unlink()
-                                cleaned_files += 1
-                            except Exception as e:
-                                self.logger.warning(f"[{device_id}] Impossible de supprimer {chunk_file.name}: {e}")
-
-            if cleaned_files > 0:
-                self.logger.info(f"[{device_id}] Nettoyage terminé: {cleaned_files} fichiers supprimés")
-            else:
-                self.logger.info(f"[{device_id}] Aucun fichier temporaire à nettoyer (utilisation de chunks persistants)")
-
+        Compressible items to a device with compressed pushes enabled are
+        streamed as their cached gzip blob and decompressed on the device
+        (`exec-in gzip -dc`); a failed compressed push falls back to the raw one.
+        
+        Once the slot is held, the stall watchdog follows the push and kills
+        it if it stops making progress (PushStalledError). The adb process is
+        registered under `remote_path` so a push that lost a speculative race
+        can be killed; `speculative` backups do not feed the median push rate.
+        
+        When the device is reachable over several transports (USB and WiFi),
+        the multi-path striper picks the link for the adb commands of this
+        push; the scheduler, cache and logs keep the logical `device_id`.
+        """
+        striper = self.multipath
+        transport = striper.pick(file_size) if striper is not None else device_id
+        try:
+            return self._push_file_over(local_path, remote_path, file_size, device_id, transport, speculative)
+        finally:
+            if striper is not None:
+                with self._push_lock:
+                    seconds = self._push_durations.pop(remote_path, None)
+                    killed = self.cancelled or remote_path in self._abandoned_pushes
+                # A push killed on purpose says nothing about its link
+                striper.done(transport, file_size, seconds, True if seconds is not None else (None if killed else False))
+    
+    def _push_file_over(self, local_path, remote_path, file_size, device_id, transport, speculative):
+        blob = self.compression.get(local_path, file_size) if transport in self._compress_transports else None
+        cache = self.read_cache if blob is None else None
+        if blob is not None:
+            self._release_cached(local_path, device_id)
+        data = cache.acquire(device_id, local_path, file_size) if cache is not None else None
+        scheduler = self.bandwidth_scheduler
+        try:
+            if scheduler is not None and not scheduler.acquire(device_id, file_size):
+                raise RuntimeError("transfert annulé")
+            op = self.watchdog.begin(Path(local_path).name, file_size) if self.watchdog is not None else None
+            on_start = self._track_push(remote_path, op)
+            result = None
+            try:
+                if blob is not None:
+                    result = self._push_compressed(blob, remote_path, file_size, transport, on_start, op)
+                    if result is None:
+                        self._check_push_killed(remote_path, op)
+                        self.logger.warning(f"[{device_id}] Envoi compressé échoué, envoi direct: {Path(local_path).name}")
+                if result is None and data is not None:
+                    result = self.adb.push_data(
+                        data, remote_path, transport,
+                        on_start=on_start, on_progress=op.progress if op else None
+                    )
+                    if result is None:
+                        self._check_push_killed(remote_path, op)
+                        self.logger.warning(f"[{device_id}] exec-in indisponible, repli sur adb push: {Path(local_path).name}")
+                if result is None:
+                    result = self.adb.run_command(f'push "{local_path}" "{remote_path}"', transport, on_start=on_start)
+                    self._check_push_killed(remote_path, op)
+                    if result is None:
+                        raise RuntimeError("échec de adb push")
+                return result
+            finally:
+                if op:
+                    op.end()
+                with self._push_lock:
+                    entry = self._push_processes.pop(remote_path, None)
+                if result is not None and entry is not None:
+                    seconds = time.monotonic() - entry[1]
+                    if self.multipath is not None:
+                        with self._push_lock:
+                            self._push_durations[remote_path] = seconds
+                    if not speculative:
+                        self._push_rates.append(file_size / max(seconds, 1e-3))
+                if scheduler is not None:
+                    scheduler.release(device_id, file_size)
+        finally:
+            if data is not None:
+                cache.release(device_id, local_path)
+    
+    def compression_cache(self):
+        """The CompressionCache of this manager, created on first use."""
+        with self._push_lock:
+            if self.compression is None:
+                self.compression = CompressionCache(
+                    get_cache_dir(self.config, "compressed"),
+                    min_size=self.config.get("compression_min_kb", 1024) * 1024,
+                    max_ratio=self.config.get("compression_max_ratio", 0.8),
+                    max_bytes=self.config.get("compression_cache_mb", 2048) * 1024 * 1024,
+                    logger=self.logger,
+                )
+            return self.compression
+    
+    def _compression_enabled(self, device_id):
+        """Whether items pushed to this device are compressed (config mode and gzip on the device)."""
+        mode = self.config.get("compressed_transfer", "off")
+        if mode == "off" or (mode == "wifi" and ':' not in device_id):
+            return False
+        result = self.adb.run_command('shell "echo ok | gzip -c | gzip -dc"', device_id)
+        if not result or 'ok' not in result:
+            self.logger.warning(f"[{device_id}] gzip indisponible sur l'appareil, transfert non compressé")
+            return False
+        self.compression_cache()
+        self.logger.info(f"[{device_id}] Transfert compressé activé pour les fichiers compressibles")
         return True
     
+    def _push_compressed(self, blob, remote_path, file_size, device_id, on_start, op):
+        """Stream a gzip blob to the device, decompressed into `remote_path`."""
+        started = time.monotonic()
+        try:
+            with open(blob, 'rb') as f:
+                result = self.adb.push_data(
+                    f, remote_path, device_id, decompress=True,
+                    on_start=on_start, on_progress=op.progress if op else None
+                )
+            wire = os.path.getsize(blob)
+        except OSError:
+            return None
+        if result is not None:
+            with self._push_lock:
+                stats = self._compression_stats
+                stats['items'] += 1
+                stats['raw'] += file_size
+                stats['wire'] += wire
+                stats['seconds'] += time.monotonic() - started
+        return result
+    
+    def _log_compression(self, device_id):
+        """Report the bytes saved by compressed pushes and the resulting throughput gain."""
+        stats = self._compression_stats
+        if not stats['items'] or not stats['wire']:
+            return
+        mb = 1024 * 1024
+        seconds = max(stats['seconds'], 1e-3)
+        self.logger.info(
+            f"[{device_id}] Compression: {stats['items']} fichier(s), {stats['raw'] / mb:.1f} MB envoyés en "
+            f"{stats['wire'] / mb:.1f} MB ({stats['wire'] / stats['raw'] * 100:.0f}%), débit effectif "
+            f"{stats['raw'] / mb / seconds:.1f} MB/s pour {stats['wire'] / mb / seconds:.1f} MB/s sur le lien "
+            f"(gain x{stats['raw'] / stats['wire']:.2f})"
+        )
+    
+    def _track_push(self, remote_path, op):
+        """on_start hook of one push: registers its adb process (and hands it to the watchdog)."""
+        def on_start(process):
+            with self._push_lock:
+                started = self._push_processes.get(remote_path, (None, time.monotonic()))[1]
+                self._push_processes[remote_path] = (process, started)
+                abandoned = remote_path in self._abandoned_pushes
+            if op:
+                op.attach(process)
+            if abandoned or self.cancelled:
+                process.kill()
+        return on_start
+    
+    def _check_push_killed(self, remote_path, op):
+        """Raise if the push was killed on purpose (cancel, stall, lost speculative race)."""
+        if self.cancelled:
+            raise RuntimeError("transfert annulé")
+        if op and op.stalled:
+            raise PushStalledError("transfert bloqué, processus arrêté")
+        with self._push_lock:
+            if remote_path in self._abandoned_pushes:
+                raise RuntimeError("transfert interrompu (copie spéculative plus rapide)")
+    
+    def _push_started(self, remote_path):
+        """Start time of the running push to `remote_path`, None if its process is not running."""
+        with self._push_lock:
+            entry = self._push_processes.get(remote_path)
+        return entry[1] if entry else None
+    
+    def _abandon_push(self, remote_path):
+        """Kill the push to `remote_path`, now or as soon as its process starts."""
+        with self._push_lock:
+            self._abandoned_pushes.add(remote_path)
+            entry = self._push_processes.get(remote_path)
+        if entry:
+            try:
+                entry[0].kill()
+            except OSError:
+                pass
+    
+    def _forget_abandoned(self, remote_path):
+        with self._push_lock:
+            self._abandoned_pushes.discard(remote_path)
+    
+    def _promote_backup(self, primary, remote_path, file_size, device_id):
+        """Rename a winning speculative copy over `remote_path` once the original push is gone.
+        
+        The original push writes `remote_path` in place, so it must be dead
+        before the rename; the size is checked after the move.
+        """
+        if primary is not None:
+            concurrent.futures.wait([primary])
+        temp_path = shlex.quote(remote_path + SPECULATIVE_SUFFIX)
+        result = self.adb.run_command(
+            f'shell "mv -f {temp_path} {shlex.quote(remote_path)} && stat -c%s {shlex.quote(remote_path)}"',
+            device_id
+        )
+        if not result or result[-1].strip() != str(file_size):
+            raise RuntimeError("renommage de la copie spéculative échoué")
+        return result
+    
+    def _remove_remote_files(self, remote_paths, device_id, batch_size=50):
+        """`rm -f` many remote files with one command per batch."""
+        for start in range(0, len(remote_paths), batch_size):
+            batch = " ".join(shlex.quote(p) for p in remote_paths[start:start + batch_size])
+            self.adb.run_command(f'shell "rm -f {batch}"', device_id)
+    
+    def _abort_pushes(self, future_to_file, backups, interrupted, device_id):
+        """After a cancel: kill the pushes still running and remove their partial files.
+        
+        Pushes that finished cleanly keep their file (resume reuses it); the
+        interrupted ones are removed in one batched command.
+        """
+        self.adb.terminate()  # Also catches a push started while cancel() was running
+        done, _ = concurrent.futures.wait(future_to_file, timeout=CANCEL_GRACE_S)
+        partial = list(interrupted)
+        for future, (file_info, _, _) in future_to_file.items():
+            if future.cancelled():
+                continue  # Never started
+            if future not in done or future.exception() is not None:
+                partial.append(file_info[1] + SPECULATIVE_SUFFIX if future in backups else file_info[1])
+        if partial:
+            self._remove_remote_files(partial, device_id)
+            self.logger.info(f"[{device_id}] {len(partial)} fichier(s) partiel(s) supprimé(s) de l'appareil")
+    
+    def _create_watchdog(self, device_id):
+        """Stall watchdog for the pushes of one device, None when disabled (stall_timeout 0)."""
+        stall_timeout = self.config.get("stall_timeout", 60)
+        if not stall_timeout:
+            return None
+        return StallWatchdog(
+            device_id,
+            stall_timeout_s=stall_timeout,
+            min_rate_mbps=self.config.get("stall_min_rate_mbps", 0.5),
+            max_stalls=self.config.get("max_stalls", 3),
+            logger=self.logger,
+        )
+    
+    @staticmethod
+    def _pushed_bytes(output, default):
+        """Bytes written by one push, from the `adb push` summary line when present."""
+        for line in reversed(output or []):
+            match = _PUSH_SUMMARY.search(line)
+            if match:
+                return int(match.group(1))
+        return default
+    
+    def _release_cached(self, local_path, device_id):
+        """Tell the shared read cache this device will not push `local_path`."""
+        if self.read_cache is not None:
+            self.read_cache.skip(device_id, str(local_path))
+    
+    def _export_push_metrics(self, device_id, controller, retry_policy, breaker, watchdog=None, speculation=None):
+        """Write the push metrics of a device to the local cache (metrics/concurrency_<device>.json).
+        
+        Holds the AIMD decisions (adaptive concurrency only), the retry counts
+        and backoff time, the circuit breaker trips, the stalls, the
+        speculative copies and the share of each transport (multi-path).
+        """
+        metrics = {}
+        if controller:
+            metrics = controller.metrics()
+            self.logger.info(
+                f"[{device_id}] Concurrence adaptative: moyenne {metrics['average_limit']}, finale {metrics['limit']} "
+                f"({metrics['increases']} hausse(s), {metrics['decreases']} baisse(s))"
+            )
+        metrics["retries"] = retry_policy.metrics()
+        if retry_policy.retries:
+            self.logger.info(
+                f"[{device_id}] Nouvelles tentatives: {retry_policy.retries}, "
+                f"attente cumulée {retry_policy.backoff_seconds:.1f}s, {retry_policy.exhausted} abandon(s)"
+            )
+        if breaker:
+            metrics["circuit_breaker"] = breaker.metrics()
+        if watchdog:
+            metrics["watchdog"] = watchdog.metrics()
+        if speculation:
+            metrics["speculation"] = dict(speculation)
+        if self._compression_stats['items']:
+            metrics["compression"] = dict(self._compression_stats)
+        if self.multipath is not None:
+            metrics["multipath"] = self.multipath.metrics()
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in device_id)
+        metrics_path = get_cache_dir(self.config, "metrics") / f"concurrency_{safe_name}.json"
+        try:
+            with open(metrics_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(metrics, device=device_id, time=time.time()), f, indent=2)
+        except OSError as e:
+            self.logger.warning(f"[{device_id}] Impossible d'écrire les métriques: {e}")
+    
+    def _get_extracted_bundles(self, remote_temp_dir, device_id):
+        """Read the names of incremental bundles already extracted on the device.
+        
+        unified.sh appends each successfully extracted bundle to
+        `.extracted_bundles`. Only content-addressed bundles (incremental mode)
+        can be trusted by name, so this is empty otherwise.
+        """
+        if not self.config.get("incremental_bundles", False):
+            return set()
+        
+        result = self.adb.run_command(
+            f'shell "cat {remote_temp_dir}/.extracted_bundles 2>/dev/null || true"',
+            device_id
+        )
+        if not result:
+            return set()
+        return set(line.strip() for line in result if line.strip().startswith("bundle_"))
+    
     def _check_remote_file_exists(self, remote_path, expected_size, device_id):
         """Check if a remote file exists and has the expected size.
         
@@ -430,42 +1878,40 @@ class TransferManager:
             pass
         return False
     
-    def _retry_failed_chunks(self, failed_files, device_id, max_retries=3):
-        """Retry transferring failed chunks."""
-        max_retries = self.config.get("max_retries", 3)
-        self.logger.info(f"[{device_id}] Nouvelle tentative pour {len(failed_files)} fichiers...")
-        
-        still_failed = list(failed_files)
+    def _retry_failed_chunks(self, failed_files, device_id):
+        """Re-push files found missing or truncated by the verification.
         
-        for retry in range(max_retries):
-            if not still_failed:
-                break
-            
-            self.logger.info(f"[{device_id}] Tentative {retry + 1}/{max_retries}")
-            
-            retry_failed = []
-            for local_path, remote_path in still_failed:
-                try:
-                    self.adb.run_command(
-                        f'push "{local_path}" "{remote_path}"',
-                        device_id
-                    )
-                    self.logger.success(f"[{device_id}] ✅ Réussi: {Path(local_path).name}")
-                except Exception as e:
-                    retry_failed.append((local_path, remote_path))
-                    self.logger.error(f"[{device_id}] ❌ Échec: {Path(local_path).name}")
-            
-            still_failed = retry_failed
+        The files go through the same bounded pool as the transfer
+        (`_push_items`), with its backoff, retry budget and circuit breaker.
+        """
+        self.logger.info(f"[{device_id}] Nouvelle tentative pour {len(failed_files)} fichiers...")
+        items = []
+        for local_path, remote_path in failed_files:
+            try:
+                items.append((local_path, remote_path, os.path.getsize(local_path)))
+            except OSError as e:
+                self.logger.error(f"[{device_id}] ❌ Échec: {Path(local_path).name} - {e}")
+                return False
         
-        return len(still_failed) == 0
+        try:
+            results = self._push_items(items, device_id, self.config.get("parallel_processes", 4), track_progress=False)
+        finally:
+            if self.ledger is not None:
+                self.ledger.close()
+        return results is not None and not results['failed']
     
-    def _verify_transfer_on_device(self, remote_temp_dir, device_id, _depth=0):
-        """Verify all files (chunks and batch) were transferred correctly.
+    def _verify_transfer_on_device(self, remote_temp_dir, device_id, _depth=0, _recheck=None):
+        """Verify all files (chunks, batch and direct files) were transferred correctly.
+
+        Sizes come from one remote listing. With `verify_checksums`, the MD5
+        of every chunk is computed on the device (DeviceChecksummer) and
+        compared with the manifest; only the chunks that differ are re-pushed.
 
         Args:
             remote_temp_dir: Remote directory path
             device_id: Device identifier
             _depth: Internal recursion depth counter (max 1 re-verification after retry)
+            _recheck: Remote paths re-pushed by the previous pass; only their MD5 is checked again
         """
         # Prevent infinite recursion - allow max 1 re-verification after retry
         if _depth > 1:
@@ -478,9 +1924,25 @@ class TransferManager:
         missing_files = []  # Track missing files for retry
         
         # --- 1. Verify Chunks ---
-        for manifest in self.manifests:
+        # One listing of the whole transfer instead of one `stat` per chunk
+        verify_sizes = self.config.get("verify_sizes", True)
+        chunk_dirs = [f"{remote_temp_dir}/{manifest['chunk_folder']}".replace('\\', '/') for manifest in self.manifests]
+        listing = self._list_remote_files(remote_temp_dir, device_id)
+        if listing is None:
+            expected = [f"{remote_chunk_dir}/{name}" for remote_chunk_dir, manifest in zip(chunk_dirs, self.manifests)
+                        for name in ["chunk_metadata.json"] + [c['filename'] for c in manifest['chunks']]]
+            listing = self._stat_remote_files(expected, device_id)
+        # MD5 of every chunk computed on the device in a few batched calls
+        # (after a retry: only the folders holding re-pushed chunks)
+        hash_dirs = chunk_dirs
+        if _recheck is not None:
+            recheck_dirs = {path.rsplit('/', 1)[0] for path in _recheck}
+            hash_dirs = [d for d in chunk_dirs if d in recheck_dirs]
+        digests = self._device_chunk_digests(hash_dirs, device_id) if hash_dirs else None
+        corrupted = 0
+        
+        for manifest, remote_chunk_dir in zip(self.manifests, chunk_dirs):
             chunk_folder = manifest['chunk_folder']
-            remote_chunk_dir = f"{remote_temp_dir}/{chunk_folder}".replace('\\', '/')
 
             # Use persistent source if available (where chunks actually are), otherwise temp folder
             if manifest.get('persistent_source'):
@@ -490,11 +1952,7 @@ class TransferManager:
             
             # 1.1 Check metadata file exists
             metadata_path = f"{remote_chunk_dir}/chunk_metadata.json"
-            result = self.adb.run_command(
-                f'shell "[ -f {metadata_path} ] && echo exists"',
-                device_id
-            )
-            if not result or 'exists' not in ''.join(result):
+            if metadata_path not in listing:
                 self.logger.error(f"[{device_id}] Metadata manquant: {chunk_folder}")
                 verification_failed = True
                 # Add metadata to retry list
@@ -503,20 +1961,30 @@ class TransferManager:
                     missing_files.append((str(local_metadata), metadata_path))
                 continue
             
-            # 1.2 Get list of chunks on device
-            result = self.adb.run_command(
-                f'shell "ls {remote_chunk_dir}/chunk_*.bin 2>/dev/null"',
-                device_id
-            )
-            
-            if result:
-                device_chunks = set(Path(line.strip()).name for line in result if line.strip())
-            else:
-                device_chunks = set()
-            
-            # 1.3 Compare with expected chunks
-            expected_chunks = set(chunk_info['filename'] for chunk_info in manifest['chunks'])
-            missing = expected_chunks - device_chunks
+            # 1.2 Compare each chunk with the manifest: presence, size, then MD5
+            missing = []
+            for chunk_info in manifest['chunks']:
+                chunk_name = chunk_info['filename']
+                remote_chunk = f"{remote_chunk_dir}/{chunk_name}"
+                device_size = listing.get(remote_chunk)
+                if device_size is None:
+                    missing.append(chunk_name)
+                elif verify_sizes and device_size != chunk_info['size']:
+                    self.logger.error(
+                        f"[{device_id}] Taille incorrecte {chunk_name}: "
+                        f"{device_size} vs {chunk_info['size']} bytes"
+                    )
+                elif (digests is not None and chunk_info.get('md5') and (_recheck is None or remote_chunk in _recheck)
+                      and digests.get(remote_chunk) != chunk_info['md5']):
+                    corrupted += 1
+                    self.logger.error(f"[{device_id}] MD5 incorrect {chunk_folder}/{chunk_name}")
+                else:
+                    continue
+                verification_failed = True
+                # Add to retry list
+                local_chunk = local_chunk_dir / chunk_name
+                if local_chunk.exists():
+                    missing_files.append((str(local_chunk), remote_chunk))
             
             if missing:
                 self.logger.error(
@@ -524,82 +1992,64 @@ class TransferManager:
                 )
                 for chunk_name in sorted(missing):
                     self.logger.error(f"[{device_id}]   - {chunk_name}")
-                    # Add to retry list
-                    local_chunk = local_chunk_dir / chunk_name
-                    remote_chunk = f"{remote_chunk_dir}/{chunk_name}"
-                    if local_chunk.exists():
-                        missing_files.append((str(local_chunk), remote_chunk))
-                
-                verification_failed = True
-                continue
-            
-            # 1.4 Verify chunk sizes (fast and reliable)
-            if self.config.get("verify_sizes", True):
-                for chunk_info in manifest['chunks']:
-                    chunk_file = f"{remote_chunk_dir}/{chunk_info['filename']}"
-                    result = self.adb.run_command(
-                        f'shell "stat -c%s {chunk_file} 2>/dev/null"',
-                        device_id
-                    )
-                    if result:
-                        try:
-                            device_size = int(''.join(result).strip())
-                            expected_size = chunk_info['size']
-                            
-                            if device_size != expected_size:
-                                self.logger.error(
-                                    f"[{device_id}] Taille incorrecte {chunk_info['filename']}: "
-                                    f"{device_size} vs {expected_size} bytes"
-                                )
-                                verification_failed = True
-                                # Add to retry list
-                                local_chunk = local_chunk_dir / chunk_info['filename']
-                                if local_chunk.exists():
-                                    missing_files.append((str(local_chunk), chunk_file))
-                        except ValueError:
-                            self.logger.error(f"[{device_id}] Impossible de vérifier la taille de {chunk_info['filename']}")
-                            verification_failed = True
+        
+        if digests is not None:
+            checked = len(_recheck) if _recheck is not None else sum(len(manifest['chunks']) for manifest in self.manifests)
+            if corrupted:
+                self.logger.error(f"[{device_id}] MD5: {corrupted}/{checked} chunk(s) corrompu(s), renvoi de ceux-ci uniquement")
+            else:
+                self.logger.success(f"[{device_id}] MD5: {checked} chunk(s) conformes au manifeste")
 
         # --- 2. Verify Bundle ZIPs ---
         # Verify all bundle ZIP files (supports multiple bundles from bin packing)
-        bundle_files = list(self.temp_dir.glob("bundle_batch*.zip"))
+        bundle_files = [b for b in self.bundle_paths if b.name not in self.extracted_bundles]
         for bundle_path in bundle_files:
             remote_bundle_path = f"{remote_temp_dir}/{bundle_path.name}".replace('\\', '/')
             
             # Verify bundle ZIP exists and has correct size
-            result = self.adb.run_command(
-                f'shell "stat -c%s {remote_bundle_path} 2>/dev/null"',
-                device_id
-            )
+            device_size = listing.get(remote_bundle_path)
+            if device_size is None:
+                device_size = self._stat_remote_files([remote_bundle_path], device_id).get(remote_bundle_path)
             
-            if not result:
+            if device_size is None:
                 self.logger.error(f"[{device_id}] {bundle_path.name} manquant sur l'appareil")
                 verification_failed = True
                 missing_files.append((str(bundle_path), remote_bundle_path))
-            elif self.config.get("verify_sizes", True):
-                try:
-                    device_size = int(''.join(result).strip())
-                    local_size = bundle_path.stat().st_size
-                    
-                    if device_size != local_size:
-                        self.logger.error(
-                            f"[{device_id}] Taille incorrecte {bundle_path.name}: "
-                            f"{device_size} vs {local_size} bytes"
-                        )
-                        verification_failed = True
-                        missing_files.append((str(bundle_path), remote_bundle_path))
-                    else:
-                        self.logger.success(f"[{device_id}] {bundle_path.name} vérifié ({local_size / (1024*1024):.2f} MB)")
-                except ValueError:
-                    self.logger.warning(f"[{device_id}] Impossible de vérifier la taille de {bundle_path.name}")
+            elif verify_sizes:
+                local_size = bundle_path.stat().st_size
+                if device_size != local_size:
+                    self.logger.error(
+                        f"[{device_id}] Taille incorrecte {bundle_path.name}: "
+                        f"{device_size} vs {local_size} bytes"
+                    )
+                    verification_failed = True
+                    missing_files.append((str(bundle_path), remote_bundle_path))
+                else:
+                    self.logger.success(f"[{device_id}] {bundle_path.name} vérifié ({local_size / (1024*1024):.2f} MB)")
+
+        # --- 3. Verify direct files at their final path ---
+        misplaced = []
+        if self._direct_items:
+            placed = self._stat_remote_files([final for _, _, final, _ in self._direct_items], device_id)
+            for item in self._direct_items:
+                local_path, part, final, size = item
+                if final not in placed or (self.config.get("verify_sizes", True) and placed[final] != size):
+                    self.logger.error(f"[{device_id}] {final} manquant ou de taille incorrecte")
+                    verification_failed = True
+                    misplaced.append(item)
+                    missing_files.append((local_path, part))
 
         # If verification failed, try to retry missing files
         if verification_failed and missing_files:
             self.logger.warning(f"[{device_id}] Tentative de retransfert de {len(missing_files)} fichiers manquants...")
-            if self._retry_failed_chunks(missing_files, device_id):
+            if self._retry_failed_chunks(missing_files, device_id) and (
+                not misplaced or self._place_direct_files(misplaced, device_id)
+            ):
                 self.logger.success(f"[{device_id}] ✅ Tous les fichiers manquants ont été retransférés")
                 # Re-verify after retry (increment depth to prevent infinite recursion)
-                return self._verify_transfer_on_device(remote_temp_dir, device_id, _depth + 1)
+                return self._verify_transfer_on_device(
+                    remote_temp_dir, device_id, _depth + 1, {remote_path for _, remote_path in missing_files}
+                )
             else:
                 self.logger.error(f"[{device_id}] ❌ Échec du retransfert de certains fichiers")
                 return False
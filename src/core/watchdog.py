@@ -0,0 +1,145 @@
+"""
+Stall Watchdog - Kills pushes that stop making progress so their worker is freed
+Each in-flight push reports the bytes it wrote (exec-in) or only its start (adb push,
+which prints nothing until the end); a monitor thread kills the process of a push
+without progress for too long and the item goes back to the retry queue
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+MB = 1024 * 1024
+
+
+class PushStalledError(RuntimeError):
+    """Raised by a push the watchdog killed."""
+
+
+class _Operation:
+    """One in-flight push followed by the watchdog."""
+
+    __slots__ = ("watchdog", "name", "size", "bytes_done", "started", "last_progress",
+                 "process", "stalled", "opaque")
+
+    def __init__(self, watchdog: "StallWatchdog", name: str, size: int):
+        self.watchdog = watchdog
+        self.name = name
+        self.size = size
+        self.bytes_done = 0
+        self.started = time.monotonic()
+        self.last_progress = self.started
+        self.process = None
+        self.stalled = False
+        self.opaque = True  # No byte reports received yet
+
+    def attach(self, process):
+        """Process (Popen) to kill if the push stalls."""
+        with self.watchdog._lock:
+            self.process = process
+            if self.stalled:
+                self.watchdog._kill(self)
+
+    def progress(self, nbytes: int):
+        """`nbytes` more bytes were written to the device."""
+        if nbytes > 0:
+            self.bytes_done += nbytes
+            self.last_progress = time.monotonic()
+            self.opaque = False
+
+    def end(self):
+        self.watchdog._end(self)
+
+
+class StallWatchdog:
+    """
+    Detects hung pushes on one device and fences the device after repeated stalls.
+
+    - A push that reports bytes (exec-in from the shared read cache) stalls
+      when no byte was written for `stall_timeout_s`.
+    - A push that reports nothing (`adb push` prints only a final summary)
+      stalls when it runs longer than `stall_timeout_s` plus its size at
+      `min_rate_mbps`, the slowest rate still considered alive.
+
+    A stalled push has its process killed; `_push_file` then raises
+    PushStalledError so the item is retried like any failed push. After
+    `max_stalls` stalls the device is fenced: `fenced` becomes True and
+    the caller stops dispatching to it.
+    """
+
+    def __init__(self, device_id: str, stall_timeout_s: float = 60.0, min_rate_mbps: float = 0.5,
+                 max_stalls: int = 3, logger=None, check_interval_s: float = 1.0):
+        self.device_id = device_id
+        self.stall_timeout_s = stall_timeout_s
+        self.min_rate = max(0.01, min_rate_mbps) * MB
+        self.max_stalls = max(1, max_stalls)
+        self.logger = logger
+        self.check_interval_s = check_interval_s
+        self.stalls = 0
+        self._ops: Dict[int, _Operation] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def fenced(self) -> bool:
+        return self.stalls >= self.max_stalls
+
+    def begin(self, name: str, size: int) -> _Operation:
+        """Start following one push; the caller must call `end()` on the result."""
+        op = _Operation(self, name, size)
+        with self._lock:
+            self._ops[id(op)] = op
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._monitor, name=f"watchdog-{self.device_id}", daemon=True)
+                self._thread.start()
+        return op
+
+    def deadline(self, op: _Operation) -> float:
+        """Monotonic time after which `op` is declared stalled."""
+        if op.opaque:
+            return op.started + self.stall_timeout_s + op.size / self.min_rate
+        return op.last_progress + self.stall_timeout_s
+
+    def metrics(self) -> Dict:
+        return {"stalls": self.stalls, "fenced": self.fenced}
+
+    def _end(self, op: _Operation):
+        with self._lock:
+            self._ops.pop(id(op), None)
+
+    def _monitor(self):
+        while True:
+            time.sleep(self.check_interval_s)
+            now = time.monotonic()
+            with self._lock:
+                if not self._ops:
+                    self._thread = None  # begin() starts a new monitor when needed
+                    return
+                for op in self._ops.values():
+                    if not op.stalled and now > self.deadline(op):
+                        op.stalled = True
+                        self.stalls += 1
+                        self._report(op, now)
+                        self._kill(op)
+
+    def _kill(self, op: _Operation):
+        if op.process is None:
+            return
+        try:
+            op.process.kill()
+        except OSError:
+            pass
+
+    def _report(self, op: _Operation, now: float):
+        if not self.logger:
+            return
+        if op.opaque:
+            detail = f"aucune fin après {now - op.started:.0f}s"
+        else:
+            detail = f"aucun octet depuis {now - op.last_progress:.0f}s ({op.bytes_done / MB:.1f}/{op.size / MB:.1f} MB)"
+        self.logger.warning(
+            f"[{self.device_id}] Transfert bloqué: {op.name} ({detail}), processus arrêté "
+            f"[{self.stalls}/{self.max_stalls}]"
+        )
+        if self.fenced:
+            self.logger.error(f"[{self.device_id}] Trop de transferts bloqués, appareil mis à l'écart")
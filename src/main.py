@@ -20,10 +20,58 @@ from config import (
     DEFAULT_RESUME_TRANSFER,
     DEFAULT_SJF_SCHEDULING,
     DEFAULT_BUNDLE_SIZE,
+    DEFAULT_SCAN_WORKERS,
+    DEFAULT_SCAN_JOURNAL,
+    DEFAULT_SCAN_JOURNAL_MAX_AGE_HOURS,
+    DEFAULT_SCAN_JOURNAL_VERIFY_SAMPLE,
+    DEFAULT_STREAMING_MODE,
+    DEFAULT_SJF_WINDOW,
+    DEFAULT_FILTER_RULES,
+    DEFAULT_AUTO_TUNE,
+    DEFAULT_ADAPTIVE_CONCURRENCY,
+    DEFAULT_MIN_PARALLEL_PROCESSES,
+    DEFAULT_MAX_PARALLEL_PROCESSES,
+    DEFAULT_CONCURRENCY_WINDOW,
+    DEFAULT_RETRY_FAILED_CHUNKS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RETRY_BACKOFF_BASE,
+    DEFAULT_RETRY_BACKOFF_MAX,
+    DEFAULT_CIRCUIT_BREAKER_THRESHOLD,
+    DEFAULT_CIRCUIT_BREAKER_COOLDOWN,
+    DEFAULT_STALL_TIMEOUT,
+    DEFAULT_STALL_MIN_RATE_MBPS,
+    DEFAULT_MAX_STALLS,
+    DEFAULT_SPECULATIVE_PUSHES,
+    DEFAULT_SPECULATION_FACTOR,
+    DEFAULT_SPECULATION_MIN_SECONDS,
+    DEFAULT_SPECULATION_MAX_MB,
+    DEFAULT_COMPRESSED_TRANSFER,
+    DEFAULT_COMPRESSION_MIN_KB,
+    DEFAULT_COMPRESSION_MAX_RATIO,
+    DEFAULT_COMPRESSION_CACHE_MB,
+    DEFAULT_MULTIPATH_TRANSFER,
+    DEFAULT_DIRECT_PLACEMENT,
+    DEFAULT_VERIFY_CHECKSUMS,
+    DEFAULT_VERIFY_REASSEMBLED_DIGEST,
+    DEFAULT_BANDWIDTH_POLICY,
+    DEFAULT_BANDWIDTH_GROUP_BY,
+    DEFAULT_GROUP_PUSH_SLOTS,
+    DEFAULT_DEVICE_WEIGHTS,
+    DEFAULT_SHARED_READ_CACHE,
+    DEFAULT_READ_CACHE_MB,
+    DEFAULT_TRANSFER_LEDGER,
+    DEFAULT_PRIORITY_CLASSES,
+    DEFAULT_PRIORITY_AGING_ITEMS,
+    DEFAULT_BALANCE_BUNDLES,
+    DEFAULT_INCREMENTAL_BUNDLES,
+    DEFAULT_DEDUPLICATE_FILES,
+    DEFAULT_DEDUP_MIN_SIZE,
+    DEFAULT_DEVICE_PARALLEL_JOBS,
     DEFAULT_REFRESH_INTERVAL,
     DEFAULT_AUTO_CONNECT_WIFI,
 )
 from core.transfer import TransferManager
+from core.progress import format_duration
 from utils.adb import Adb
 from utils.apk_installer import ApkInstaller
 from utils.updater import check_and_update_on_startup, AutoUpdater
@@ -141,11 +189,83 @@ class SettingsWindow(tk.Toplevel):
         # SJF Scheduling  
         self.sjf_scheduling = tk.BooleanVar(value=self.config.get("sjf_scheduling", True))
         tk.Checkbutton(scrollable_frame, text="Petits fichiers en premier (plus rapide)", variable=self.sjf_scheduling).pack(anchor="w", padx=20, pady=3)
+        
+        self.streaming_mode = tk.BooleanVar(value=self.config.get("streaming_mode", DEFAULT_STREAMING_MODE))
+        tk.Checkbutton(scrollable_frame, text="Transfert en continu (pendant l'analyse)", variable=self.streaming_mode).pack(anchor="w", padx=20, pady=3)
+
+        # AIMD adaptive push concurrency
+        self.adaptive_concurrency = tk.BooleanVar(value=self.config.get("adaptive_concurrency", DEFAULT_ADAPTIVE_CONCURRENCY))
+        tk.Checkbutton(scrollable_frame, text="Concurrence adaptative (AIMD)", variable=self.adaptive_concurrency).pack(anchor="w", padx=20, pady=3)
+
+        # Bandwidth policy between devices sharing a USB hub
+        bandwidth_frame = tk.Frame(scrollable_frame)
+        bandwidth_frame.pack(pady=5, padx=20, fill=tk.X)
+        tk.Label(bandwidth_frame, text="Partage USB multi-appareils:").pack(side=tk.LEFT)
+        self.bandwidth_policy = tk.StringVar(value=self.config.get("bandwidth_policy", DEFAULT_BANDWIDTH_POLICY))
+        tk.OptionMenu(bandwidth_frame, self.bandwidth_policy, "fastest_first", "fair", "weighted", "off").pack(side=tk.RIGHT)
+
+        # Shared read cache: read each file once for all devices
+        self.shared_read_cache = tk.BooleanVar(value=self.config.get("shared_read_cache", DEFAULT_SHARED_READ_CACHE))
+        tk.Checkbutton(scrollable_frame, text="Lecture unique pour tous les appareils (cache partagé)", variable=self.shared_read_cache).pack(anchor="w", padx=20, pady=3)
+
+        # Compressed pushes (gzip on the host, decompressed on the device)
+        compression_frame = tk.Frame(scrollable_frame)
+        compression_frame.pack(pady=5, padx=20, fill=tk.X)
+        tk.Label(compression_frame, text="Transfert compressé:").pack(side=tk.LEFT)
+        self.compressed_transfer = tk.StringVar(value=self.config.get("compressed_transfer", DEFAULT_COMPRESSED_TRANSFER))
+        tk.OptionMenu(compression_frame, self.compressed_transfer, "wifi", "always", "off").pack(side=tk.RIGHT)
+
+        # Multi-path pushes over the USB and WiFi links of the same phone
+        self.multipath_transfer = tk.BooleanVar(value=self.config.get("multipath_transfer", DEFAULT_MULTIPATH_TRANSFER))
+        tk.Checkbutton(scrollable_frame, text="Transfert multi-chemin (USB + WiFi du même appareil)", variable=self.multipath_transfer).pack(anchor="w", padx=20, pady=3)
+
+        # Direct placement into the target folder (staging only for chunked files)
+        self.direct_placement = tk.BooleanVar(value=self.config.get("direct_placement", DEFAULT_DIRECT_PLACEMENT))
+        tk.Checkbutton(scrollable_frame, text="Placement direct dans le dossier cible", variable=self.direct_placement).pack(anchor="w", padx=20, pady=3)
+
+        # Auto-tuned parameters from the transfer planner
+        self.auto_tune = tk.BooleanVar(value=self.config.get("auto_tune", DEFAULT_AUTO_TUNE))
+        tk.Checkbutton(scrollable_frame, text="Paramètres automatiques (planificateur)", variable=self.auto_tune).pack(anchor="w", padx=20, pady=3)
+
+        # Incremental scan journal
+        self.scan_journal = tk.BooleanVar(value=self.config.get("scan_journal", DEFAULT_SCAN_JOURNAL))
+        tk.Checkbutton(scrollable_frame, text="Analyse incrémentale (journal de scan)", variable=self.scan_journal).pack(anchor="w", padx=20, pady=3)
+        # Limitation: files edited in place keep their journaled size/mtime until the journal expires
+        scan_journal_hint = tk.Label(scrollable_frame, text="(Un fichier modifié sur place peut garder son ancienne taille jusqu'à 24 h)", font=("Arial", 9, "italic"), fg="gray")
+        scan_journal_hint.pack(anchor="w", padx=40)
+
+        # Global exclude rules (gitignore syntax, per-folder rules live in config.json)
+        exclude_frame = tk.Frame(scrollable_frame)
+        exclude_frame.pack(pady=5, padx=20, fill=tk.X)
+        tk.Label(exclude_frame, text="Exclusions (séparées par ;):").pack(side=tk.LEFT)
+        global_rules = self.config.get("filter_rules", {}).get("*", {})
+        self.exclude_patterns = tk.StringVar(value="; ".join(global_rules.get("exclude", [])))
+        tk.Entry(exclude_frame, textvariable=self.exclude_patterns, width=30).pack(side=tk.RIGHT)
+
+        # Balance bundles across workers
+        self.balance_bundles = tk.BooleanVar(value=self.config.get("balance_bundles", DEFAULT_BALANCE_BUNDLES))
+        tk.Checkbutton(scrollable_frame, text="Équilibrer les bundles entre workers", variable=self.balance_bundles).pack(anchor="w", padx=20, pady=3)
+
+        # Incremental bundles (reuse unchanged bundles between runs)
+        self.incremental_bundles = tk.BooleanVar(value=self.config.get("incremental_bundles", DEFAULT_INCREMENTAL_BUNDLES))
+        tk.Checkbutton(scrollable_frame, text="Bundles incrémentaux (réutiliser les inchangés)", variable=self.incremental_bundles).pack(anchor="w", padx=20, pady=3)
+
+        # Deduplicate identical files
+        self.deduplicate_files = tk.BooleanVar(value=self.config.get("deduplicate_files", DEFAULT_DEDUPLICATE_FILES))
+        tk.Checkbutton(scrollable_frame, text="Dédupliquer les fichiers identiques", variable=self.deduplicate_files).pack(anchor="w", padx=20, pady=3)
 
         # Verify after reassembly
         self.verify_after_reassembly = tk.BooleanVar(value=self.config.get("verify_after_reassembly", True))
         tk.Checkbutton(scrollable_frame, text="Vérifier après transfert", variable=self.verify_after_reassembly).pack(anchor="w", padx=20, pady=3)
 
+        # MD5 of the chunks computed on the device, compared with the manifests
+        self.verify_checksums = tk.BooleanVar(value=self.config.get("verify_checksums", DEFAULT_VERIFY_CHECKSUMS))
+        tk.Checkbutton(scrollable_frame, text="Vérifier les MD5 des chunks sur l'appareil", variable=self.verify_checksums).pack(anchor="w", padx=20, pady=3)
+
+        # MD5 of the reassembled files (their size is always checked)
+        self.verify_reassembled_digest = tk.BooleanVar(value=self.config.get("verify_reassembled_digest", DEFAULT_VERIFY_REASSEMBLED_DIGEST))
+        tk.Checkbutton(scrollable_frame, text="Vérifier le MD5 des fichiers réassemblés (lent)", variable=self.verify_reassembled_digest).pack(anchor="w", padx=20, pady=3)
+
         # Auto move after reassembly
         self.auto_move_after_reassembly = tk.BooleanVar(value=self.config.get("auto_move_after_reassembly", False))
         tk.Checkbutton(scrollable_frame, text="Déplacer vers destination finale", variable=self.auto_move_after_reassembly).pack(anchor="w", padx=20, pady=3)
@@ -230,6 +350,13 @@ class SettingsWindow(tk.Toplevel):
         self.auto_detect_permission = tk.BooleanVar(value=self.config.get("auto_detect_permission", True))
         tk.Checkbutton(scrollable_frame, text="Détecter permissions automatiquement", variable=self.auto_detect_permission).pack(anchor="w", padx=20, pady=3)
 
+        # On-device parallel reassembly jobs
+        device_jobs_frame = tk.Frame(scrollable_frame)
+        device_jobs_frame.pack(pady=5, padx=20, fill=tk.X)
+        tk.Label(device_jobs_frame, text="Tâches réassemblage (0 = auto):").pack(side=tk.LEFT)
+        self.device_parallel_jobs = tk.IntVar(value=self.config.get("device_parallel_jobs", DEFAULT_DEVICE_PARALLEL_JOBS))
+        tk.Entry(device_jobs_frame, textvariable=self.device_parallel_jobs, width=10).pack(side=tk.RIGHT)
+
         # Reassembly Timeout
         timeout_frame = tk.Frame(scrollable_frame)
         timeout_frame.pack(pady=5, padx=20, fill=tk.X)
@@ -257,14 +384,32 @@ class SettingsWindow(tk.Toplevel):
         self.config["auto_move_after_reassembly"] = self.auto_move_after_reassembly.get()
         self.config["delete_temp_folder"] = self.delete_temp_folder.get()
         self.config["verify_after_reassembly"] = self.verify_after_reassembly.get()
+        self.config["verify_checksums"] = self.verify_checksums.get()
+        self.config["verify_reassembled_digest"] = self.verify_reassembled_digest.get()
         self.config["aggressive_temp_cleanup"] = self.aggressive_temp_cleanup.get()
         self.config["auto_detect_permission"] = self.auto_detect_permission.get()
         self.config["reassembly_timeout"] = self.reassembly_timeout.get()
+        self.config["device_parallel_jobs"] = self.device_parallel_jobs.get()
         # New optimization settings
         self.config["use_adb_shell_mode"] = self.use_adb_shell_mode.get()
         self.config["resume_transfer"] = self.resume_transfer.get()
         self.config["sjf_scheduling"] = self.sjf_scheduling.get()
+        self.config["streaming_mode"] = self.streaming_mode.get()
+        self.config["auto_tune"] = self.auto_tune.get()
+        self.config["adaptive_concurrency"] = self.adaptive_concurrency.get()
+        self.config["bandwidth_policy"] = self.bandwidth_policy.get()
+        self.config["shared_read_cache"] = self.shared_read_cache.get()
+        self.config["compressed_transfer"] = self.compressed_transfer.get()
+        self.config["multipath_transfer"] = self.multipath_transfer.get()
+        self.config["direct_placement"] = self.direct_placement.get()
         self.config["bundle_size"] = self.bundle_size_mb.get() * 1024 * 1024
+        self.config["scan_journal"] = self.scan_journal.get()
+        filter_rules = self.config.setdefault("filter_rules", {})
+        exclude_patterns = [p.strip() for p in self.exclude_patterns.get().split(";") if p.strip()]
+        filter_rules.setdefault("*", {})["exclude"] = exclude_patterns
+        self.config["balance_bundles"] = self.balance_bundles.get()
+        self.config["incremental_bundles"] = self.incremental_bundles.get()
+        self.config["deduplicate_files"] = self.deduplicate_files.get()
         # Fast mode options
         self.config["skip_early_verification"] = self.skip_early_verification.get()
         self.config["trust_local_chunks"] = self.trust_local_chunks.get()
@@ -308,6 +453,10 @@ class Application(tk.Frame):
         self.cancel_requested = False
         self.cancel_lock = threading.Lock()
         self.current_reassembly_managers = {}
+        self.current_transfer_managers = {}  # Per-device TransferManagers of the running transfer
+        self.device_transports = {}  # Primary device id -> all its transports (multi-path pushes)
+        self.bandwidth_scheduler = None
+        self.read_cache = None
 
         self.check_adb_and_populate_devices()
         self.check_and_install_termux_on_devices()
@@ -386,7 +535,54 @@ class Application(tk.Frame):
         config.setdefault("use_adb_shell_mode", DEFAULT_USE_ADB_SHELL_MODE)
         config.setdefault("resume_transfer", DEFAULT_RESUME_TRANSFER)
         config.setdefault("sjf_scheduling", DEFAULT_SJF_SCHEDULING)
+        config.setdefault("streaming_mode", DEFAULT_STREAMING_MODE)
+        config.setdefault("sjf_window", DEFAULT_SJF_WINDOW)
+        config.setdefault("filter_rules", dict(DEFAULT_FILTER_RULES))
+        config.setdefault("auto_tune", DEFAULT_AUTO_TUNE)
+        config.setdefault("adaptive_concurrency", DEFAULT_ADAPTIVE_CONCURRENCY)
+        config.setdefault("min_parallel_processes", DEFAULT_MIN_PARALLEL_PROCESSES)
+        config.setdefault("max_parallel_processes", DEFAULT_MAX_PARALLEL_PROCESSES)
+        config.setdefault("concurrency_window", DEFAULT_CONCURRENCY_WINDOW)
+        config.setdefault("retry_failed_chunks", DEFAULT_RETRY_FAILED_CHUNKS)
+        config.setdefault("max_retries", DEFAULT_MAX_RETRIES)
+        config.setdefault("retry_backoff_base", DEFAULT_RETRY_BACKOFF_BASE)
+        config.setdefault("retry_backoff_max", DEFAULT_RETRY_BACKOFF_MAX)
+        config.setdefault("circuit_breaker_threshold", DEFAULT_CIRCUIT_BREAKER_THRESHOLD)
+        config.setdefault("circuit_breaker_cooldown", DEFAULT_CIRCUIT_BREAKER_COOLDOWN)
+        config.setdefault("stall_timeout", DEFAULT_STALL_TIMEOUT)
+        config.setdefault("stall_min_rate_mbps", DEFAULT_STALL_MIN_RATE_MBPS)
+        config.setdefault("max_stalls", DEFAULT_MAX_STALLS)
+        config.setdefault("speculative_pushes", DEFAULT_SPECULATIVE_PUSHES)
+        config.setdefault("speculation_factor", DEFAULT_SPECULATION_FACTOR)
+        config.setdefault("speculation_min_seconds", DEFAULT_SPECULATION_MIN_SECONDS)
+        config.setdefault("speculation_max_mb", DEFAULT_SPECULATION_MAX_MB)
+        config.setdefault("compressed_transfer", DEFAULT_COMPRESSED_TRANSFER)
+        config.setdefault("compression_min_kb", DEFAULT_COMPRESSION_MIN_KB)
+        config.setdefault("compression_max_ratio", DEFAULT_COMPRESSION_MAX_RATIO)
+        config.setdefault("compression_cache_mb", DEFAULT_COMPRESSION_CACHE_MB)
+        config.setdefault("multipath_transfer", DEFAULT_MULTIPATH_TRANSFER)
+        config.setdefault("direct_placement", DEFAULT_DIRECT_PLACEMENT)
+        config.setdefault("verify_checksums", DEFAULT_VERIFY_CHECKSUMS)
+        config.setdefault("verify_reassembled_digest", DEFAULT_VERIFY_REASSEMBLED_DIGEST)
+        config.setdefault("bandwidth_policy", DEFAULT_BANDWIDTH_POLICY)
+        config.setdefault("bandwidth_group_by", DEFAULT_BANDWIDTH_GROUP_BY)
+        config.setdefault("group_push_slots", DEFAULT_GROUP_PUSH_SLOTS)
+        config.setdefault("device_weights", dict(DEFAULT_DEVICE_WEIGHTS))
+        config.setdefault("shared_read_cache", DEFAULT_SHARED_READ_CACHE)
+        config.setdefault("read_cache_mb", DEFAULT_READ_CACHE_MB)
+        config.setdefault("transfer_ledger", DEFAULT_TRANSFER_LEDGER)
+        config.setdefault("priority_classes", list(DEFAULT_PRIORITY_CLASSES))
+        config.setdefault("priority_aging_items", DEFAULT_PRIORITY_AGING_ITEMS)
         config.setdefault("bundle_size", DEFAULT_BUNDLE_SIZE)
+        config.setdefault("scan_workers", DEFAULT_SCAN_WORKERS)
+        config.setdefault("scan_journal", DEFAULT_SCAN_JOURNAL)
+        config.setdefault("scan_journal_max_age_hours", DEFAULT_SCAN_JOURNAL_MAX_AGE_HOURS)
+        config.setdefault("scan_journal_verify_sample", DEFAULT_SCAN_JOURNAL_VERIFY_SAMPLE)
+        config.setdefault("balance_bundles", DEFAULT_BALANCE_BUNDLES)
+        config.setdefault("incremental_bundles", DEFAULT_INCREMENTAL_BUNDLES)
+        config.setdefault("deduplicate_files", DEFAULT_DEDUPLICATE_FILES)
+        config.setdefault("dedup_min_size", DEFAULT_DEDUP_MIN_SIZE)
+        config.setdefault("device_parallel_jobs", DEFAULT_DEVICE_PARALLEL_JOBS)
         
         # WiFi defaults
         config.setdefault("refresh_interval", DEFAULT_REFRESH_INTERVAL)
@@ -520,6 +716,14 @@ class Application(tk.Frame):
         action_buttons_frame = tk.Frame(self)
         action_buttons_frame.pack(pady=5)
 
+        # Dry-run: scan and plan, push nothing
+        self.estimate_button = tk.Button(
+            action_buttons_frame, 
+            text="Estimer (simulation)", 
+            command=self.estimate_transfer
+        )
+        self.estimate_button.pack(side=tk.LEFT, padx=5)
+
         # Termux workflow button
         self.termux_workflow_button = tk.Button(
             action_buttons_frame, 
@@ -870,7 +1074,17 @@ class Application(tk.Frame):
             hours = int(elapsed // 3600)
             minutes = int((elapsed % 3600) // 60)
             seconds = int(elapsed % 60)
-            self.timer_label.config(text=f"Durée: {hours:02d}:{minutes:02d}:{seconds:02d}")
+            text = f"Durée: {hours:02d}:{minutes:02d}:{seconds:02d}"
+            event = self.transfer_manager.progress.snapshot()
+            if event.devices:
+                aggregate = event.aggregate
+                if aggregate["bytes_total"]:
+                    text += f" | {aggregate['bytes_done'] / aggregate['bytes_total'] * 100:.1f}%"
+                if event.phase == "transfer":
+                    text += f" | {aggregate['smoothed_mbps']:.1f} MB/s"
+                if event.eta_s is not None:
+                    text += f" | Restant: {format_duration(event.eta_s)}"
+            self.timer_label.config(text=text)
             # Schedule next update
             self.after(1000, self.update_timer)
 
@@ -884,6 +1098,8 @@ class Application(tk.Frame):
         # Reset cancel flag
         with self.cancel_lock:
             self.cancel_requested = False
+        self.current_transfer_managers = {}
+        devices = self._group_device_transports(devices)
 
         # Start timer
         self.transfer_start_time = time.time()
@@ -901,15 +1117,38 @@ class Application(tk.Frame):
             with tempfile.TemporaryDirectory() as temp_dir:
                 # Setup transfer manager with temp directory
                 self.transfer_manager.temp_dir = Path(temp_dir)
-                self.transfer_manager.files_to_chunk = []
-                self.transfer_manager.files_to_batch = []
+                self.transfer_manager.config = self.config  # Drop settings tuned by a previous plan
+                self.transfer_manager.plan = None
+                self.transfer_manager.progress.reset()
+                self.transfer_manager.reset_file_lists()
                 self.transfer_manager.manifests = []
+                self.transfer_manager.bundle_paths = []
+                self.transfer_manager.duplicate_links = []
+                self.transfer_manager.dedup_saved_bytes = 0
+                self.transfer_manager.target_dir = target
                 
-                # Scan and process files once
-                self.transfer_manager.scan_files(source)
-                self.transfer_manager.process_files(Path(source))
+                remote_temp_dir = self.config.get("remote_temp_dir", "/sdcard/transfer_temp")
+                device_items = {device_id: None for device_id in devices}
                 
-                self.logger.info(f"Fichiers préparés: {len(self.transfer_manager.manifests)} fichiers fragmentés, {len(self.transfer_manager.files_to_batch)} fichiers groupés")
+                if self.config.get("streaming_mode", False):
+                    # Scan and prepare once, every device pushes items as they are produced
+                    self.transfer_manager.cancelled = False
+                    streams = self.transfer_manager.fan_out_items(
+                        self.transfer_manager.iter_streaming_items(source, remote_temp_dir), len(devices)
+                    )
+                    device_items = dict(zip(devices, streams))
+                    self.logger.info("Mode continu: préparation pendant le transfert")
+                else:
+                    # Scan, plan, deduplicate and process files once
+                    self.transfer_manager.scan_files(source)
+                    self.transfer_manager.deduplicate_files(source)
+                    self.transfer_manager.plan_transfer(devices)
+                    prepare_start_time = time.time()
+                    self.transfer_manager.progress.set_phase("prepare")
+                    self.transfer_manager.process_files(Path(source))
+                    self.transfer_manager.record_phase("prepare", time.time() - prepare_start_time)
+                    
+                    self.logger.info(f"Fichiers préparés: {len(self.transfer_manager.manifests)} fichiers fragmentés, {len(self.transfer_manager.files_to_batch)} fichiers groupés")
 
                 # Check for cancellation before Phase 1
                 with self.cancel_lock:
@@ -920,12 +1159,14 @@ class Application(tk.Frame):
 
                 # Phase 1: Transfer to all devices in parallel
                 self.logger.info("\nPHASE 1: Transfert parallèle vers tous les appareils...")
+                self.bandwidth_scheduler = self._create_bandwidth_scheduler(devices)
+                self.read_cache = self._create_read_cache(devices)
 
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor(max_workers=len(devices)) as executor:
                     futures = {}
                     for device_id in devices:
-                        future = executor.submit(self._transfer_to_single_device, device_id, temp_dir)
+                        future = executor.submit(self._transfer_to_single_device, device_id, temp_dir, device_items[device_id], target)
                         futures[future] = device_id
 
                     # Wait for all transfers to complete
@@ -948,6 +1189,13 @@ class Application(tk.Frame):
                                 'reassembly_success': False
                             }
 
+                if self.bandwidth_scheduler is not None:
+                    self.bandwidth_scheduler.log_summary()
+                    self.bandwidth_scheduler = None
+                if self.read_cache is not None:
+                    self.read_cache.log_summary()
+                    self.read_cache = None
+
             # Get list of devices that succeeded transfer
             successful_devices = [d for d in devices if transfer_results[d]['transfer_success']]
 
@@ -965,11 +1213,14 @@ class Application(tk.Frame):
 
             # Phase 2: Reassemble on ALL devices in PARALLEL with synchronized modals
             self.logger.info(f"\nPHASE 2: Réassemblage parallèle sur {len(successful_devices)} appareil(s)...")
+            self.transfer_manager.progress.set_phase("reassembly")
 
             try:
                 success = self._parallel_reassembly_on_all_devices(source, target, successful_devices, transfer_results)
             except Exception as e:
                 self.logger.error(f"Erreur lors du réassemblage parallèle: {e}")
+            self.transfer_manager.finish_plan()
+            self.transfer_manager.progress.set_phase("done")
 
             # Phase 3: Show summary
             self.logger.info("\n===== RÉSUMÉ FINAL =====")
@@ -1029,9 +1280,15 @@ class Application(tk.Frame):
         with self.cancel_lock:
             self.cancel_requested = True
         
-        # Cancel transfer manager
+        # Cancel transfer managers (running adb pushes are killed at once)
         if hasattr(self, 'transfer_manager') and self.transfer_manager:
             self.transfer_manager.cancel()
+        for transfer_mgr in list(self.current_transfer_managers.values()):
+            transfer_mgr.cancel()
+        if self.bandwidth_scheduler is not None:
+            self.bandwidth_scheduler.cancel()
+        if self.read_cache is not None:
+            self.read_cache.cancel()
         
         # Cancel any active reassembly managers
         if hasattr(self, 'current_reassembly_managers'):
@@ -1043,10 +1300,79 @@ class Application(tk.Frame):
                     pass
         
         # Force cleanup UI after a short delay to allow threads to stop
-        self.master.after(1000, self._cleanup_transfer_ui)
+        # (their adb commands are already killed, so they exit within a fraction of a second)
+        self.master.after(250, self._cleanup_transfer_ui)
+
+    def _create_bandwidth_scheduler(self, devices):
+        """Group the selected devices by USB topology and share push slots between them."""
+        from core.bandwidth import BandwidthScheduler
+        
+        policy = self.config.get("bandwidth_policy", DEFAULT_BANDWIDTH_POLICY)
+        if policy == "off" or len(devices) < 2:
+            return None
+        
+        detailed = [d for d in self.adb.get_devices_detailed() if d["id"] in devices]
+        known = {d["id"] for d in detailed}
+        # Devices missing from the listing still get their own group
+        detailed += [{"id": device_id, "type": "usb"} for device_id in devices if device_id not in known]
+        
+        scheduler = BandwidthScheduler(
+            detailed,
+            policy=policy,
+            group_slots=self.config.get("group_push_slots", DEFAULT_GROUP_PUSH_SLOTS),
+            group_by=self.config.get("bandwidth_group_by", DEFAULT_BANDWIDTH_GROUP_BY),
+            weights=self.config.get("device_weights", {}),
+            logger=self.logger,
+        )
+        self.logger.info(f"Ordonnanceur de bande passante ({scheduler.policy}): {scheduler.describe()}")
+        return scheduler
 
-    def _transfer_to_single_device(self, device_id, temp_dir):
-        """Transfer files to a single device with its own worker pool."""
+    def _create_read_cache(self, devices):
+        """Share file reads between the devices of a fan-out (each file read from disk once)."""
+        from core.read_cache import SharedReadCache
+        
+        if not self.config.get("shared_read_cache", DEFAULT_SHARED_READ_CACHE) or len(devices) < 2:
+            return None
+        budget_mb = self.config.get("read_cache_mb", DEFAULT_READ_CACHE_MB)
+        self.logger.info(f"Cache de lecture partagé: {budget_mb} MB pour {len(devices)} appareils")
+        return SharedReadCache(devices, budget_mb * 1024 * 1024, self.logger)
+
+    def _group_device_transports(self, devices):
+        """Merge the USB and WiFi transports of the same phone into one logical device.
+        
+        Transports are matched by `ro.serialno`; the USB one becomes the device
+        id used by the run and the others are kept in `self.device_transports`
+        for multi-path pushes.
+        """
+        self.device_transports = {}
+        if not self.config.get("multipath_transfer", DEFAULT_MULTIPATH_TRANSFER):
+            return devices
+        connected = {d["id"]: d["type"] for d in self.adb.get_devices_detailed()}
+        phones = {}
+        for device_id in dict.fromkeys(list(devices) + list(connected)):
+            serial = self.adb.get_serialno(device_id) if device_id in connected else None
+            phones.setdefault(serial or device_id, []).append(device_id)
+        
+        grouped = []
+        for transports in phones.values():
+            selected = [t for t in transports if t in devices]
+            if not selected:
+                continue
+            # USB first: it is the primary link for the commands other than pushes
+            transports.sort(key=lambda t: connected.get(t) != "usb")
+            primary = transports[0]
+            grouped.append(primary)
+            if len(transports) > 1:
+                self.device_transports[primary] = transports
+                self.logger.info(f"[{primary}] Même appareil via {', '.join(transports[1:])}: transfert multi-chemin")
+        return grouped
+
+    def _transfer_to_single_device(self, device_id, temp_dir, items=None, target_dir=None):
+        """Transfer files to a single device with its own worker pool.
+        
+        In streaming mode `items` is this device's view of the shared item stream.
+        `target_dir` is the final folder, written directly with direct placement.
+        """
         try:
             self.logger.info(f"[{device_id}] Démarrage du transfert...")
             
@@ -1069,15 +1395,42 @@ class Application(tk.Frame):
             transfer_mgr.temp_dir = Path(temp_dir)
             transfer_mgr.manifests = self.transfer_manager.manifests
             transfer_mgr.files_to_batch = self.transfer_manager.files_to_batch
+            transfer_mgr.bundle_paths = self.transfer_manager.bundle_paths
+            transfer_mgr.direct_files = self.transfer_manager.direct_files
+            transfer_mgr.target_dir = target_dir
+            transfer_mgr.bandwidth_scheduler = self.bandwidth_scheduler
+            transfer_mgr.read_cache = self.read_cache
+            transfer_mgr.transports = self.device_transports.get(device_id)
+            if self.config.get("compressed_transfer", DEFAULT_COMPRESSED_TRANSFER) != "off":
+                transfer_mgr.compression = self.transfer_manager.compression_cache()
+            transfer_mgr.progress = self.transfer_manager.progress
+            transfer_mgr.priority_classes = self.transfer_manager.priority_classes
+            transfer_mgr.item_priority = self.transfer_manager.item_priority
+            self.current_transfer_managers[device_id] = transfer_mgr
+            if self.cancel_requested:
+                transfer_mgr.cancel()
+            
+            # Execute the shared plan and feed its measurements
+            plan = self.transfer_manager.plan
+            transfer_mgr.history = self.transfer_manager.history
+            if plan is not None and self.config.get("auto_tune", False):
+                transfer_mgr.apply_plan(plan)
+            else:
+                transfer_mgr.plan = plan
             
             # Transfer with per-device parallelism
             remote_temp_dir = self.config.get("remote_temp_dir", "/sdcard/transfer_temp")
-            transfer_mgr.parallel_transfer(remote_temp_dir, device_id)
-            
-            return True
+            return transfer_mgr.parallel_transfer(remote_temp_dir, device_id, items=items)
         except Exception as e:
             self.logger.error(f"[{device_id}] Erreur: {e}")
             return False
+        finally:
+            # A device that stops early (Termux install, error) must not hold back
+            # the others: shared cache blocks stay pending until every device finished
+            if self.read_cache is not None:
+                self.read_cache.finish(device_id)
+            if self.bandwidth_scheduler is not None:
+                self.bandwidth_scheduler.finish(device_id)
 
     def start_termux_workflow(self):
         """Run Termux setup workflow only (no file transfer)."""
@@ -1177,6 +1530,26 @@ class Application(tk.Frame):
         
         threading.Thread(target=move_thread, daemon=True).start()
 
+    def estimate_transfer(self):
+        """Dry-run: scan the source and log the transfer plan without pushing anything."""
+        source = self.source_dir.get()
+        devices = self.get_selected_devices()
+        if not source:
+            messagebox.showerror("Erreur", "Veuillez sélectionner un dossier source.")
+            return
+        if not devices:
+            messagebox.showerror("Erreur", "Veuillez sélectionner au moins un appareil.")
+            return
+        
+        def estimate_thread():
+            from core.transfer import TransferManager
+            try:
+                TransferManager(self.config, self.logger).dry_run(source, devices)
+            except Exception as e:
+                self.logger.error(f"Erreur lors de la simulation: {e}")
+        
+        threading.Thread(target=estimate_thread, daemon=True).start()
+
     def delete_temp_files(self):
         """Delete temporary files on selected devices."""
         devices = self.get_selected_devices()
@@ -1289,11 +1662,12 @@ class Application(tk.Frame):
         Reassemble files on ALL devices in parallel with synchronized modals.
         One modal for all devices at each step.
         """
-        from core.reassembly import ReassemblyManager
+        from core.reassembly import ReassemblyManager, direct_placement_target
         import concurrent.futures
         import threading
 
         remote_temp_dir = self.config.get("remote_temp_dir", "/sdcard/transfer_temp")
+        direct_target = direct_placement_target(self.config, remote_temp_dir, target)
 
         # Create reassembly managers for all devices
         managers = {}
@@ -1305,6 +1679,9 @@ class Application(tk.Frame):
                 device_id,
                 modal_callback=None  # We'll handle modals centrally
             )
+            managers[device_id].direct_target = direct_target
+            managers[device_id].manifests = self.transfer_manager.manifests
+            managers[device_id].transfer_manager = self.current_transfer_managers.get(device_id, self.transfer_manager)
 
         # Store managers for cancellation
         self.current_reassembly_managers = managers
@@ -1359,7 +1736,10 @@ class Application(tk.Frame):
                     
                     # Run the full ADB reassembly process
                     # This includes push script, execute, wait, verify, move, cleanup
+                    reassembly_start_time = time.time()
                     success = manager.reassemble_via_adb_shell(remote_temp_dir, target)
+                    if success:
+                        self.transfer_manager.record_phase("reassembly", time.time() - reassembly_start_time, device_id=device_id)
                     
                     step_complete["adb_reassembly"].wait()
                     
@@ -1399,20 +1779,27 @@ class Application(tk.Frame):
                 # Step 6: Wait for reassembly
                 step_ready["reassembly_progress"].wait()
                 manager._wait_for_reassembly_completion(remote_temp_dir)
+                # Bad files are reassembled again; the steps go on so the other devices are not blocked
+                verified = manager._verify_reassembled_files(remote_temp_dir)
+                if not verified:
+                    self.logger.error(f"[{device_id}] Vérification des fichiers réassemblés a échoué")
                 step_complete["reassembly_progress"].wait()
 
                 # Step 7: Final move
                 step_ready["final_move"].wait()
-                manager._move_files_to_destination(remote_temp_dir, target)
+                if verified:
+                    manager._move_files_to_destination(remote_temp_dir, target)
                 step_complete["final_move"].wait()
 
                 # Step 8: Completion
                 step_ready["completion"].wait()
-                manager._cleanup(remote_temp_dir)
+                if verified:
+                    manager._cleanup(remote_temp_dir)
                 step_complete["completion"].wait()
 
-                transfer_results[device_id]['reassembly_success'] = True
-                self.logger.success(f"[{device_id}] Réassemblage terminé.")
+                transfer_results[device_id]['reassembly_success'] = verified
+                if verified:
+                    self.logger.success(f"[{device_id}] Réassemblage terminé.")
 
             except Exception as e:
                 self.logger.error(f"[{device_id}] Erreur lors du réassemblage: {e}")
@@ -1473,6 +1860,8 @@ class Application(tk.Frame):
                 device_id,
                 modal_callback=lambda modal_type, **kwargs: self.show_device_reassembly_modal(device_id, modal_type, **kwargs)
             )
+            reassembly_manager.manifests = self.transfer_manager.manifests
+            reassembly_manager.transfer_manager = self.current_transfer_managers.get(device_id, self.transfer_manager)
 
             success = reassembly_manager.reassemble_via_termux(remote_temp_dir, target)
             return success
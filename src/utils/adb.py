@@ -1,12 +1,57 @@
 # claude_v2/src/utils/adb.py
 import subprocess
 import shlex
+import threading
 
 class Adb:
     def __init__(self, logger):
         self.logger = logger
+        self._running = {}  # Running process -> device id, so cancellation can kill them
+        self._terminated = set()
+        self._lock = threading.Lock()
 
-    def run_command(self, command, device_id=None):
+    def terminate(self, device_id=None):
+        """
+        Kill every running adb command (of one device when `device_id` is given).
+
+        The killed commands return None like any failed command.
+
+        Returns:
+            Number of processes killed
+        """
+        with self._lock:
+            targets = [p for p, dev in self._running.items() if device_id is None or dev == device_id]
+            self._terminated.update(targets)
+        for process in targets:
+            try:
+                process.kill()
+            except OSError:
+                pass
+        return len(targets)
+
+    def _register(self, process, device_id):
+        with self._lock:
+            self._running[process] = device_id
+
+    def _unregister(self, process):
+        """Forget a finished process; True if it was killed by terminate()."""
+        with self._lock:
+            self._running.pop(process, None)
+            if process in self._terminated:
+                self._terminated.discard(process)
+                return True
+        return False
+
+    def run_command(self, command, device_id=None, on_start=None):
+        """
+        Run an adb command and collect its output lines.
+
+        `on_start`, if given, is called with the Popen object once the process
+        runs (lets a watchdog kill a hung command).
+
+        Returns:
+            List of output lines, None on failure
+        """
         adb_path = "adb"
         
         if device_id:
@@ -33,17 +78,26 @@ class Adb:
                 startupinfo=startupinfo,
                 creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
             )
-            
-            output_lines = []
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    self.logger.info(output.strip())
-                    output_lines.append(output.strip())
-
-            rc = process.poll()
+            self._register(process, device_id)
+            try:
+                if on_start is not None:
+                    on_start(process)
+                
+                output_lines = []
+                while True:
+                    output = process.stdout.readline()
+                    if output == '' and process.poll() is not None:
+                        break
+                    if output:
+                        self.logger.info(output.strip())
+                        output_lines.append(output.strip())
+
+                rc = process.wait()
+            finally:
+                terminated = self._unregister(process)
+            if terminated:
+                self.logger.info("Commande ADB interrompue.")
+                return None
             if rc != 0:
                 self.logger.error(f"Erreur lors de l'exécution de la commande ADB. Code de sortie: {rc}")
                 return None
@@ -57,6 +111,78 @@ class Adb:
             self.logger.error(f"Une erreur inattendue est survenue: {e}")
             return None
 
+    def push_data(self, data, remote_path, device_id, on_start=None, on_progress=None, block_size=1024 * 1024,
+                  decompress=False):
+        """
+        Write `data` to `remote_path` on the device through `adb exec-in` (raw stdin, no pty).
+
+        Used when the file content is already in memory (shared read cache), or
+        with a binary file object to stream a file (compressed blobs).
+        The data is written in blocks of `block_size`; `on_progress(nbytes)` is
+        called after each block and `on_start(process)` once the process runs.
+        With `decompress`, the data is gzip and is decompressed on the device
+        while it streams (`gzip -dc`).
+
+        Returns:
+            Empty list on success, None on failure (same convention as run_command)
+        """
+        remote_command = "gzip -dc" if decompress else "cat"
+        command_list = ["adb", "-s", device_id, "exec-in", f"{remote_command} > {shlex.quote(remote_path)}"]
+        size = f"{len(data)} octets" if isinstance(data, (bytes, bytearray, memoryview)) else "flux"
+        self.logger.info(f"Exécution de la commande: {' '.join(command_list)} ({size})")
+        try:
+            startupinfo = None
+            if hasattr(subprocess, 'STARTUPINFO'):
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+                startupinfo.wShowWindow = subprocess.SW_HIDE
+
+            process = subprocess.Popen(
+                command_list,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                startupinfo=startupinfo,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            self._register(process, device_id)
+            try:
+                if on_start is not None:
+                    on_start(process)
+
+                try:
+                    if hasattr(data, "read"):
+                        blocks = iter(lambda: data.read(block_size), b"")
+                    else:
+                        view = memoryview(data)
+                        blocks = (view[offset:offset + block_size] for offset in range(0, len(view), block_size))
+                    for block in blocks:
+                        process.stdin.write(block)
+                        if on_progress is not None:
+                            on_progress(len(block))
+                    process.stdin.close()
+                except (BrokenPipeError, OSError, ValueError):
+                    pass  # The process died (or was killed); its exit code tells
+                output = process.stdout.read()
+                returncode = process.wait()
+            finally:
+                terminated = self._unregister(process)
+            if terminated:
+                self.logger.info("Écriture via exec-in interrompue.")
+                return None
+            if returncode != 0:
+                output = output.decode('utf-8', errors='replace').strip()
+                self.logger.error(f"Erreur lors de l'écriture via exec-in. Code de sortie: {returncode} {output}")
+                return None
+            return []
+
+        except FileNotFoundError:
+            self.logger.error("Erreur: L'exécutable 'adb' est introuvable. Veuillez l'installer et l'ajouter à votre PATH.")
+            return None
+        except Exception as e:
+            self.logger.error(f"Une erreur inattendue est survenue: {e}")
+            return None
+
     def check_adb(self):
         self.logger.info("Vérification de l'installation d'ADB...")
         output = self.run_command("version")
@@ -80,7 +206,7 @@ class Adb:
         Get connected devices with detailed info including connection type.
 
         Returns:
-            List of dicts with keys: id, type ('usb' or 'wifi'), display_name, model
+            List of dicts with keys: id, type ('usb' or 'wifi'), display_name, model, usb_path
         """
         # Using -l to get model info
         output = self.run_command("devices -l")
@@ -90,7 +216,7 @@ class Adb:
         devices = []
         # Output format example:
         # List of devices attached
-        # 8A2X0032D      device product:bramble model:Pixel_4a_(5G) device:bramble transport_id:1
+        # 8A2X0032D      device usb:1-2.3 product:bramble model:Pixel_4a_(5G) device:bramble transport_id:1
         # 192.168.1.105:5555 device product:bramble model:Pixel_4a_(5G) device:bramble transport_id:2
         
         for line in output[1:]:  # Skip header
@@ -108,12 +234,14 @@ class Adb:
                     conn_type = "usb"
                     icon = "🔌"
 
-                # Extract model
+                # Extract model and USB topology path (e.g. usb:1-2.3 = bus 1, hub port 2, port 3)
                 model = "Inconnu"
+                usb_path = None
                 for part in parts:
                     if part.startswith("model:"):
                         model = part.replace("model:", "").replace("_", " ")
-                        break
+                    elif part.startswith("usb:"):
+                        usb_path = part[len("usb:"):]
                 
                 display_name = f"{icon} {device_id} ({model})"
 
@@ -122,11 +250,22 @@ class Adb:
                     "type": conn_type,
                     "display_name": display_name,
                     "model": model,
+                    "usb_path": usb_path,
                     "raw_line": line
                 })
 
         return devices
 
+    def get_serialno(self, device_id: str) -> str | None:
+        """
+        Hardware serial number (ro.serialno) of a device.
+        Identical for the USB and WiFi transports of the same phone.
+        """
+        output = self.run_command('shell getprop ro.serialno', device_id)
+        if not output or not output[0].strip():
+            return None
+        return output[0].strip()
+
     def enable_tcpip(self, device_id: str, port: int = 5555) -> bool:
         """
         Enable TCP/IP mode on a USB-connected device.
@@ -0,0 +1,33 @@
+# claude_v2/src/utils/cache.py
+"""
+Local cache directory shared by the transfer engine.
+Holds data that must survive between runs (incremental bundles, journals...).
+"""
+
+import hashlib
+from pathlib import Path
+
+from config import DEFAULT_LOCAL_CACHE_DIR
+
+
+def get_cache_dir(config, *parts) -> Path:
+    """
+    Return (and create) a sub-directory of the local cache.
+
+    Args:
+        config: Application config dict (`local_cache_dir` overrides the default)
+        *parts: Sub-directory components
+
+    Returns:
+        Path to the cache directory
+    """
+    root = config.get("local_cache_dir") or str(Path.home() / DEFAULT_LOCAL_CACHE_DIR)
+    cache_dir = Path(root).joinpath(*parts)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def path_key(path) -> str:
+    """Stable short key for a local or remote path, usable as a file name."""
+    normalized = str(path).replace('\\', '/').rstrip('/')
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
@@ -3,8 +3,18 @@
 # Handles both chunked files and bundled ZIP archives
 # Restores original folder structure on Android device
 #
-# Usage: sh unified.sh <transfer_root>
-# Example: sh unified.sh /sdcard/adb
+# Chunk folders and bundles are processed by a bounded pool of background jobs
+#
+# Entries listed in <transfer_root>/.priority_order (chunk folders and bundles,
+# relative to the root, highest priority first) are started before the others
+#
+# Usage: sh unified.sh <transfer_root> [max_jobs] [dest_root]
+# Example: sh unified.sh /sdcard/adb 4
+# max_jobs defaults to the number of CPU cores (0 = auto)
+#
+# With dest_root (direct placement), reassembled files and bundle contents are
+# written straight into dest_root under temporary names and renamed into place,
+# instead of being restored in the transfer root and copied afterwards
 
 # Simple output functions
 log_info() {
@@ -26,17 +36,36 @@ log_warning() {
 # Check for transfer root argument
 if [ -z "$1" ]; then
     log_error "No transfer root specified"
-    echo "Usage: sh unified.sh <transfer_root>"
+    echo "Usage: sh unified.sh <transfer_root> [max_jobs]"
     echo "Example: sh unified.sh /sdcard/adb"
     exit 1
 fi
 
 TRANSFER_ROOT="$1"
+MAX_JOBS="$2"
+DEST_ROOT="$3"
+MARKER_FILE="$TRANSFER_ROOT/.reassembly_complete"
+
+# Remove the marker of a previous run so the host does not see it too early
+rm -f "$MARKER_FILE" 2>/dev/null
+
+# Number of concurrent jobs: argument, else CPU core count, else 2
+if [ -z "$MAX_JOBS" ] || [ "$MAX_JOBS" -le 0 ] 2>/dev/null; then
+    MAX_JOBS=$(nproc 2>/dev/null || grep -c '^processor' /proc/cpuinfo 2>/dev/null)
+fi
+if [ -z "$MAX_JOBS" ] || [ "$MAX_JOBS" -le 0 ] 2>/dev/null; then
+    MAX_JOBS=2
+fi
 
 log_info "========================================================"
 log_info "ADB Transfer - Unified Reassembly"
 log_info "========================================================"
 log_info "Transfer root: $TRANSFER_ROOT"
+log_info "Parallel jobs: $MAX_JOBS"
+if [ -n "$DEST_ROOT" ]; then
+    log_info "Direct placement into: $DEST_ROOT"
+    mkdir -p "$DEST_ROOT"
+fi
 echo ""
 
 # Statistics
@@ -48,159 +77,227 @@ SUCCESS_BUNDLES=0
 FAILED_BUNDLES=0
 
 # ============================================================
-# PART 1: REASSEMBLE CHUNKED FILES
+# JOB POOL
 # ============================================================
+# Every job writes exactly one status file when it ends:
+#   $STATUS_DIR/<job_id>.ok   or   $STATUS_DIR/<job_id>.fail
+# containing a one-line description. The number of running jobs is
+# (jobs started - status files written), which acts as a semaphore.
+
+STATUS_DIR="$TRANSFER_ROOT/.reassembly_status"
+rm -rf "$STATUS_DIR" 2>/dev/null
+mkdir -p "$STATUS_DIR"
+JOBS_STARTED=0
+
+wait_for_slot() {
+    while true; do
+        JOBS_DONE=$(ls -1 "$STATUS_DIR" 2>/dev/null | wc -l)
+        if [ $((JOBS_STARTED - JOBS_DONE)) -lt "$MAX_JOBS" ]; then
+            return
+        fi
+        sleep 0.2 2>/dev/null || sleep 1
+    done
+}
 
-log_info "PHASE 1: Scanning for chunked files..."
+job_status() {
+    # $1 = job id, $2 = ok|fail, $3 = message
+    echo "$3" > "$STATUS_DIR/$1.$2"
+}
 
-# Find all chunk folders recursively
-CHUNK_FOLDERS=$(find "$TRANSFER_ROOT" -type d -name "*_chunks" 2>/dev/null | sort)
+# Reassemble one chunk folder into its original file
+reassemble_chunk_dir() {
+    JOB_ID="$1"
+    CHUNK_DIR="$2"
+    CHUNK_PARENT=$(dirname "$CHUNK_DIR")
 
-if [ -z "$CHUNK_FOLDERS" ]; then
-    log_info "No chunked files found"
-else
-    # Process each chunk folder
-    for CHUNK_DIR in $CHUNK_FOLDERS; do
-        TOTAL_CHUNKS=$((TOTAL_CHUNKS + 1))
+    # Read metadata to get original filename with extension
+    METADATA_FILE="$CHUNK_DIR/chunk_metadata.json"
 
-        # Get chunk folder name and parent directory
-        CHUNK_BASENAME=$(basename "$CHUNK_DIR")
-        CHUNK_PARENT=$(dirname "$CHUNK_DIR")
+    if [ ! -f "$METADATA_FILE" ]; then
+        log_error "  Metadata not found: $METADATA_FILE"
+        job_status "$JOB_ID" fail "$CHUNK_DIR: metadata not found"
+        return
+    fi
 
-        # Read metadata to get original filename with extension
-        METADATA_FILE="$CHUNK_DIR/chunk_metadata.json"
+    # Extract original filename from metadata JSON
+    # The "original_file" field contains the relative path with extension
+    ORIGINAL_REL_PATH=$(grep -o '"original_file"[[:space:]]*:[[:space:]]*"[^"]*"' "$METADATA_FILE" | sed 's/.*"original_file"[[:space:]]*:[[:space:]]*"\([^"]*\)".*/\1/')
 
-        if [ ! -f "$METADATA_FILE" ]; then
-            log_error "  Metadata not found: $METADATA_FILE"
-            FAILED_CHUNKS=$((FAILED_CHUNKS + 1))
-            continue
-        fi
+    if [ -z "$ORIGINAL_REL_PATH" ]; then
+        log_error "  Could not extract original filename from metadata"
+        job_status "$JOB_ID" fail "$CHUNK_DIR: bad metadata"
+        return
+    fi
 
-        # Extract original filename from metadata JSON
-        # The "original_file" field contains the relative path with extension
-        ORIGINAL_REL_PATH=$(grep -o '"original_file"[[:space:]]*:[[:space:]]*"[^"]*"' "$METADATA_FILE" | sed 's/.*"original_file"[[:space:]]*:[[:space:]]*"\([^"]*\)".*/\1/')
+    # Get just the filename with extension from the relative path
+    ORIGINAL_NAME=$(basename "$ORIGINAL_REL_PATH")
 
-        if [ -z "$ORIGINAL_REL_PATH" ]; then
-            log_error "  Could not extract original filename from metadata"
-            FAILED_CHUNKS=$((FAILED_CHUNKS + 1))
-            continue
-        fi
+    # Expected size of the reassembled file (empty with old metadata: not checked)
+    EXPECTED_SIZE=$(grep -o '"original_size"[[:space:]]*:[[:space:]]*[0-9]*' "$METADATA_FILE" | sed 's/.*:[[:space:]]*//')
 
-        # Get just the filename with extension from the relative path
-        ORIGINAL_NAME=$(basename "$ORIGINAL_REL_PATH")
+    # Output file will be in same directory as chunk folder (same relative
+    # directory under the destination with direct placement)
+    if [ -n "$DEST_ROOT" ]; then
+        OUTPUT_DIR="$DEST_ROOT${CHUNK_PARENT#$TRANSFER_ROOT}"
+        mkdir -p "$OUTPUT_DIR"
+    else
+        OUTPUT_DIR="$CHUNK_PARENT"
+    fi
+    OUTPUT_FILE="$OUTPUT_DIR/$ORIGINAL_NAME"
+    # Written under a temporary name, renamed once complete
+    PART_FILE="$OUTPUT_FILE.adbt_part"
 
-        # Output file will be in same directory as chunk folder
-        OUTPUT_FILE="$CHUNK_PARENT/$ORIGINAL_NAME"
+    # Count chunks
+    NUM_CHUNKS=$(ls -1 "$CHUNK_DIR"/chunk_*.bin 2>/dev/null | wc -l)
 
-        log_info "Processing chunked file: $ORIGINAL_NAME"
-        log_info "  Chunk folder: $CHUNK_DIR"
-        log_info "  Output: $OUTPUT_FILE"
+    if [ "$NUM_CHUNKS" -eq 0 ]; then
+        log_error "  No chunk files found in $CHUNK_DIR"
+        job_status "$JOB_ID" fail "$ORIGINAL_NAME: no chunk files"
+        return
+    fi
 
-        # Count chunks
-        NUM_CHUNKS=$(ls -1 "$CHUNK_DIR"/chunk_*.bin 2>/dev/null | wc -l)
+    log_info "Reassembling $ORIGINAL_NAME ($NUM_CHUNKS chunks)"
 
-        if [ "$NUM_CHUNKS" -eq 0 ]; then
-            log_error "  No chunk files found"
-            FAILED_CHUNKS=$((FAILED_CHUNKS + 1))
-            continue
-        fi
+    # Remove a partial output left by an interrupted run
+    rm -f "$PART_FILE"
 
-        log_info "  Chunks to reassemble: $NUM_CHUNKS"
-
-        # Remove output file if exists
-        rm -f "$OUTPUT_FILE"
-
-        # Reassemble chunks using cat (in correct order)
-        CHUNK_INDEX=0
-        FAILED_CHUNK=0
-
-        while [ $CHUNK_INDEX -lt $NUM_CHUNKS ]; do
-            CHUNK_FILE=$(printf "$CHUNK_DIR/chunk_%04d.bin" $CHUNK_INDEX)
-
-            if [ ! -f "$CHUNK_FILE" ]; then
-                log_error "  Missing chunk: chunk_$(printf '%04d' $CHUNK_INDEX).bin"
-                FAILED_CHUNK=1
-                break
-            fi
-
-            # Append chunk to output
-            cat "$CHUNK_FILE" >> "$OUTPUT_FILE" 2>/dev/null
-            if [ $? -ne 0 ]; then
-                log_error "  Failed to read chunk_$(printf '%04d' $CHUNK_INDEX).bin"
-                FAILED_CHUNK=1
-                break
-            fi
-
-            CHUNK_INDEX=$((CHUNK_INDEX + 1))
-
-            # Progress indicator
-            PROGRESS=$((CHUNK_INDEX * 100 / NUM_CHUNKS))
-            echo "  Progress: $CHUNK_INDEX/$NUM_CHUNKS ($PROGRESS%)"
-        done
-
-        # Check if reassembly succeeded
-        if [ "$FAILED_CHUNK" -eq 1 ]; then
-            log_error "  Reassembly failed - chunk errors"
-            rm -f "$OUTPUT_FILE" 2>/dev/null
-            FAILED_CHUNKS=$((FAILED_CHUNKS + 1))
-            continue
+    # Reassemble chunks using cat (in correct order)
+    CHUNK_INDEX=0
+    while [ $CHUNK_INDEX -lt $NUM_CHUNKS ]; do
+        CHUNK_FILE=$(printf "$CHUNK_DIR/chunk_%04d.bin" $CHUNK_INDEX)
+
+        if [ ! -f "$CHUNK_FILE" ]; then
+            log_error "  Missing chunk: chunk_$(printf '%04d' $CHUNK_INDEX).bin ($ORIGINAL_NAME)"
+            rm -f "$PART_FILE" 2>/dev/null
+            job_status "$JOB_ID" fail "$ORIGINAL_NAME: missing chunk $CHUNK_INDEX"
+            return
         fi
 
-        if [ ! -f "$OUTPUT_FILE" ]; then
-            log_error "  Reassembly failed - output file not created"
-            FAILED_CHUNKS=$((FAILED_CHUNKS + 1))
-            continue
+        # Append chunk to output
+        cat "$CHUNK_FILE" >> "$PART_FILE" 2>/dev/null
+        if [ $? -ne 0 ]; then
+            log_error "  Failed to read chunk_$(printf '%04d' $CHUNK_INDEX).bin ($ORIGINAL_NAME)"
+            rm -f "$PART_FILE" 2>/dev/null
+            job_status "$JOB_ID" fail "$ORIGINAL_NAME: read error on chunk $CHUNK_INDEX"
+            return
         fi
 
-        # Get file size
-        if [ -f "$OUTPUT_FILE" ]; then
-            FILE_SIZE=$(stat -c%s "$OUTPUT_FILE" 2>/dev/null || stat -f%z "$OUTPUT_FILE" 2>/dev/null || echo "0")
-            FILE_SIZE_GB=$(awk "BEGIN {printf \"%.2f\", $FILE_SIZE / (1024*1024*1024)}")
-
-            log_success "  Reassembled: ${FILE_SIZE_GB} GB"
-
-            # Delete chunk folder now that file is reassembled
-            log_info "  Cleaning up chunk folder..."
-            rm -rf "$CHUNK_DIR" 2>/dev/null
-            if [ $? -eq 0 ]; then
-                log_info "  Chunk folder deleted"
-            else
-                log_error "  Could not delete chunk folder (check permissions)"
-            fi
-
-            SUCCESS_CHUNKS=$((SUCCESS_CHUNKS + 1))
-        else
-            log_error "  Output file not created"
-            FAILED_CHUNKS=$((FAILED_CHUNKS + 1))
+        CHUNK_INDEX=$((CHUNK_INDEX + 1))
+    done
+
+    # A truncated output (short read, full storage) is never renamed into place;
+    # the chunk folder is kept so the host can reassemble this file again
+    if [ -n "$EXPECTED_SIZE" ] && [ -f "$PART_FILE" ]; then
+        PART_SIZE=$(stat -c%s "$PART_FILE" 2>/dev/null || stat -f%z "$PART_FILE" 2>/dev/null || wc -c < "$PART_FILE" | tr -d ' ')
+        if [ "$PART_SIZE" != "$EXPECTED_SIZE" ]; then
+            log_error "  Size mismatch: $ORIGINAL_NAME ($PART_SIZE bytes, expected $EXPECTED_SIZE)"
+            rm -f "$PART_FILE" 2>/dev/null
+            job_status "$JOB_ID" fail "$ORIGINAL_NAME: size $PART_SIZE, expected $EXPECTED_SIZE"
+            return
         fi
+    fi
+
+    if [ ! -f "$PART_FILE" ] || ! mv -f "$PART_FILE" "$OUTPUT_FILE" 2>/dev/null; then
+        rm -f "$PART_FILE" 2>/dev/null
+        log_error "  Reassembly failed - output file not created ($ORIGINAL_NAME)"
+        job_status "$JOB_ID" fail "$ORIGINAL_NAME: output not created"
+        return
+    fi
+
+    FILE_SIZE=$(stat -c%s "$OUTPUT_FILE" 2>/dev/null || stat -f%z "$OUTPUT_FILE" 2>/dev/null || echo "0")
+    FILE_SIZE_GB=$(awk "BEGIN {printf \"%.2f\", $FILE_SIZE / (1024*1024*1024)}")
+    log_success "  Reassembled: $ORIGINAL_NAME (${FILE_SIZE_GB} GB)"
+
+    # Delete chunk folder now that file is reassembled
+    rm -rf "$CHUNK_DIR" 2>/dev/null
+    if [ $? -ne 0 ]; then
+        log_error "  Could not delete chunk folder $CHUNK_DIR (check permissions)"
+    fi
+
+    job_status "$JOB_ID" ok "$ORIGINAL_NAME: ${FILE_SIZE} bytes"
+}
+
+# Move every file of a staging folder to the same relative path under DEST_ROOT.
+# The staging folder is inside DEST_ROOT, so each move is a rename (no data copy)
+# and a file only appears at its final path once complete
+place_staged() {
+    STAGE="$1"
+    ( cd "$STAGE" && find . -type d ) | while IFS= read -r REL_DIR; do
+        mkdir -p "$DEST_ROOT/$REL_DIR" 2>/dev/null
+        find "$STAGE/$REL_DIR" -mindepth 1 -maxdepth 1 -type f \
+            -exec sh -c 'mv -f "$@" "$0"' "$DEST_ROOT/$REL_DIR" {} + 2>/dev/null
     done
+    # Success when nothing is left behind
+    [ -z "$(find "$STAGE" -type f 2>/dev/null | head -n 1)" ]
+}
+
+# Extract one bundle ZIP next to itself (preserving folder structure),
+# or into the destination with direct placement
+extract_bundle() {
+    JOB_ID="$1"
+    BUNDLE_ZIP="$2"
+    BUNDLE_BASENAME=$(basename "$BUNDLE_ZIP")
+    BUNDLE_PARENT=$(dirname "$BUNDLE_ZIP")
+    EXTRACT_DIR="$BUNDLE_PARENT"
+    if [ -n "$DEST_ROOT" ]; then
+        EXTRACT_DIR="$DEST_ROOT/.adbt_staging/$JOB_ID"
+        rm -rf "$EXTRACT_DIR" 2>/dev/null
+        mkdir -p "$EXTRACT_DIR"
+    fi
 
-    # Cleanup chunking manifest file if all succeeded
-    if [ "$SUCCESS_CHUNKS" -eq "$TOTAL_CHUNKS" ] && [ "$TOTAL_CHUNKS" -gt 0 ]; then
-        MANIFEST_FILE="$TRANSFER_ROOT/chunking_manifest.json"
-        if [ -f "$MANIFEST_FILE" ]; then
-            rm -f "$MANIFEST_FILE" 2>/dev/null
-            log_info "Removed chunking manifest file"
+    log_info "Extracting bundle: $BUNDLE_BASENAME"
+
+    $UNZIP_CMD -o -q "$BUNDLE_ZIP" -d "$EXTRACT_DIR" 2>/dev/null
+    EXTRACT_RESULT=$?
+
+    if [ $EXTRACT_RESULT -ne 0 ]; then
+        log_error "  Bundle extraction failed: $BUNDLE_BASENAME (exit code: $EXTRACT_RESULT)"
+        [ -n "$DEST_ROOT" ] && rm -rf "$EXTRACT_DIR" 2>/dev/null
+        job_status "$JOB_ID" fail "$BUNDLE_BASENAME: unzip exit code $EXTRACT_RESULT"
+        return
+    fi
+
+    if [ -n "$DEST_ROOT" ]; then
+        place_staged "$EXTRACT_DIR"
+        PLACE_RESULT=$?
+        rm -rf "$EXTRACT_DIR" 2>/dev/null
+        if [ $PLACE_RESULT -ne 0 ]; then
+            log_error "  Could not move the files of $BUNDLE_BASENAME into $DEST_ROOT"
+            job_status "$JOB_ID" fail "$BUNDLE_BASENAME: placement failed"
+            return
         fi
     fi
-fi
 
-echo ""
+    log_success "  Bundle extracted: $BUNDLE_BASENAME"
+
+    # Record extraction so incremental runs can skip this bundle
+    echo "$BUNDLE_BASENAME" >> "$TRANSFER_ROOT/.extracted_bundles"
+
+    # Delete ZIP after successful extraction
+    rm -f "$BUNDLE_ZIP" 2>/dev/null
+    if [ $? -ne 0 ]; then
+        log_warning "  Could not delete bundle ZIP $BUNDLE_BASENAME"
+    fi
+
+    job_status "$JOB_ID" ok "$BUNDLE_BASENAME: extracted"
+}
 
 # ============================================================
-# PART 2: EXTRACT BUNDLED ZIP FILES
+# PART 0: LIST JOBS AND START PRIORITY ENTRIES
 # ============================================================
 
-log_info "PHASE 2: Scanning for bundled archives..."
+# Lists are built before any job runs: jobs delete their chunk folder / ZIP when done
+CHUNK_LIST="$TRANSFER_ROOT/.chunk_folders.list"
+find "$TRANSFER_ROOT" -type d -name "*_chunks" 2>/dev/null | sort > "$CHUNK_LIST"
+TOTAL_CHUNKS=$(wc -l < "$CHUNK_LIST" | tr -d ' ')
 
-# Find all bundle ZIP files
-BUNDLE_ZIPS=$(find "$TRANSFER_ROOT" -type f -name "bundle_*.zip" 2>/dev/null | sort)
+BUNDLE_LIST="$TRANSFER_ROOT/.bundle_zips.list"
+find "$TRANSFER_ROOT" -type f -name "bundle_*.zip" 2>/dev/null | sort > "$BUNDLE_LIST"
+TOTAL_BUNDLES=$(wc -l < "$BUNDLE_LIST" | tr -d ' ')
 
-if [ -z "$BUNDLE_ZIPS" ]; then
-    log_info "No bundled archives found"
-else
-    # Check if unzip is available
-    UNZIP_CMD=""
+# Check if unzip is available
+UNZIP_CMD=""
+if [ "$TOTAL_BUNDLES" -gt 0 ]; then
     if command -v unzip >/dev/null 2>&1; then
         UNZIP_CMD="unzip"
     elif [ -f /system/xbin/unzip ]; then
@@ -210,68 +307,128 @@ else
     else
         log_warning "unzip not found - bundled archives cannot be extracted"
         log_warning "Please install busybox or unzip on device"
-        UNZIP_CMD=""
     fi
+fi
 
-    if [ -n "$UNZIP_CMD" ]; then
-        # Process each bundle ZIP
-        for BUNDLE_ZIP in $BUNDLE_ZIPS; do
-            TOTAL_BUNDLES=$((TOTAL_BUNDLES + 1))
-
-            BUNDLE_BASENAME=$(basename "$BUNDLE_ZIP")
-            BUNDLE_PARENT=$(dirname "$BUNDLE_ZIP")
-
-            log_info "Processing bundle: $BUNDLE_BASENAME"
-            log_info "  Bundle location: $BUNDLE_ZIP"
-            log_info "  Extract to: $BUNDLE_PARENT"
-
-            # Get bundle size
-            BUNDLE_SIZE=$(stat -c%s "$BUNDLE_ZIP" 2>/dev/null || stat -f%z "$BUNDLE_ZIP" 2>/dev/null || echo "0")
-            BUNDLE_SIZE_MB=$(awk "BEGIN {printf \"%.2f\", $BUNDLE_SIZE / (1024*1024)}")
-            log_info "  Bundle size: ${BUNDLE_SIZE_MB} MB"
-
-            # Extract bundle to parent directory (preserving folder structure)
-            $UNZIP_CMD -o -q "$BUNDLE_ZIP" -d "$BUNDLE_PARENT" 2>/dev/null
-            EXTRACT_RESULT=$?
-
-            if [ $EXTRACT_RESULT -eq 0 ]; then
-                log_success "  Bundle extracted successfully"
-
-                # Delete ZIP after successful extraction
-                log_info "  Cleaning up bundle ZIP..."
-                rm -f "$BUNDLE_ZIP" 2>/dev/null
-                if [ $? -eq 0 ]; then
-                    log_info "  Bundle ZIP deleted"
-                else
-                    log_warning "  Could not delete bundle ZIP"
-                fi
-
-                SUCCESS_BUNDLES=$((SUCCESS_BUNDLES + 1))
-            else
-                log_error "  Bundle extraction failed (exit code: $EXTRACT_RESULT)"
-                FAILED_BUNDLES=$((FAILED_BUNDLES + 1))
-            fi
-        done
-
-        # Cleanup bundling manifest file if all succeeded
-        if [ "$SUCCESS_BUNDLES" -eq "$TOTAL_BUNDLES" ] && [ "$TOTAL_BUNDLES" -gt 0 ]; then
-            MANIFEST_FILE="$TRANSFER_ROOT/bundling_manifest.json"
-            if [ -f "$MANIFEST_FILE" ]; then
-                rm -f "$MANIFEST_FILE" 2>/dev/null
-                log_info "Removed bundling manifest file"
-            fi
+# Entries already started from the priority order
+SCHEDULED_LIST="$TRANSFER_ROOT/.scheduled.list"
+: > "$SCHEDULED_LIST"
+PRIORITY_FILE="$TRANSFER_ROOT/.priority_order"
+
+if [ -f "$PRIORITY_FILE" ]; then
+    log_info "PHASE 0: Starting priority entries..."
+    while IFS= read -r REL_PATH; do
+        [ -n "$REL_PATH" ] || continue
+        ITEM="$TRANSFER_ROOT/$REL_PATH"
+        if grep -Fxq "$ITEM" "$CHUNK_LIST"; then
+            wait_for_slot
+            JOBS_STARTED=$((JOBS_STARTED + 1))
+            reassemble_chunk_dir "chunk_p$JOBS_STARTED" "$ITEM" &
+            echo "$ITEM" >> "$SCHEDULED_LIST"
+        elif [ -n "$UNZIP_CMD" ] && grep -Fxq "$ITEM" "$BUNDLE_LIST"; then
+            wait_for_slot
+            JOBS_STARTED=$((JOBS_STARTED + 1))
+            extract_bundle "bundle_p$JOBS_STARTED" "$ITEM" &
+            echo "$ITEM" >> "$SCHEDULED_LIST"
         fi
+    done < "$PRIORITY_FILE"
+    echo ""
+fi
+
+# ============================================================
+# PART 1: SCHEDULE CHUNKED FILES
+# ============================================================
+
+log_info "PHASE 1: Scanning for chunked files..."
+
+if [ "$TOTAL_CHUNKS" -eq 0 ]; then
+    log_info "No chunked files found"
+else
+    log_info "$TOTAL_CHUNKS chunked file(s) to reassemble"
+    while IFS= read -r CHUNK_DIR; do
+        grep -Fxq "$CHUNK_DIR" "$SCHEDULED_LIST" && continue
+        wait_for_slot
+        JOBS_STARTED=$((JOBS_STARTED + 1))
+        reassemble_chunk_dir "chunk_$JOBS_STARTED" "$CHUNK_DIR" &
+    done < "$CHUNK_LIST"
+fi
+rm -f "$CHUNK_LIST" 2>/dev/null
+
+echo ""
+
+# ============================================================
+# PART 2: SCHEDULE BUNDLED ZIP FILES
+# ============================================================
+
+log_info "PHASE 2: Scanning for bundled archives..."
+
+if [ "$TOTAL_BUNDLES" -eq 0 ]; then
+    log_info "No bundled archives found"
+else
+    if [ -n "$UNZIP_CMD" ]; then
+        log_info "$TOTAL_BUNDLES bundle(s) to extract"
+        BUNDLE_INDEX=0
+        while IFS= read -r BUNDLE_ZIP; do
+            grep -Fxq "$BUNDLE_ZIP" "$SCHEDULED_LIST" && continue
+            wait_for_slot
+            JOBS_STARTED=$((JOBS_STARTED + 1))
+            BUNDLE_INDEX=$((BUNDLE_INDEX + 1))
+            extract_bundle "bundle_$BUNDLE_INDEX" "$BUNDLE_ZIP" &
+        done < "$BUNDLE_LIST"
     else
         # No unzip available - mark all as failed
-        for BUNDLE_ZIP in $BUNDLE_ZIPS; do
-            TOTAL_BUNDLES=$((TOTAL_BUNDLES + 1))
-            FAILED_BUNDLES=$((FAILED_BUNDLES + 1))
-        done
+        FAILED_BUNDLES=$TOTAL_BUNDLES
     fi
 fi
+rm -f "$BUNDLE_LIST" "$SCHEDULED_LIST" 2>/dev/null
+
+# Wait for every background job to finish
+wait
+
+# Aggregate per-job status
+SUCCESS_CHUNKS=$(ls -1 "$STATUS_DIR" 2>/dev/null | grep -c '^chunk_.*\.ok$')
+FAILED_CHUNKS=$((TOTAL_CHUNKS - SUCCESS_CHUNKS))
+if [ -n "$UNZIP_CMD" ]; then
+    SUCCESS_BUNDLES=$(ls -1 "$STATUS_DIR" 2>/dev/null | grep -c '^bundle_.*\.ok$')
+    FAILED_BUNDLES=$((TOTAL_BUNDLES - SUCCESS_BUNDLES))
+fi
+
+# Cleanup manifest files if all succeeded
+if [ "$SUCCESS_CHUNKS" -eq "$TOTAL_CHUNKS" ] && [ "$TOTAL_CHUNKS" -gt 0 ]; then
+    rm -f "$TRANSFER_ROOT/chunking_manifest.json" 2>/dev/null
+fi
+if [ "$SUCCESS_BUNDLES" -eq "$TOTAL_BUNDLES" ] && [ "$TOTAL_BUNDLES" -gt 0 ]; then
+    rm -f "$TRANSFER_ROOT/bundling_manifest.json" 2>/dev/null
+fi
+rm -f "$PRIORITY_FILE" 2>/dev/null
+if [ -n "$DEST_ROOT" ]; then
+    rmdir "$DEST_ROOT/.adbt_staging" 2>/dev/null
+fi
 
 echo ""
 
+# ============================================================
+# PART 3: RECREATE DEDUPLICATED FILES
+# ============================================================
+
+DEDUP_STATUS="none"
+DEDUP_SCRIPT="$TRANSFER_ROOT/dedup_links.sh"
+
+if [ -f "$DEDUP_SCRIPT" ]; then
+    log_info "PHASE 3: Recreating duplicate files..."
+    # Canonical copies are where the files were restored
+    sh "$DEDUP_SCRIPT" "${DEST_ROOT:-$TRANSFER_ROOT}"
+    if [ $? -eq 0 ]; then
+        DEDUP_STATUS="ok"
+        rm -f "$DEDUP_SCRIPT" 2>/dev/null
+        log_success "  Duplicate files recreated"
+    else
+        DEDUP_STATUS="failed"
+        log_error "  Some duplicate files could not be recreated"
+    fi
+    echo ""
+fi
+
 # ============================================================
 # FINAL SUMMARY
 # ============================================================
@@ -298,22 +455,38 @@ if [ "$TOTAL_CHUNKS" -eq 0 ] && [ "$TOTAL_BUNDLES" -eq 0 ]; then
     echo "No chunked files or bundles found - nothing to process"
 fi
 
-echo "Location: $TRANSFER_ROOT"
+echo "Location: ${DEST_ROOT:-$TRANSFER_ROOT}"
 log_info "========================================================"
 
-# Create completion marker file
-MARKER_FILE="$TRANSFER_ROOT/.reassembly_complete"
-echo "Reassembly completed at: $(date)" > "$MARKER_FILE"
-echo "Total chunks: $TOTAL_CHUNKS" >> "$MARKER_FILE"
-echo "Successful chunks: $SUCCESS_CHUNKS" >> "$MARKER_FILE"
-echo "Failed chunks: $FAILED_CHUNKS" >> "$MARKER_FILE"
-echo "Total bundles: $TOTAL_BUNDLES" >> "$MARKER_FILE"
-echo "Successful bundles: $SUCCESS_BUNDLES" >> "$MARKER_FILE"
-echo "Failed bundles: $FAILED_BUNDLES" >> "$MARKER_FILE"
+# Create completion marker file (written under a temporary name, then renamed,
+# so the host never reads a partial marker)
+MARKER_TMP="$MARKER_FILE.tmp"
+echo "Reassembly completed at: $(date)" > "$MARKER_TMP"
+echo "Parallel jobs: $MAX_JOBS" >> "$MARKER_TMP"
+echo "Total chunks: $TOTAL_CHUNKS" >> "$MARKER_TMP"
+echo "Successful chunks: $SUCCESS_CHUNKS" >> "$MARKER_TMP"
+echo "Failed chunks: $FAILED_CHUNKS" >> "$MARKER_TMP"
+echo "Total bundles: $TOTAL_BUNDLES" >> "$MARKER_TMP"
+echo "Successful bundles: $SUCCESS_BUNDLES" >> "$MARKER_TMP"
+echo "Failed bundles: $FAILED_BUNDLES" >> "$MARKER_TMP"
+echo "Dedup copies: $DEDUP_STATUS" >> "$MARKER_TMP"
+
+# Per-job status lines: "job <id> <ok|fail>: <message>"
+for STATUS_FILE in "$STATUS_DIR"/*.ok "$STATUS_DIR"/*.fail; do
+    [ -f "$STATUS_FILE" ] || continue
+    STATUS_NAME=$(basename "$STATUS_FILE")
+    echo "job ${STATUS_NAME%.*} ${STATUS_NAME##*.}: $(cat "$STATUS_FILE")" >> "$MARKER_TMP"
+done
+rm -rf "$STATUS_DIR" 2>/dev/null
+
+mv -f "$MARKER_TMP" "$MARKER_FILE"
 log_info "Completion marker created: $MARKER_FILE"
 
 # Exit code
 TOTAL_FAILED=$((FAILED_CHUNKS + FAILED_BUNDLES))
+if [ "$DEDUP_STATUS" = "failed" ]; then
+    TOTAL_FAILED=$((TOTAL_FAILED + 1))
+fi
 if [ "$TOTAL_FAILED" -gt 0 ]; then
     exit 1
 fi
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The application modules are imported as top-level packages (core, utils) from src/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,140 @@
+import threading
+import time
+
+from core.bandwidth import (POLICY_FAIR, POLICY_FASTEST_FIRST, POLICY_WEIGHTED, WIFI_GROUP,
+                            BandwidthScheduler, topology_group)
+
+DEVICES = [
+    {"id": "A", "type": "usb", "usb_path": "1-2.1"},
+    {"id": "B", "type": "usb", "usb_path": "1-2.2"},
+]
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def start_acquire(scheduler, device_id):
+    """Start a blocking acquire in a thread; returns (thread, results) once it waits."""
+    group = scheduler._device_group[device_id]
+    before = group.waiting.get(device_id, 0)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(scheduler.acquire(device_id)), daemon=True)
+    thread.start()
+    assert wait_until(lambda: group.waiting.get(device_id, 0) > before or results)
+    return thread, results
+
+
+def make_scheduler(policy, slots, **kwargs):
+    return BandwidthScheduler(DEVICES, policy=policy, group_slots=slots, **kwargs)
+
+
+def test_topology_groups():
+    assert topology_group({"id": "x", "type": "usb", "usb_path": "1-2.3"}) == "usb:1-2"
+    assert topology_group({"id": "x", "type": "usb", "usb_path": "1-2.3"}, group_by="bus") == "usb:1"
+    assert topology_group({"id": "x", "type": "usb", "usb_path": "1-4"}) == "usb:1"
+    assert topology_group({"id": "x", "type": "usb"}) == "device:x"
+    assert topology_group({"id": "1.2.3.4:5555", "type": "wifi"}) == WIFI_GROUP
+
+
+def test_idle_slots_are_lent_to_a_single_active_device():
+    scheduler = make_scheduler(POLICY_FAIR, 4)
+    scheduler.register("A", 1000)
+    scheduler.register("B", 1000)
+    assert all(scheduler.acquire("A") for _ in range(4))  # B waits for nothing: A borrows its share
+    thread, results = start_acquire(scheduler, "B")
+    assert not results  # Every slot is in use
+    scheduler.release("A")
+    thread.join(5.0)
+    assert results == [True]
+
+
+def hold(scheduler, held):
+    for device_id, count in held.items():
+        for _ in range(count):
+            assert scheduler.acquire(device_id)
+
+
+def test_fair_share_goes_to_the_device_under_its_quota():
+    scheduler = make_scheduler(POLICY_FAIR, 4)
+    scheduler.register("A", 1000)
+    scheduler.register("B", 1000)
+    hold(scheduler, {"A": 2, "B": 2})
+    thread_a, results_a = start_acquire(scheduler, "A")
+    thread_b, results_b = start_acquire(scheduler, "B")
+    scheduler.release("B")  # B falls under its quota of 2, A is at it
+    thread_b.join(5.0)
+    assert results_b == [True]
+    assert not results_a  # Over quota and B is waiting: no borrowing
+    scheduler.cancel()
+    thread_a.join(5.0)
+
+
+def test_weighted_share_follows_the_weights():
+    scheduler = make_scheduler(POLICY_WEIGHTED, 4, weights={"A": 3, "B": 1})
+    scheduler.register("A", 1000)
+    scheduler.register("B", 1000)
+    hold(scheduler, {"A": 2, "B": 2})
+    thread_a, results_a = start_acquire(scheduler, "A")
+    thread_b, results_b = start_acquire(scheduler, "B")
+    scheduler.release("B")  # Quotas are 3 for A and 1 for B
+    thread_a.join(5.0)
+    assert results_a == [True]
+    assert not results_b
+    scheduler.cancel()
+    thread_b.join(5.0)
+
+
+def test_fastest_first_serves_the_device_with_the_least_bytes_left():
+    scheduler = make_scheduler(POLICY_FASTEST_FIRST, 2)
+    scheduler.register("A", 100)
+    scheduler.register("B", 1000)
+    hold(scheduler, {"A": 1, "B": 1})
+    thread_b, results_b = start_acquire(scheduler, "B")
+    thread_a, results_a = start_acquire(scheduler, "A")
+    scheduler.release("B", nbytes=10)
+    thread_a.join(5.0)
+    assert results_a == [True]
+    assert not results_b
+    assert scheduler._remaining["B"] == 990
+    scheduler.cancel()
+    thread_b.join(5.0)
+
+
+def test_finish_hands_a_device_share_to_the_others():
+    scheduler = make_scheduler(POLICY_FAIR, 2)
+    scheduler.register("A", 1000)
+    scheduler.register("B", 1000)
+    hold(scheduler, {"A": 2})
+    thread, results = start_acquire(scheduler, "B")
+    assert not results
+    scheduler.finish("A")  # A stopped with both slots held (killed pushes never released)
+    thread.join(5.0)
+    assert results == [True]
+
+
+def test_finish_is_idempotent_and_ignores_unregistered_devices():
+    scheduler = make_scheduler(POLICY_FAIR, 2)
+    scheduler.register("A", 1000)
+    scheduler.finish("A")
+    first = scheduler._finished["A"]
+    scheduler.finish("A")
+    scheduler.finish("B")  # Stopped before registering
+    assert scheduler._finished == {"A": first}
+
+
+def test_cancel_wakes_waiters_and_refuses_new_pushes():
+    scheduler = make_scheduler(POLICY_FAIR, 1)
+    scheduler.register("A", 1000)
+    scheduler.register("B", 1000)
+    hold(scheduler, {"A": 1})
+    thread, results = start_acquire(scheduler, "B")
+    scheduler.cancel()
+    thread.join(5.0)
+    assert results == [False]
+    assert scheduler.acquire("A") is False
@@ -0,0 +1,110 @@
+import random
+from pathlib import Path
+
+from core.bin_packing import BundlePacker
+
+MB = 1024 * 1024
+
+
+def _loads(sizes, bundles):
+    return [sum(sizes[position] for position in bundle) for bundle in bundles]
+
+
+def _positions(bundles):
+    return sorted(position for bundle in bundles for position in bundle)
+
+
+def test_pack_indices_places_every_file_once_within_target():
+    rng = random.Random(3)
+    sizes = [rng.randint(1, 10 * MB) for _ in range(2000)]
+    bundles = BundlePacker.pack_indices(sizes, 50 * MB)
+    assert _positions(bundles) == list(range(len(sizes)))
+    assert max(_loads(sizes, bundles)) <= 50 * MB
+
+
+def test_pack_indices_is_close_to_lower_bound():
+    rng = random.Random(4)
+    sizes = [rng.randint(1, 10 * MB) for _ in range(5000)]
+    bundles = BundlePacker.pack_indices(sizes, 50 * MB)
+    assert len(bundles) <= sum(sizes) / (50 * MB) + 2
+
+
+def test_oversized_file_gets_its_own_bundle():
+    sizes = [120, 30, 30, 40]
+    bundles = BundlePacker.pack_indices(sizes, 100)
+    assert [0] in [list(bundle) for bundle in bundles]
+    assert _positions(bundles) == [0, 1, 2, 3]
+
+
+def test_pack_resolves_items():
+    items = [("a", 60), ("b", 50), ("c", 40)]
+    bundles = BundlePacker.pack(items, 100)
+    assert sorted(sorted(bundle) for bundle in bundles) == [[("a", 60), ("c", 40)], [("b", 50)]]
+
+
+def test_balance_indices_spreads_bytes_evenly():
+    sizes = [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+    bundles = BundlePacker.balance_indices(sizes, 5)
+    assert len(bundles) == 5
+    assert _loads(sizes, bundles) == [11] * 5
+
+
+def test_pack_for_workers_count_is_multiple_of_workers():
+    rng = random.Random(5)
+    sizes = [rng.randint(1, 10 * MB) for _ in range(3000)]
+    bundles = BundlePacker.pack_for_workers_indices(sizes, 50 * MB, 4)
+    assert len(bundles) % 4 == 0
+    assert _positions(bundles) == list(range(len(sizes)))
+
+
+def test_pack_for_workers_never_exceeds_target_size():
+    for seed in range(20):
+        rng = random.Random(seed)
+        sizes = [rng.randint(1, 10 * MB) for _ in range(rng.randint(50, 1500))]
+        for workers in (2, 3, 4, 8):
+            bundles = BundlePacker.pack_for_workers_indices(sizes, 50 * MB, workers)
+            assert max(_loads(sizes, bundles)) <= 50 * MB
+
+
+def test_pack_for_workers_keeps_oversized_files_alone():
+    sizes = [300, 40, 40, 40, 30]
+    bundles = BundlePacker.pack_for_workers_indices(sizes, 100, 2)
+    assert max(_loads(sizes, bundles)) <= 300
+    assert _positions(bundles) == list(range(len(sizes)))
+
+
+def test_pack_stable_only_changes_bundles_around_an_added_file():
+    root = Path("/src")
+    files = [(root / f"dir{i // 50}" / f"file{i:04d}.txt", 1000) for i in range(1000)]
+    before = BundlePacker.pack_stable(files, 20_000, root)
+    after = BundlePacker.pack_stable(files + [(root / "dir7" / "new.txt", 1000)], 20_000, root)
+    assert len(_positions_of(after)) == len(files) + 1
+    unchanged = {tuple(map(str, (f for f, _ in bundle))) for bundle in before}
+    kept = [bundle for bundle in after if tuple(map(str, (f for f, _ in bundle))) in unchanged]
+    assert len(kept) >= 0.9 * len(after)
+    assert all(sum(size for _, size in bundle) <= 20_000 for bundle in after)
+
+
+def _positions_of(bundles):
+    return sorted(str(f) for bundle in bundles for f, _ in bundle)
+
+
+def test_bundle_id_uses_given_mtimes_without_stat():
+    root = Path("/does/not/exist")
+    files = [(root / "a.txt", 10, 1700000000.5), (root / "b" / "c.txt", 20, 1700000001.25)]
+    assert BundlePacker.bundle_id(files, root) == BundlePacker.bundle_id(list(reversed(files)), root)
+    touched = [files[0], (root / "b" / "c.txt", 20, 1700000002.0)]
+    assert BundlePacker.bundle_id(touched, root) != BundlePacker.bundle_id(files, root)
+
+
+def test_bundle_id_reads_mtime_of_inventory_entries():
+    from core.inventory import FileInventory, InventoryView
+
+    root = Path("/does/not/exist")
+    view = InventoryView(FileInventory())
+    view.add(root / "a.txt", 10, 1700000000.5)
+    view.add(root / "b.txt", 20, 1700000001.0)
+    bundles = BundlePacker.pack_stable(view, 1000, root)
+    assert len(bundles) == 1
+    expected = [(root / "a.txt", 10, 1700000000.5), (root / "b.txt", 20, 1700000001.0)]
+    assert BundlePacker.bundle_id(bundles[0], root) == BundlePacker.bundle_id(expected, root)
@@ -0,0 +1,55 @@
+from core.checksum import DeviceChecksummer, probe_md5_tool, remote_sizes
+
+
+class FakeAdb:
+    """Returns canned output lines and records the commands."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.commands = []
+
+    def run_command(self, command, device_id=None):
+        self.commands.append(command)
+        return self.responses.pop(0) if self.responses else []
+
+
+def test_parse_text_and_binary_mode_lines():
+    result = {}
+    DeviceChecksummer._parse([
+        "900150983CD24FB0D6963F7D28E17F72  /sdcard/t/a_chunks/chunk_0000.bin",
+        "d41d8cd98f00b204e9800998ecf8427e */sdcard/t/b chunks/chunk_0001.bin",
+        "md5sum: /sdcard/t/c: No such file or directory",
+        "",
+    ], result)
+    assert result == {
+        "/sdcard/t/a_chunks/chunk_0000.bin": "900150983cd24fb0d6963f7d28e17f72",
+        "/sdcard/t/b chunks/chunk_0001.bin": "d41d8cd98f00b204e9800998ecf8427e",
+    }
+
+
+def test_digests_batches_folders_and_stops_on_failure():
+    adb = FakeAdb([["900150983cd24fb0d6963f7d28e17f72  /t/a/chunk_0000.bin"], None])
+    checksummer = DeviceChecksummer(adb, "dev", "md5sum", jobs=3, dirs_per_call=2)
+    assert checksummer.digests(["/t/a", "/t/b", "/t/c"]) is None
+    assert len(adb.commands) == 2
+    assert "xargs -0 -P 3 -n 8 md5sum" in adb.commands[0]
+
+
+def test_file_digests_without_parallel_xargs():
+    adb = FakeAdb([["900150983cd24fb0d6963f7d28e17f72  /t/my file.bin"]])
+    checksummer = DeviceChecksummer(adb, "dev", "toybox md5sum", parallel=False)
+    assert checksummer.file_digests(["/t/my file.bin"]) == {"/t/my file.bin": "900150983cd24fb0d6963f7d28e17f72"}
+    assert "xargs -0 -n 1 toybox md5sum" in adb.commands[0]
+    assert "'/t/my file.bin'" in adb.commands[0]
+
+
+def test_probe_md5_tool_checks_the_known_digest():
+    adb = FakeAdb([["sh: md5sum: not found"], ["900150983cd24fb0d6963f7d28e17f72  -"]])
+    assert probe_md5_tool(adb, "dev") == "toybox md5sum"
+
+
+def test_remote_sizes_parses_stat_output():
+    adb = FakeAdb([["10 /t/a.bin", "stat: /t/b.bin: No such file"], ["30 /t/c d.bin"]])
+    assert remote_sizes(adb, "dev", ["/t/a.bin", "/t/b.bin", "/t/c d.bin"], batch_size=2) == {
+        "/t/a.bin": 10, "/t/c d.bin": 30
+    }
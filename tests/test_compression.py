@@ -0,0 +1,74 @@
+import gzip
+import os
+import time
+
+from core.compression import CompressionCache, compressibility
+
+
+def write_text(path, size, seed=0):
+    line = f"ligne {seed} de texte très compressible\n".encode()
+    path.write_bytes((line * (size // len(line) + 1))[:size])
+    return path
+
+
+def test_compressibility_of_text_and_random_data(tmp_path):
+    text = write_text(tmp_path / "a.txt", 200_000)
+    noise = tmp_path / "b.bin"
+    noise.write_bytes(os.urandom(200_000))
+    assert compressibility(text, 200_000) < 0.2
+    assert compressibility(noise, 200_000) > 0.95
+    assert compressibility(tmp_path / "missing", 10) == 1.0
+
+
+def test_blob_decompresses_to_the_original(tmp_path):
+    source = write_text(tmp_path / "a.txt", 300_000)
+    (tmp_path / "cache").mkdir()
+    cache = CompressionCache(tmp_path / "cache", min_size=1000, block_bytes=64 * 1024, workers=2)
+    blob = cache.get(source, 300_000)
+    assert gzip.decompress(blob.read_bytes()) == source.read_bytes()
+    assert cache.get(source, 300_000) == blob  # Reused, not compressed again
+    assert cache.compressed_files == 1
+    assert cache.get(source, 500) is None  # Under min_size
+
+
+def test_incompressible_files_are_pushed_raw(tmp_path):
+    noise = tmp_path / "b.bin"
+    noise.write_bytes(os.urandom(100_000))
+    cache = CompressionCache(tmp_path / "cache", min_size=1000)
+    assert cache.get(noise, 100_000) is None
+
+
+def test_least_recently_used_blobs_are_evicted_over_budget(tmp_path):
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "probe").mkdir()
+    sources = [write_text(tmp_path / f"f{i}.txt", 200_000, seed=i) for i in range(3)]
+    probe = CompressionCache(tmp_path / "probe", min_size=1000)
+    blob_size = probe.get(sources[0], 200_000).stat().st_size
+    cache = CompressionCache(tmp_path / "cache", min_size=1000, max_bytes=int(blob_size * 2.5))
+    first = cache.get(sources[0], 200_000)
+    second = cache.get(sources[1], 200_000)
+    old = time.time() - 60
+    os.utime(second, (old, old))  # The second blob is the least recently used
+    third = cache.get(sources[2], 200_000)
+    assert first.exists() and third.exists() and not second.exists()
+    assert cache.evicted_files == 1
+    assert cache._stored_bytes <= cache.max_bytes
+
+
+def test_creation_prunes_old_blobs_and_enforces_the_budget(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    old = time.time() - 30 * 86400
+    stale = cache_dir / "stale.gz"
+    stale.write_bytes(b"x" * 100)
+    os.utime(stale, (old, old))
+    recent = []
+    for i in range(3):
+        blob = cache_dir / f"b{i}.gz"
+        blob.write_bytes(b"x" * 1000)
+        os.utime(blob, (time.time() - 100 + i, time.time() - 100 + i))
+        recent.append(blob)
+    cache = CompressionCache(cache_dir, max_age_days=7, max_bytes=2000)
+    assert not stale.exists()
+    assert [blob.exists() for blob in recent] == [False, True, True]
+    assert cache._stored_bytes == 2000
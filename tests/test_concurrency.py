@@ -0,0 +1,64 @@
+from core.concurrency import CircuitBreaker, RetryPolicy, RetryQueue
+
+
+def test_retry_queue_pops_due_items_earliest_first():
+    queue = RetryQueue()
+    queue.push("late", 1, delay=5.0, now=100.0)
+    queue.push("early", 2, delay=1.0, now=100.0)
+    assert len(queue) == 2
+    assert queue.next_due() == 101.0
+    assert queue.pop_due(now=100.5) is None
+    assert queue.pop_due(now=101.0) == ("early", 2)
+    assert queue.pop_due(now=104.0) is None
+    assert queue.pop_due(now=105.0) == ("late", 1)
+    assert not queue
+    assert queue.next_due() is None
+
+
+def test_retry_queue_keeps_insertion_order_for_equal_due_times():
+    queue = RetryQueue()
+    for name in ("a", "b", "c"):
+        queue.push(name, 1, delay=0.0, now=10.0)
+    assert [queue.pop_due(now=10.0)[0] for _ in range(3)] == ["a", "b", "c"]
+
+
+def test_retry_queue_drain_empties_in_due_order():
+    queue = RetryQueue()
+    queue.push(("/l/b", "/r/b", 2), 1, delay=2.0, now=0.0)
+    queue.push(("/l/a", "/r/a", 1), 3, delay=1.0, now=0.0)
+    assert queue.drain() == [("/l/a", "/r/a", 1), ("/l/b", "/r/b", 2)]
+    assert len(queue) == 0
+
+
+def test_retry_policy_spends_its_budget():
+    policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=1.5)
+    first, second = policy.next_delay(1), policy.next_delay(2)
+    assert 0.5 <= first <= 1.5
+    assert 0.75 <= second <= 2.25
+    assert policy.next_delay(3) is None
+    assert policy.metrics()["retries"] == 2
+    assert policy.metrics()["exhausted"] == 1
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(threshold=2, cooldown_s=10.0, max_trips=2)
+    breaker.record(False, now=0.0)
+    assert breaker.allow(now=0.0)
+    breaker.record(False, now=0.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow(now=5.0)
+    assert breaker.wait_time(now=5.0) == 5.0
+    assert breaker.allow(now=10.0)  # Half-open probe
+    assert not breaker.allow(now=10.0)  # Only one probe at a time
+    breaker.record(True, now=11.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow(now=11.0)
+
+
+def test_circuit_breaker_trips_out_after_max_trips():
+    breaker = CircuitBreaker(threshold=1, cooldown_s=1.0, max_trips=2)
+    breaker.record(False, now=0.0)
+    assert breaker.allow(now=1.0)
+    breaker.record(False, now=1.0)  # The probe failed: second trip
+    assert breaker.tripped_out
+    assert not breaker.allow(now=100.0)
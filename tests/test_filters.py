@@ -0,0 +1,113 @@
+import pytest
+
+from core.filters import PathFilter, parse_size, parse_time
+
+
+def _files(path_filter, paths):
+    return [path for path in paths if path_filter.accept_name(path, path.rsplit('/', 1)[-1])]
+
+
+def test_parse_size_units():
+    assert parse_size(4096) == 4096
+    assert parse_size("512K") == 512 * 1024
+    assert parse_size("10MB") == 10 * 1024 ** 2
+    assert parse_size("1.5G") == int(1.5 * 1024 ** 3)
+    assert parse_size(None) is None
+    with pytest.raises(ValueError):
+        parse_size("ten megabytes")
+
+
+def test_parse_time_ages_and_dates():
+    assert parse_time("2d", now=1_000_000) == 1_000_000 - 2 * 86400
+    assert parse_time("30m", now=1_000_000) == 1_000_000 - 1800
+    assert parse_time(123) == 123.0
+    assert parse_time("2024-05-01") > parse_time("2024-04-30")
+    with pytest.raises(ValueError):
+        parse_time("yesterday")
+
+
+def test_basename_rules_match_at_any_depth():
+    path_filter = PathFilter(exclude=["*.tmp", "Thumbs.db", "cache?.bin"])
+    assert _files(path_filter, ["a.tmp", "x/y/b.tmp", "x/Thumbs.db", "cache1.bin", "cache12.bin", "keep.txt"]) == [
+        "cache12.bin", "keep.txt"
+    ]
+
+
+def test_anchored_rules_only_match_from_the_root():
+    path_filter = PathFilter(exclude=["/build", "docs/*.pdf"])
+    assert path_filter.prune_dir("build", "build")
+    assert not path_filter.prune_dir("src/build", "build")
+    assert _files(path_filter, ["docs/a.pdf", "docs/sub/a.pdf", "other/docs/a.pdf"]) == [
+        "docs/sub/a.pdf", "other/docs/a.pdf"
+    ]
+
+
+def test_directory_only_rules_do_not_match_files():
+    path_filter = PathFilter(exclude=["node_modules/"])
+    assert path_filter.prune_dir("web/node_modules", "node_modules")
+    assert path_filter.accept_name("web/node_modules", "node_modules")
+
+
+def test_double_star_patterns():
+    path_filter = PathFilter(exclude=["**/logs/*.log", "assets/**"])
+    assert _files(path_filter, ["logs/a.log", "x/y/logs/b.log", "x/logs/sub/c.log", "assets/img/a.png", "a.log"]) == [
+        "x/logs/sub/c.log", "a.log"
+    ]
+
+
+def test_negation_last_match_wins():
+    path_filter = PathFilter(exclude=["*.log", "!important.log", "debug/important.log"])
+    assert _files(path_filter, ["a.log", "important.log", "x/important.log", "debug/important.log"]) == [
+        "important.log", "x/important.log"
+    ]
+
+
+def test_character_classes():
+    path_filter = PathFilter(exclude=["file[0-9].txt", "tmp[!a].dat"])
+    assert _files(path_filter, ["file1.txt", "filex.txt", "tmpa.dat", "tmpb.dat"]) == ["filex.txt", "tmpa.dat"]
+
+
+def test_comments_and_escapes():
+    path_filter = PathFilter(exclude=["# comment", "", "\\#hash.txt", "\\!bang.txt"])
+    assert _files(path_filter, ["#hash.txt", "!bang.txt", "# comment"]) == ["# comment"]
+
+
+def test_include_keeps_matching_files_and_directories():
+    path_filter = PathFilter(include=["*.jpg", "/Music/", "docs"])
+    assert _files(path_filter, [
+        "a.jpg", "x/b.jpg", "a.png", "Music/song.mp3", "x/Music/song.mp3", "docs/readme.md", "x/docs/y.txt", "docs"
+    ]) == ["a.jpg", "x/b.jpg", "Music/song.mp3", "docs/readme.md", "x/docs/y.txt", "docs"]
+
+
+def test_exclude_applies_before_include():
+    path_filter = PathFilter(include=["*.jpg"], exclude=["private/"])
+    assert path_filter.prune_dir("private", "private")
+    assert not path_filter.accept_name("a.tmp", "a.tmp")
+
+
+def test_stat_predicates():
+    path_filter = PathFilter(min_size="1K", max_size="1M", modified_after=1000, modified_before=2000)
+    assert path_filter.accept_stat(2048, 1500)
+    assert not path_filter.accept_stat(100, 1500)
+    assert not path_filter.accept_stat(2 * 1024 * 1024, 1500)
+    assert not path_filter.accept_stat(2048, 999)
+    assert not path_filter.accept_stat(2048, 2000)
+    assert PathFilter(exclude=["*.tmp"]).accept_stat(0, 0)
+
+
+def test_from_config_merges_global_and_job_rules():
+    config = {"filter_rules": {
+        "*": {"exclude": ["*.tmp"], "min_size": "1K"},
+        "/data/photos": {"exclude": "!keep.tmp", "min_size": "2K"},
+    }}
+    path_filter = PathFilter.from_config(config, "/data/photos")
+    assert path_filter.exclude_lines == ["*.tmp", "!keep.tmp"]
+    assert path_filter.min_size == 2048
+    assert path_filter.accept_name("keep.tmp", "keep.tmp")
+    assert PathFilter.from_config({}, "/data") is None
+    assert PathFilter.from_config(config, "/other").min_size == 1024
+
+
+def test_rules_key_ignores_stat_predicates():
+    assert PathFilter(exclude=["*.tmp"], min_size=1).rules_key == PathFilter(exclude=["*.tmp"], min_size=9).rules_key
+    assert PathFilter(exclude=["*.tmp"]).rules_key != PathFilter(exclude=["*.log"]).rules_key
@@ -0,0 +1,72 @@
+import json
+
+from core.ledger import TransferLedger
+
+
+def _ledger(tmp_path, device="dev1", root="/sdcard/transfer_temp"):
+    return TransferLedger(tmp_path / "ledger.jsonl", device, root)
+
+
+def test_record_then_load(tmp_path):
+    ledger = _ledger(tmp_path)
+    ledger.record("/sdcard/transfer_temp/a.bin", 10, "md5a")
+    ledger.record("/sdcard/transfer_temp/b.bin", 20, "md5b")
+    ledger.record("/sdcard/transfer_temp/a.bin", 11, "md5a2")  # Latest line wins
+    ledger.close()
+
+    reloaded = _ledger(tmp_path)
+    assert reloaded.load() == 2
+    assert reloaded.is_confirmed("/sdcard/transfer_temp/a.bin", 11, "md5a2")
+    assert not reloaded.is_confirmed("/sdcard/transfer_temp/a.bin", 10, "md5a")
+    assert reloaded.is_confirmed("/sdcard/transfer_temp/b.bin", 20, "md5b")
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    ledger = _ledger(tmp_path)
+    ledger.record("/r/a.bin", 10, "d")
+    ledger.close()
+    with open(tmp_path / "ledger.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"r": "/r/b.bin", "s": 2')
+    reloaded = _ledger(tmp_path)
+    assert reloaded.load() == 1
+
+
+def test_other_device_or_root_is_ignored(tmp_path):
+    ledger = _ledger(tmp_path)
+    ledger.record("/r/a.bin", 10, "d")
+    ledger.close()
+    assert _ledger(tmp_path, device="dev2").load() == 0
+    assert _ledger(tmp_path, root="/sdcard/other").load() == 0
+
+
+def test_missing_journal_loads_empty(tmp_path):
+    assert _ledger(tmp_path).load() == 0
+
+
+def test_validate_drops_gone_or_resized_files_and_compacts(tmp_path):
+    ledger = _ledger(tmp_path)
+    for name, size in (("a", 10), ("b", 20), ("c", 30)):
+        ledger.record(f"/r/{name}.bin", size, name)
+    ledger.record("/r/a.bin", 10, "a")
+    ledger.close()
+
+    reloaded = _ledger(tmp_path)
+    reloaded.load()
+    dropped = reloaded.validate({"/r/a.bin": 10, "/r/b.bin": 21})
+    assert dropped == 2
+    assert reloaded.is_confirmed("/r/a.bin", 10, "a")
+    assert not reloaded.is_confirmed("/r/b.bin", 20, "b")
+
+    lines = (tmp_path / "ledger.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2  # Header + one live entry
+    assert json.loads(lines[1]) == {"r": "/r/a.bin", "s": 10, "d": "a"}
+
+
+def test_record_after_validate_appends_to_compacted_journal(tmp_path):
+    ledger = _ledger(tmp_path)
+    ledger.record("/r/a.bin", 10, "a")
+    ledger.validate({"/r/a.bin": 10})
+    ledger.record("/r/b.bin", 20, "b")
+    ledger.close()
+    reloaded = _ledger(tmp_path)
+    assert reloaded.load() == 2
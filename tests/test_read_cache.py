@@ -0,0 +1,96 @@
+import threading
+
+from core.read_cache import SharedReadCache
+
+
+def write_files(tmp_path, count, size):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"f{i}.bin"
+        path.write_bytes(bytes([i]) * size)
+        paths.append(str(path))
+    return paths
+
+
+def run_with_timeout(target, timeout=5.0):
+    """Run `target` in a thread; True if it returned in time (False: it hung)."""
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_each_file_is_read_once_for_all_devices(tmp_path):
+    paths = write_files(tmp_path, 2, 1000)
+    cache = SharedReadCache(["A", "B"], 10_000)
+    for device_id in ("A", "B"):
+        for path in paths:
+            assert cache.acquire(device_id, path, 1000) == open(path, 'rb').read()
+            cache.release(device_id, path)
+    assert cache.disk_bytes == 2000
+    assert cache.served_bytes == 4000
+    assert cache._used == 0  # Every block evicted once both devices released it
+
+
+def test_device_finishing_without_consuming_does_not_block_the_others(tmp_path):
+    paths = write_files(tmp_path, 3, 600_000)
+    cache = SharedReadCache(["A", "B"], 1_000_000)
+    cache.finish("B")  # B stopped before its first push (failed install, error)
+
+    def push_all():
+        for path in paths:
+            assert cache.acquire("A", path, 600_000) is not None
+            cache.release("A", path)
+
+    assert run_with_timeout(push_all)
+    assert cache._used == 0
+
+
+def test_finish_releases_blocks_held_for_a_device(tmp_path):
+    paths = write_files(tmp_path, 2, 600_000)
+    cache = SharedReadCache(["A", "B"], 1_000_000)
+    cache.acquire("A", paths[0], 600_000)
+    cache.release("A", paths[0])  # Kept for B
+    second = []
+    waiter = threading.Thread(target=lambda: second.append(cache.acquire("A", paths[1], 600_000)), daemon=True)
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()  # No room until B consumes the first block
+    cache.finish("B")
+    waiter.join(5.0)
+    assert not waiter.is_alive() and second[0] is not None
+
+
+def test_skipped_files_are_not_kept_for_the_skipping_device(tmp_path):
+    paths = write_files(tmp_path, 1, 1000)
+    cache = SharedReadCache(["A", "B"], 10_000)
+    cache.skip("B", paths[0])
+    cache.acquire("A", paths[0], 1000)
+    cache.release("A", paths[0])
+    assert cache._used == 0
+
+
+def test_too_big_and_evicted_files_are_left_to_the_caller(tmp_path):
+    paths = write_files(tmp_path, 1, 1000)
+    cache = SharedReadCache(["A"], 500)
+    assert cache.acquire("A", paths[0], 1000) is None
+    cache = SharedReadCache(["A"], 10_000)
+    cache.acquire("A", paths[0], 1000)
+    cache.release("A", paths[0])
+    assert cache.acquire("A", paths[0], 1000) is None  # Retry after eviction
+    assert cache.bypass_bytes == 1000
+
+
+def test_cancel_wakes_a_push_waiting_for_room(tmp_path):
+    paths = write_files(tmp_path, 2, 600_000)
+    cache = SharedReadCache(["A", "B"], 1_000_000)
+    cache.acquire("A", paths[0], 600_000)
+    cache.release("A", paths[0])
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(cache.acquire("A", paths[1], 600_000)), daemon=True)
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    cache.cancel()
+    waiter.join(5.0)
+    assert not waiter.is_alive() and result == [None]
@@ -0,0 +1,97 @@
+import os
+import time
+
+from core.scanner import JOURNAL_RACY_WINDOW_NS, DirectoryScanner, ScanJournal
+
+
+def _make_tree(root):
+    (root / "sub").mkdir()
+    (root / "a.txt").write_bytes(b"a" * 10)
+    (root / "sub" / "b.txt").write_bytes(b"b" * 20)
+
+
+def _age_tree(root, seconds=60):
+    """Move every mtime into the past, outside the racy window of the next snapshot."""
+    past = time.time() - seconds
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (past, past))
+        os.utime(dirpath, (past, past))
+
+
+def _scan(root, journal_path, **load_args):
+    journal = ScanJournal(journal_path, root)
+    loaded = journal.load(**load_args)
+    started_ns = time.time_ns()
+    records = DirectoryScanner(workers=2, journal=journal).scan(root)
+    journal.save(started_ns)
+    return loaded, journal, records
+
+
+def test_unchanged_directories_are_served_from_the_journal(tmp_path):
+    root = tmp_path / "src"
+    root.mkdir()
+    _make_tree(root)
+    _age_tree(root)
+    journal_path = tmp_path / "journal.json"
+
+    loaded, journal, first = _scan(root, journal_path)
+    assert not loaded and journal.reused_dirs == 0
+
+    loaded, journal, second = _scan(root, journal_path)
+    assert loaded
+    assert journal.reused_dirs == 2 and journal.scanned_dirs == 0
+    assert second == first
+
+
+def test_changed_directory_is_listed_again(tmp_path):
+    root = tmp_path / "src"
+    root.mkdir()
+    _make_tree(root)
+    _age_tree(root)
+    journal_path = tmp_path / "journal.json"
+    _scan(root, journal_path)
+
+    (root / "sub" / "c.txt").write_bytes(b"c")
+    loaded, journal, records = _scan(root, journal_path)
+    assert journal.scanned_dirs == 1 and journal.reused_dirs == 1
+    assert str(root / "sub" / "c.txt") in [path for path, _, _ in records]
+
+
+def test_lookup_rejects_directories_inside_the_racy_window(tmp_path):
+    journal = ScanJournal(tmp_path / "journal.json", tmp_path)
+    journal.previous_time_ns = 10 * JOURNAL_RACY_WINDOW_NS
+    journal.previous = {
+        "/old": [1, [], [["a", 1, 1.0]]],
+        "/racy": [10 * JOURNAL_RACY_WINDOW_NS - 1, [], []],
+    }
+    assert journal.lookup("/old", 1) == ([(os.path.join("/old", "a"), 1, 1.0)], [])
+    assert journal.lookup("/old", 2) is None
+    assert journal.lookup("/racy", 10 * JOURNAL_RACY_WINDOW_NS - 1) is None
+    assert journal.lookup("/unknown", 1) is None
+
+
+def test_modified_file_in_sample_discards_the_journal(tmp_path):
+    root = tmp_path / "src"
+    root.mkdir()
+    _make_tree(root)
+    _age_tree(root)
+    journal_path = tmp_path / "journal.json"
+    _scan(root, journal_path)
+
+    # Edited in place: the directory mtime does not change
+    sub_mtime = os.stat(root / "sub").st_mtime
+    (root / "sub" / "b.txt").write_bytes(b"changed")
+    os.utime(root / "sub", (sub_mtime, sub_mtime))
+    assert not ScanJournal(journal_path, root).load(verify_sample=64)
+
+
+def test_journal_with_other_rules_or_too_old_is_ignored(tmp_path):
+    root = tmp_path / "src"
+    root.mkdir()
+    _make_tree(root)
+    journal_path = tmp_path / "journal.json"
+    ScanJournal(journal_path, root, rules_key="abc").save(time.time_ns() - 3 * 3600 * 10 ** 9)
+    assert not ScanJournal(journal_path, root, rules_key="other").load()
+    assert not ScanJournal(journal_path, root, rules_key="abc").load(max_age_hours=2)
+    assert ScanJournal(journal_path, root, rules_key="abc").load(max_age_hours=4)
@@ -0,0 +1,49 @@
+from core.speculation import MB, SpeculationTracker
+
+
+def test_straggler_needs_both_thresholds_and_budget():
+    tracker = SpeculationTracker(factor=3.0, min_seconds=5.0, budget_bytes=10 * MB)
+    # 1 MB at 1 MB/s is expected in 1 s: 3 s is below the 5 s floor
+    assert not tracker.is_straggler(3.0, MB, median_rate=MB)
+    assert tracker.is_straggler(5.0, MB, median_rate=MB)
+    # 4 MB is expected in 4 s: a backup only after 12 s
+    assert not tracker.is_straggler(11.0, 4 * MB, median_rate=MB)
+    assert tracker.is_straggler(12.0, 4 * MB, median_rate=MB)
+    tracker.launch("p1", "b1", 8 * MB)
+    assert not tracker.is_straggler(60.0, 4 * MB, median_rate=MB)  # Over budget
+    assert tracker.is_straggler(60.0, 2 * MB, median_rate=MB)
+
+
+def test_primary_wins_the_race():
+    tracker = SpeculationTracker()
+    tracker.launch("primary", "backup", 100)
+    assert tracker.busy("primary") and tracker.busy("backup")
+    assert tracker.end_primary("primary") == "backup"
+    tracker.primary_won("backup")
+    assert tracker.is_loser("backup") and not tracker.is_loser("primary")
+    assert tracker.end_loser("backup")  # Partial backup copy to remove
+    assert not tracker.busy("backup")
+    assert tracker.metrics() == {"launched": 1, "won": 0, "bytes": 100}
+
+
+def test_backup_wins_and_is_promoted():
+    tracker = SpeculationTracker()
+    tracker.launch("primary", "backup", 100)
+    assert tracker.is_backup("backup")
+    assert tracker.end_backup("backup") == "primary"
+    tracker.backup_won("primary", "promotion")
+    assert tracker.is_loser("primary")
+    assert not tracker.end_loser("primary")  # The killed original is not a backup copy
+    assert tracker.busy("promotion")
+    assert tracker.end_primary("promotion") is None
+    assert not tracker.busy("promotion")
+    assert tracker.metrics()["won"] == 1
+
+
+def test_backup_carries_on_after_the_primary_failed():
+    tracker = SpeculationTracker()
+    tracker.launch("primary", "backup", 100)
+    assert tracker.end_primary("primary") == "backup"
+    tracker.primary_failed("backup")
+    assert tracker.end_backup("backup") is None  # Its outcome is the item's outcome
+    assert not tracker.busy("backup") and not tracker.busy("primary")